@@ -0,0 +1,216 @@
+# Benchmark and soak suite for PomodoroApp.
+#
+# Drives the real app under the headless Tk stand-in (benchmarks/headless_tk.py)
+# on a virtual clock, or under a real Tk when a display is available
+# (`--real-tk`, e.g. with xvfb-run; tick mode only). Results are written as
+# JSON so releases can be compared.
+#
+#   python benchmarks/bench_app.py tick --ticks 3600
+#   python benchmarks/bench_app.py persistence --samples 500
+#   python benchmarks/bench_app.py soak --days 14
+#   python benchmarks/bench_app.py all --out results.json
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+os.environ['POMODORO_DATA_DIR'] = tempfile.mkdtemp(prefix='pomodoro-bench-')  # never the user's data
+import headless_tk  # noqa: E402
+import pomodoro  # noqa: E402
+
+
+def percentiles(samples_s):
+    data = sorted(samples_s)
+    if not data:
+        return {}
+
+    def pct(p):
+        return round(data[min(len(data) - 1, int(p * len(data)))] * 1000, 4)
+    return {'p50': pct(0.5), 'p90': pct(0.9), 'p99': pct(0.99), 'max': pct(1.0),
+            'mean': round(statistics.fmean(data) * 1000, 4)}
+
+
+# --- App construction ---
+def headless_app():
+    root = headless_tk.install(pomodoro)
+    app = pomodoro.PomodoroApp(root)
+    app.engine.clock = root.clock
+    app.muted = True
+    root.advance(0)  # finish_startup
+    return root, app
+
+
+class CountingTk:
+    # Counts Tcl commands sent by widgets under a real Tk
+    def __init__(self, tkapp):
+        self._tk = tkapp
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self._tk.call(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._tk, name)
+
+
+def real_tk_app():
+    import tkinter
+    root = tkinter.Tk()
+    counter = CountingTk(root.tk)
+    root.tk = counter
+    app = pomodoro.PomodoroApp(root)
+    app.muted = True
+    clock = [0.0]
+    app.engine.clock = lambda: clock[0]
+    root.update()
+    return root, app, counter, clock
+
+
+# --- Modes ---
+def bench_tick(args):
+    if args.real_tk:
+        root, app, counter, clock = real_tk_app()
+        app.start_timer()
+        counter.calls = 0
+        t0 = time.perf_counter()
+        for _ in range(args.ticks):
+            clock[0] += 1
+            app.cancel_tick()
+            app.run_timer()
+            root.update_idletasks()
+        elapsed = time.perf_counter() - t0
+        result = {'backend': 'tk', 'ticks': args.ticks, 'us_per_tick': round(elapsed / args.ticks * 1e6, 2),
+                  'tcl_calls_per_tick': round(counter.calls / args.ticks, 3)}
+        root.destroy()
+        return result
+    root, app = headless_app()
+    app.durations['pomodoro'] = max(app.durations['pomodoro'], args.ticks + 10)
+    app.time_left = app.durations['pomodoro']
+    app.engine.load(app.time_left)
+    app.start_timer()
+    headless_tk.RECORDER.reset()
+    t0 = time.perf_counter()
+    root.advance(args.ticks)
+    elapsed = time.perf_counter() - t0
+    calls = headless_tk.RECORDER.calls
+    result = {'backend': 'headless', 'ticks': args.ticks, 'us_per_tick': round(elapsed / args.ticks * 1e6, 2),
+              'tcl_calls_per_tick': round(headless_tk.RECORDER.total() / args.ticks, 3),
+              'calls_by_kind': {k: round(v / args.ticks, 3) for k, v in sorted(calls.items())}}
+    app.exit_app()
+    return result
+
+
+def bench_persistence(args):
+    root, app = headless_app()
+    n = args.samples
+    submit, flush, record, counters = [], [], [], []
+    for i in range(n):
+        app.long_break_interval = 2 + i % 10
+        t0 = time.perf_counter()
+        app.save_settings()
+        submit.append(time.perf_counter() - t0)
+        if i % 10 == 9:
+            t0 = time.perf_counter()
+            app.writer.flush()
+            flush.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        app.record_session('completed', 1500)
+        record.append(time.perf_counter() - t0)
+        app.counters['pomodoro'] += 1
+        t0 = time.perf_counter()
+        app.flush_session_counters()
+        counters.append(time.perf_counter() - t0)
+    app.exit_app()
+    return {'samples': n,
+            'save_settings_ms': percentiles(submit),
+            'writer_flush_ms': percentiles(flush),
+            'record_session_ms': percentiles(record),
+            'flush_session_counters_ms': percentiles(counters),
+            'writer': app.writer.stats()}
+
+
+def bench_soak(args):
+    # Weeks of auto-started cycles at real durations on the virtual clock.
+    # After a one-day warm-up, memory, live widgets, canvas items and pending
+    # callbacks must not keep growing.
+    root, app = headless_app()
+    rec = headless_tk.RECORDER
+    app.auto_start = True
+    app.start_timer()
+    root.advance(86400)  # warm-up day
+    gc.collect()
+    tracemalloc.start(1)
+    snap0 = tracemalloc.take_snapshot()
+    base = {'widgets': rec.live_widgets, 'items': rec.live_items, 'toplevels': rec.toplevels_created,
+            'pending_after': root.pending(), 'cycles': sum(app.history.values())}
+    t0 = time.perf_counter()
+    samples = []
+    for day in range(args.days):
+        root.advance(86400)
+        gc.collect()
+        samples.append(tracemalloc.get_traced_memory()[0])
+    elapsed = time.perf_counter() - t0
+    gc.collect()
+    snap1 = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    growth = snap1.compare_to(snap0, 'lineno')
+    top = [{'site': str(s.traceback[0]), 'kb': round(s.size_diff / 1024, 2)} for s in growth[:5] if s.size_diff > 0]
+    end = {'widgets': rec.live_widgets, 'items': rec.live_items, 'toplevels': rec.toplevels_created,
+           'pending_after': root.pending(), 'cycles': sum(app.history.values())}
+    mem_growth_kb = round((samples[-1] - samples[0]) / 1024, 2) if samples else 0.0
+    leaks = []
+    for key in ('widgets', 'items', 'toplevels'):
+        if end[key] > base[key]:
+            leaks.append(f'{key} grew {base[key]} -> {end[key]}')
+    if end['pending_after'] > args.max_pending:  # tick, animation frame, midnight, banner timeout, log fsync
+        leaks.append(f"{end['pending_after']} after callbacks pending")
+    if mem_growth_kb > args.leak_kb:
+        leaks.append(f'traced memory grew {mem_growth_kb} KiB')
+    app.exit_app()
+    return {'days': args.days, 'cycles': end['cycles'] - base['cycles'],
+            'wall_s': round(elapsed, 2), 'simulated_s_per_wall_s': round(args.days * 86400 / elapsed, 1),
+            'start': base, 'end': end, 'traced_kb_per_day': [round(x / 1024, 1) for x in samples],
+            'mem_growth_kb': mem_growth_kb, 'top_growth': top, 'leaks': leaks, 'ok': not leaks}
+
+
+MODES = {'tick': bench_tick, 'persistence': bench_persistence, 'soak': bench_soak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PomodoroApp benchmark and soak suite')
+    parser.add_argument('mode', choices=list(MODES) + ['all'])
+    parser.add_argument('--ticks', type=int, default=3600)
+    parser.add_argument('--samples', type=int, default=500)
+    parser.add_argument('--days', type=int, default=14)
+    parser.add_argument('--leak-kb', type=float, default=256.0, help='soak: allowed traced-memory growth')
+    parser.add_argument('--max-pending', type=int, default=5, help='soak: allowed pending after callbacks')
+    parser.add_argument('--real-tk', action='store_true', help='tick mode under a real Tk (needs a display)')
+    parser.add_argument('--out', help='write results JSON to this file')
+    args = parser.parse_args()
+
+    modes = list(MODES) if args.mode == 'all' else [args.mode]
+    results = {'python': platform.python_version(), 'platform': platform.platform(),
+               'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': {}}
+    for mode in modes:
+        results['results'][mode] = MODES[mode](args)
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+    soak = results['results'].get('soak')
+    sys.exit(1 if soak and not soak['ok'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# Audio cue benchmark for the AudioEngine:
+#   render      time to synthesise (or decode) each built-in cue cold, and a
+#               cache hit afterwards
+#   play        cost of PomodoroApp.play_sound on the calling (Tk) thread,
+#               which must stay in the microseconds whatever the backend
+#   latency     play() call -> backend started, per backend: null, a WAV file
+#               sink, and whichever command-line players are installed
+#               (paplay, aplay, afplay; skipped when absent)
+#
+#   python benchmarks/bench_audio.py --plays 200
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+os.environ['POMODORO_DATA_DIR'] = tempfile.mkdtemp(prefix='pomodoro-bench-')  # never the user's data
+import headless_tk  # noqa: E402
+import pomodoro  # noqa: E402
+
+
+def wait_idle(engine, n, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while engine.plays + engine.failed + engine.worker.dropped < n and time.monotonic() < deadline:
+        time.sleep(0.0005)
+
+
+def render(repeat):
+    results = {}
+    for cue in pomodoro.CUES:
+        cold = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            clip = pomodoro.render_clip(cue, 0.8)
+            cold.append(time.perf_counter() - t0)
+        engine = pomodoro.AudioEngine(pomodoro.NullAudio())
+        engine.clip(cue, 0.8)
+        t0 = time.perf_counter()
+        for _ in range(1000):
+            engine.clip(cue, 0.8)
+        results[cue] = {'seconds': round(clip.seconds, 3), 'wav_kb': round(len(clip.wav) / 1024, 1),
+                        'cold_ms': round(min(cold) * 1000, 3),
+                        'cached_us': round((time.perf_counter() - t0) / 1000 * 1e6, 3)}
+    return results
+
+
+def play_cost(plays):
+    # The app's own entry point on the headless stand-in, null backend
+    root = headless_tk.install(pomodoro)
+    app = pomodoro.PomodoroApp(root)
+    root.advance(0)  # finish_startup (preloads the cues)
+    app.audio.backend = pomodoro.NullAudio()
+    calls = []
+    for i in range(plays):
+        t0 = time.perf_counter()
+        app.play_sound(('pomodoro', 'short', 'long')[i % 3])
+        calls.append(time.perf_counter() - t0)
+        wait_idle(app.audio, i + 1)
+    stats = app.audio.stats()
+    app.exit_app()
+    calls.sort()
+    return {'calls': plays, 'p50_us': round(calls[len(calls) // 2] * 1e6, 2),
+            'max_us': round(calls[-1] * 1e6, 2), 'renders': stats['renders'], 'dropped': stats['dropped']}
+
+
+def latency(backend, plays, gap):
+    engine = pomodoro.AudioEngine(backend)
+    engine.preload(list(pomodoro.CUES), 0.8)
+    while engine.worker.done < 1:  # as at startup: rendered long before the first cycle ends
+        time.sleep(0.001)
+    for i in range(plays):
+        engine.play(list(pomodoro.CUES)[i % len(pomodoro.CUES)], 0.8)
+        wait_idle(engine, i + 1)
+        time.sleep(gap)
+    stats = engine.stats()
+    engine.close()
+    return {'plays': stats['plays'], 'failed': stats['failed'], 'renders': stats['renders'],
+            'start_latency_ms': stats['start_latency_ms']}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Audio cue benchmark')
+    parser.add_argument('--plays', type=int, default=200)
+    parser.add_argument('--device-plays', type=int, default=10, help='plays through real players')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = {'render': render(args.repeat), 'play_call': play_cost(args.plays), 'latency': {}}
+    results['latency']['null'] = latency(pomodoro.NullAudio(), args.plays, 0)
+    sink = os.path.join(pomodoro.DATA_DIR, 'cue.wav')
+    results['latency']['file'] = latency(pomodoro.FileSinkAudio(sink), args.plays, 0)
+    for name in pomodoro.PLAYER_ARGS:
+        if shutil.which(name):
+            backend = pomodoro.audio_backend(name)
+            results['latency'][name] = latency(backend, args.device_plays, 0.6)
+    results['ok'] = (results['play_call']['dropped'] == 0 and results['play_call']['p50_us'] < 1000
+                     and all(r['failed'] == 0 for r in results['latency'].values()))
+    print(json.dumps(results, indent=2))
+    return 0 if results['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# Control API latency benchmark: a PomodoroApp (headless stand-in, its
+# event loop running in real time on the main thread) serves control.sock
+# while a client thread measures
+#   - round trips over a fresh connection per command (what `ctl` does),
+#   - round trips over one kept-open connection (an editor plugin),
+#   - push latency: a `toggle` on one connection until the change arrives
+#     at --watchers subscribed connections,
+#   - how many pushes go out while the timer runs unchanged (must be 0).
+# With --real-tk a real Tk mainloop is used (needs a display, e.g. xvfb-run).
+#
+#   python benchmarks/bench_control.py --requests 2000 --watchers 20
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+os.environ['POMODORO_DATA_DIR'] = tempfile.mkdtemp(prefix='pomodoro-bench-')  # never the user's data
+import headless_tk  # noqa: E402
+import pomodoro  # noqa: E402
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda p: round(samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1e6, 1)  # noqa: E731
+    return {'n': len(samples), 'p50_us': pick(50), 'p90_us': pick(90), 'p99_us': pick(99),
+            'max_us': round(samples[-1] * 1e6, 1)}
+
+
+class LineConn:
+    def __init__(self, path):
+        self.sock = pomodoro.control_connect(path, 10.0)
+        self.f = self.sock.makefile('rwb')
+
+    def send(self, msg):
+        self.f.write(pomodoro.ControlServer.encode(msg))
+        self.f.flush()
+
+    def recv(self):
+        return json.loads(self.f.readline())
+
+    def close(self):
+        self.f.close()
+        self.sock.close()
+
+
+def client(path, args, pushes, results):
+    try:
+        fresh = []
+        for _ in range(args.requests // 4):
+            t0 = time.perf_counter()
+            pomodoro.control_request(path, 'status')
+            fresh.append(time.perf_counter() - t0)
+        results['fresh_connection'] = percentiles(fresh)
+
+        conn = LineConn(path)
+        kept = []
+        for i in range(args.requests):
+            t0 = time.perf_counter()
+            conn.send({'cmd': 'status', 'id': i})
+            assert conn.recv()['id'] == i
+            kept.append(time.perf_counter() - t0)
+        results['kept_connection'] = percentiles(kept)
+
+        watchers = [LineConn(path) for _ in range(args.watchers)]
+        for w in watchers:
+            w.send({'cmd': 'subscribe'})
+            w.recv()
+        before = pushes()  # the timer keeps running, but nothing a client shows changes
+        time.sleep(args.idle)
+        results['pushes_while_idle'] = pushes() - before
+        push, command = [], []
+        for i in range(args.toggles):
+            t0 = time.perf_counter()
+            conn.send({'cmd': 'toggle'})
+            paused = conn.recv()['status']['paused']
+            command.append(time.perf_counter() - t0)
+            for w in watchers:
+                while w.recv()['status']['paused'] != paused:
+                    pass
+            push.append(time.perf_counter() - t0)
+        results['toggle_round_trip'] = percentiles(command)
+        results['push_to_all_watchers'] = percentiles(push)
+        for w in watchers:
+            w.close()
+        conn.close()
+    except Exception as e:  # reported, not swallowed
+        results['error'] = repr(e)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Control API latency benchmark')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--toggles', type=int, default=200)
+    parser.add_argument('--watchers', type=int, default=20)
+    parser.add_argument('--idle', type=float, default=3.0, help='seconds watched without changes')
+    parser.add_argument('--real-tk', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.real_tk:
+        import tkinter
+        root = tkinter.Tk()
+    else:
+        root = headless_tk.install(pomodoro)
+    app = pomodoro.PomodoroApp(root)
+    app.muted = True
+    app.show_notification = lambda *a: None
+    if args.real_tk:
+        root.update()  # first paint, then finish_startup
+    else:
+        root.advance(0)  # finish_startup
+    if not args.real_tk:
+        app.engine.clock = root.clock
+    if app.control is None:
+        sys.exit('control socket unavailable')
+    app.start_timer()
+
+    results = {'watchers': args.watchers}
+    worker = threading.Thread(target=client, args=(pomodoro.CONTROL_SOCKET, args, lambda: app.control.pushes, results))
+    worker.start()
+    while worker.is_alive():
+        if args.real_tk:
+            root.update()
+            time.sleep(0.0005)
+        else:
+            root.realtime(0.05)
+    results['server'] = {'requests': app.control.requests, 'pushes': app.control.pushes}
+    app.exit_app()
+    results['ok'] = 'error' not in results and results.get('pushes_while_idle') == 0
+    print(json.dumps(results, indent=2))
+    return 0 if results['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,225 @@
+# Event bus benchmark against local stand-in endpoints: an http.server
+# webhook, a Unix-socket listener and a subprocess hook.
+#
+#   throughput  N events emitted as fast as the bounded queue accepts them;
+#               events/s delivered, emit cost on the caller (Tk) thread,
+#               requests per batch
+#   latency     events at a steady --rate; emit -> acknowledged percentiles
+#   outage      the webhook is stopped, events spool to the outbox, the
+#               server comes back and the backlog is replayed; fails unless
+#               every event arrives (duplicates are allowed and reported)
+#
+#   python benchmarks/bench_events.py --events 20000 --rate 200
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+os.environ['POMODORO_DATA_DIR'] = tempfile.mkdtemp(prefix='pomodoro-bench-')  # never the user's data
+import pomodoro  # noqa: E402
+
+
+class Sink:
+    # Ids seen by one stand-in endpoint
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ids = []
+        self.requests = 0
+
+    def add(self, events):
+        with self.lock:
+            self.ids.extend(e['id'] for e in events)
+            self.requests += 1
+
+    def received(self):
+        with self.lock:
+            return list(self.ids)
+
+
+class FileSink(Sink):
+    # What the subprocess hook appended to a file
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def received(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding='utf-8') as f:
+            return [json.loads(line)['id'] for line in f]
+
+
+def start_http(sink, port=0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, as a real collector would
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            sink.add(json.loads(body)['events'])
+            self.send_response(204)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_socket(sink, path):
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+
+    def serve():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:  # listener closed
+                return
+            with conn, conn.makefile('r', encoding='utf-8') as f:
+                for line in f:
+                    sink.add([json.loads(line)])
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server
+
+
+def wait_for(cond, timeout):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def emit_burst(bus, n):
+    # As fast as the queue accepts without dropping
+    t_emit = 0.0
+    for i in range(n):
+        while len(bus.queue) >= bus.QUEUE_SIZE - 1:
+            time.sleep(0.0002)
+        t0 = time.perf_counter()
+        bus.emit('complete', phase='pomodoro', n=i)
+        t_emit += time.perf_counter() - t0
+    return t_emit
+
+
+def throughput(name, sub, sink, n, timeout):
+    bus = pomodoro.EventBus([sub], outbox_path=os.path.join(pomodoro.DATA_DIR, f'outbox-{name}.jsonl'))
+    t0 = time.perf_counter()
+    t_emit = emit_burst(bus, n)
+    ok = wait_for(lambda: bus.stats()['delivered'] >= n, timeout)
+    elapsed = time.perf_counter() - t0
+    stats = bus.stats()
+    bus.close()
+    received = len(sink.received())
+    result = {'events': n, 'delivered': received, 'events_per_s': round(received / elapsed),
+              'emit_us': round(t_emit / n * 1e6, 2), 'dropped': stats['dropped'],
+              'latency_ms': stats['latency_ms'], 'ok': ok and stats['dropped'] == 0 and len(set(sink.received())) == n}
+    if name == 'webhook':
+        result['events_per_request'] = round(received / sink.requests, 1)
+    return result
+
+
+def latency(url, rate, seconds):
+    sink = Sink()
+    server = start_http(sink, int(url.rsplit(':', 1)[1].split('/')[0]))
+    bus = pomodoro.EventBus([pomodoro.WebhookSubscriber('hook', url)],
+                            outbox_path=os.path.join(pomodoro.DATA_DIR, 'outbox-latency.jsonl'))
+    n = int(rate * seconds)
+    start = time.perf_counter()
+    for i in range(n):
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        bus.emit('start', phase='pomodoro', n=i)
+    ok = wait_for(lambda: bus.stats()['delivered'] >= n, 10)
+    stats = bus.stats()
+    bus.close()
+    server.shutdown()
+    server.server_close()
+    return {'rate': rate, 'events': n, 'latency_ms': stats['latency_ms'], 'ok': ok}
+
+
+def outage(n, timeout):
+    sink = Sink()
+    server = start_http(sink)
+    port = server.server_address[1]
+    outbox = os.path.join(pomodoro.DATA_DIR, 'outbox-outage.jsonl')
+    bus = pomodoro.EventBus([pomodoro.WebhookSubscriber('hook', f'http://127.0.0.1:{port}/events', timeout=1.0)],
+                            outbox_path=outbox)
+    bus.RETRY_MIN = 0.2
+    server.shutdown()
+    server.server_close()
+    emit_burst(bus, n)
+    spooled = wait_for(lambda: bus.stats()['spooled'] >= n, timeout)
+    outbox_kb = round(os.path.getsize(outbox) / 1024, 1) if os.path.exists(outbox) else 0
+    t0 = time.perf_counter()
+    server = start_http(sink, port)
+    ok = wait_for(lambda: len(set(sink.received())) >= n, timeout)
+    recovery = time.perf_counter() - t0
+    stats = bus.stats()
+    bus.close()
+    server.shutdown()
+    server.server_close()
+    return {'events': n, 'spooled': stats['spooled'], 'outbox_kb': outbox_kb, 'replayed': stats['replayed'],
+            'received_unique': len(set(sink.ids)), 'duplicates': len(sink.ids) - len(set(sink.ids)),
+            'recovery_s': round(recovery, 2), 'outbox_left': os.path.exists(outbox),
+            'ok': spooled and ok and not os.path.exists(outbox)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Event bus benchmark')
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--rate', type=float, default=200.0, help='events/s for the latency run')
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--subscribers', nargs='+', default=['webhook', 'socket', 'command'],
+                        choices=['webhook', 'socket', 'command'])
+    args = parser.parse_args(argv)
+    os.makedirs(pomodoro.DATA_DIR, exist_ok=True)
+
+    results = {'throughput': {}}
+    if 'webhook' in args.subscribers:
+        sink = Sink()
+        server = start_http(sink)
+        url = f'http://127.0.0.1:{server.server_address[1]}/events'
+        results['throughput']['webhook'] = throughput('webhook', pomodoro.WebhookSubscriber('hook', url), sink,
+                                                      args.events, args.timeout)
+        server.shutdown()
+        server.server_close()
+        results['latency'] = latency(url, args.rate, args.seconds)
+        results['outage'] = outage(args.events // 4, args.timeout)
+    if 'socket' in args.subscribers:
+        sink = Sink()
+        path = os.path.join(pomodoro.DATA_DIR, 'sink.sock')
+        listener = start_socket(sink, path)
+        results['throughput']['socket'] = throughput('socket', pomodoro.SocketSubscriber('sock', path), sink,
+                                                     args.events, args.timeout)
+        listener.close()
+    if 'command' in args.subscribers:
+        out = os.path.join(pomodoro.DATA_DIR, 'hook.jsonl')
+        script = f'import sys; open({out!r}, "a").write(sys.stdin.read())'
+        sub = pomodoro.CommandSubscriber('hook', [sys.executable, '-c', script])
+        n = max(1, args.events // 20)  # one process per batch
+        results['throughput']['command'] = throughput('command', sub, FileSink(out), n, args.timeout)
+    results['ok'] = all(r['ok'] for r in results['throughput'].values()) and all(
+        results[k]['ok'] for k in ('latency', 'outage') if k in results)
+    print(json.dumps(results, indent=2))
+    return 0 if results['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# History export/import benchmark: fills a store with a synthetic multi-year
+# history (two million sessions by default), streams it out as CSV, JSONL
+# and iCalendar, imports each file into a fresh store and then imports it
+# again. Reports rows/s and peak RSS growth (constant memory means it does
+# not grow with --rows). Fails unless every import reproduces the source
+# totals and the second import adds nothing.
+#
+#   python benchmarks/bench_export.py --rows 2000000 --formats csv jsonl ics
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+os.environ['POMODORO_DATA_DIR'] = tempfile.mkdtemp(prefix='pomodoro-bench-')  # never the user's data
+import bench_store  # noqa: E402
+import pomodoro  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+
+def fresh_target(root, name):
+    folder = os.path.join(root, name)
+    os.makedirs(folder)
+    store = pomodoro.SessionStore(os.path.join(folder, 'sessions.db'))
+    log = pomodoro.SessionLog(os.path.join(folder, 'sessions.jsonl'), os.path.join(folder, 'snapshot.json'))
+    return store, log
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='History export/import benchmark')
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--years', type=float, default=12)
+    parser.add_argument('--formats', nargs='+', default=['csv', 'jsonl', 'ics'], choices=sorted(pomodoro.EXPORT_FORMATS))
+    args = parser.parse_args(argv)
+
+    work = tempfile.mkdtemp(prefix='pomodoro-export-')
+    source = pomodoro.SessionStore(os.path.join(work, 'source.db'))
+    with source.conn:
+        source.conn.executemany(pomodoro.SessionStore.INSERT_SQL, bench_store.synthetic_rows(args.rows, args.years))
+    expected = source.totals()
+    baseline_rss = peak_rss_mb()
+
+    results = {'rows': args.rows, 'expected': expected, 'formats': {}}
+    ok = True
+    for fmt in args.formats:
+        path = os.path.join(work, f'history.{fmt}')
+        t0 = time.perf_counter()
+        with open(path, 'w', newline='', encoding='utf-8') as out:
+            n = pomodoro.EXPORT_FORMATS[fmt](pomodoro.export_records(source), out)
+        export_s = time.perf_counter() - t0
+
+        store, log = fresh_target(work, f'import-{fmt}')
+        t0 = time.perf_counter()
+        with open(path, newline='', encoding='utf-8') as f:
+            first = pomodoro.import_records(store, log, pomodoro.IMPORT_FORMATS[fmt](f))
+        import_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        with open(path, newline='', encoding='utf-8') as f:
+            again = pomodoro.import_records(store, log, pomodoro.IMPORT_FORMATS[fmt](f))
+        reimport_s = time.perf_counter() - t0
+        totals = store.totals()
+        log.close()
+        store.close()
+
+        fmt_ok = totals == expected and again['imported'] == 0 and log.counts == expected
+        ok = ok and fmt_ok
+        results['formats'][fmt] = {
+            'file_mb': round(os.path.getsize(path) / (1 << 20), 1),
+            'export_rows_per_s': round(n / export_s),
+            'import_rows_per_s': round(n / import_s),
+            'reimport_rows_per_s': round(n / reimport_s),
+            'first_import': first,
+            'second_import': again,
+            'totals': totals,
+            'ok': fmt_ok,
+        }
+        os.remove(path)
+    source.close()
+    peak = peak_rss_mb()
+    results['peak_rss_mb'] = {'after_seed': baseline_rss, 'after_export_import': peak}
+    results['ok'] = ok
+    print(json.dumps(results, indent=2))
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# Idle-CPU benchmark for the progress-ring animator: runs a started timer in
+# real time with the window focused, unfocused and hidden in turn, and
+# reports process CPU, ring frames per second and Tcl calls per second for
+# each mode, plus the app's own per-mode report (`RingAnimator.report`).
+# Hidden must issue no widget or canvas calls at all.
+#
+# Headless by default: callbacks run at their real times on the stand-in's
+# loop (`root.realtime`), so the CPU figures are the app's own work. With
+# --real-tk a real Tk mainloop is used (needs a display, e.g. xvfb-run).
+#
+#   python benchmarks/bench_idle_cpu.py --seconds 10 --minutes 1
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+os.environ['POMODORO_DATA_DIR'] = tempfile.mkdtemp(prefix='pomodoro-bench-')  # never the user's data
+import headless_tk  # noqa: E402
+import pomodoro  # noqa: E402
+
+DRAW_CALLS = ('config', 'itemconfig', 'coords', 'style', 'canvas_create', 'create')
+
+
+def enter_mode(app, root, mode, real_tk):
+    if mode == 'hidden':
+        root.iconify()
+        app.on_minimize(None)
+        return
+    if app.window_hidden:
+        app.show_window()
+    if not real_tk:
+        root.has_focus = mode == 'focused'
+    app.set_visibility(mode)  # a real WM may not hand out focus under xvfb
+
+
+def run(root, seconds, real_tk):
+    if not real_tk:
+        root.realtime(seconds)
+        return
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        root.update()
+        time.sleep(0.001)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Idle-CPU benchmark per window mode')
+    parser.add_argument('--seconds', type=float, default=10.0, help='measured seconds per mode')
+    parser.add_argument('--minutes', type=int, default=1, help='pomodoro length (shorter = faster arc)')
+    parser.add_argument('--budget', type=float, default=pomodoro.ANIMATION_CPU_BUDGET)
+    parser.add_argument('--real-tk', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.real_tk:
+        import tkinter
+        root = tkinter.Tk()
+    else:
+        root = headless_tk.install(pomodoro)
+    app = pomodoro.PomodoroApp(root)
+    app.muted = True
+    if args.real_tk:
+        root.update()  # first paint, then finish_startup
+    else:
+        root.advance(0)  # finish_startup
+    app.animator.budget = args.budget
+    if not args.real_tk:
+        app.engine.clock = root.clock
+    app.durations['pomodoro'] = args.minutes * 60
+    app.reset_timer()
+    app.start_timer()
+
+    results = {'pomodoro_minutes': args.minutes, 'budget': args.budget, 'modes': {}}
+    ok = True
+    for mode in ('focused', 'unfocused', 'hidden'):
+        enter_mode(app, root, mode, args.real_tk)
+        run(root, 0.5, args.real_tk)  # settle
+        headless_tk.RECORDER.reset()
+        frames = app.animator.frames[mode]
+        cpu0, wall0 = time.process_time(), time.perf_counter()
+        run(root, args.seconds, args.real_tk)
+        cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+        entry = {'cpu_percent': round(cpu / wall * 100, 3),
+                 'ring_fps': round((app.animator.frames[mode] - frames) / wall, 2)}
+        if not args.real_tk:
+            calls = headless_tk.RECORDER.calls
+            entry['tcl_calls_per_s'] = round(headless_tk.RECORDER.total() / wall, 2)
+            entry['draw_calls'] = sum(calls[k] for k in DRAW_CALLS)
+            if mode == 'hidden':
+                ok = ok and entry['draw_calls'] == 0
+        results['modes'][mode] = entry
+    enter_mode(app, root, 'focused', args.real_tk)
+    results['app_report'] = app.animator.report()
+    results['ok'] = ok
+    app.exit_app()
+    print(json.dumps(results, indent=2))
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
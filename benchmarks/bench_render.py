@@ -0,0 +1,97 @@
+# Render benchmark: Tcl calls and time per timer tick, full redraw vs. the
+# incremental WidgetRenderer path.
+#
+# "full" reproduces the old behaviour (every label/button reconfigured and the
+# ring deleted and rebuilt each second); "incremental" is the current
+# refresh_timer path. Needs a display (use `xvfb-run` on headless machines).
+#
+#   python benchmarks/bench_render.py --ticks 600
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['POMODORO_DATA_DIR'] = tempfile.mkdtemp(prefix='pomodoro-bench-')  # never the user's data
+import tkinter as tk  # noqa: E402
+import pomodoro  # noqa: E402
+
+
+class CountingTk:
+    # Proxy for the Tcl interpreter that counts every command sent to it
+    def __init__(self, tkapp):
+        self._tk = tkapp
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self._tk.call(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._tk, name)
+
+
+def full_redraw(app):
+    # The pre-renderer update_ui + draw_progress, kept here as the baseline:
+    # every label and button reconfigured, all colours re-applied and the
+    # ring deleted and rebuilt each second
+    phase = app.palette.phase(app.state)
+    app.timer_label.config(text=app.format_time(app.time_left))
+    app.emoji_label.config(text=phase.emoji)
+    app.state_label.config(text=phase.label)
+    app.counter_label.config(text=app.get_counter_text())
+    app.history_label.config(text=app.get_history_text())
+    app.daily_label.config(text=app.get_daily_text())
+    app.start_btn.config(state='disabled')
+    app.pause_btn.config(text='⏸ Pause', state='normal')
+    app.style_key = None
+    app.apply_style()
+    c = app.progress_canvas
+    c.delete('all')
+    frac = 1 - (app.time_left / app.durations[app.state])
+    app.progress_oval = c.create_oval(10, 10, 210, 210, outline=app.palette.secondary, width=10)
+    app.progress_arc = c.create_arc(10, 10, 210, 210, start=-90, extent=frac * 360, style='arc', outline=phase.color, width=10)
+    app.renderer.invalidate()
+
+
+def measure(app, counter, ticks, step):
+    app.time_left = app.durations[app.state]
+    counter.calls = 0
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        app.time_left -= 1
+        step(app)
+    elapsed = time.perf_counter() - t0
+    return {'tcl_calls_per_tick': counter.calls / ticks, 'us_per_tick': elapsed / ticks * 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render benchmark')
+    parser.add_argument('--ticks', type=int, default=600)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        sys.exit(f'No display available ({e}); run under xvfb-run.')
+    counter = CountingTk(root.tk)
+    root.tk = counter  # widgets created below inherit the counting proxy
+    app = pomodoro.PomodoroApp(root)
+    app.is_running = True
+    app.update_ui()
+    results = {
+        'full': measure(app, counter, args.ticks, full_redraw),
+        'incremental': measure(app, counter, args.ticks, lambda a: a.refresh_timer()),
+    }
+    root.destroy()
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, r in results.items():
+            print(f"{name:12s}: {r['tcl_calls_per_tick']:6.1f} Tcl calls/tick, {r['us_per_tick']:8.1f} us/tick")
+
+
+if __name__ == '__main__':
+    main()
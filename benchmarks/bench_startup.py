@@ -0,0 +1,82 @@
+# Startup benchmark: repeats cold starts in fresh interpreters and reports the
+# median of each phase, so regressions in time-to-first-frame are visible.
+#
+# Always measures `import pomodoro`. With a display (or under xvfb-run) it also
+# runs `pomodoro.py --profile-startup` and collects the per-phase breakdown.
+#
+#   python benchmarks/bench_startup.py --runs 10 [--json]
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'pomodoro.py')
+PHASE_RE = re.compile(r'^\s+(.+?)\s+([\d.]+)\s+\(t=\s*([\d.]+)\)$')
+
+
+def run_import(env):
+    code = 'import time; t=time.perf_counter(); import pomodoro; print((time.perf_counter()-t)*1000)'
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    wall = (time.perf_counter() - t0) * 1000
+    return {'import_ms': float(out.stdout.strip()), 'process_ms': wall}
+
+
+def run_profile(env):
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, SCRIPT, '--profile-startup'], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=60)
+    wall = (time.perf_counter() - t0) * 1000
+    if out.returncode != 0:
+        return None
+    phases = {}
+    for line in out.stdout.splitlines():
+        m = PHASE_RE.match(line)
+        if m:
+            phases[m.group(1)] = float(m.group(2))
+    phases['process (wall)'] = wall
+    return phases
+
+
+def median_of(runs):
+    keys = runs[0].keys()
+    return {k: round(statistics.median(r[k] for r in runs), 2) for k in keys}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup benchmark')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+    env = dict(os.environ, POMODORO_DATA_DIR=tempfile.mkdtemp(prefix='pomodoro-startup-'))
+
+    results = {'python': sys.version.split()[0], 'runs': args.runs}
+    results['import'] = median_of([run_import(env) for _ in range(args.runs)])
+    profiles = []
+    for _ in range(args.runs):
+        p = run_profile(env)
+        if p is None:
+            break
+        profiles.append(p)
+    results['startup'] = median_of(profiles) if profiles else None
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"import pomodoro      : {results['import']['import_ms']:.1f} ms "
+          f"(process {results['import']['process_ms']:.1f} ms), median of {args.runs}")
+    if results['startup'] is None:
+        print('startup profile      : skipped (no display; run under xvfb-run)')
+    else:
+        for phase, ms in results['startup'].items():
+            print(f'  {phase:<20s}: {ms:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
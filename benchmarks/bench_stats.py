@@ -0,0 +1,84 @@
+# Statistics window benchmark: seeds the store with a decade of sessions,
+# then times opening the window (rollup load + first render) and a render
+# after each further completion, and counts the Tcl calls per render.
+# Headless by default; `--real-tk` uses a real Tk (needs a display, e.g.
+# xvfb-run). Fails if opening takes longer than --target-ms.
+#
+#   python benchmarks/bench_stats.py --years 10 --per-day 12
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+os.environ['POMODORO_DATA_DIR'] = tempfile.mkdtemp(prefix='pomodoro-bench-')  # never the user's data
+import bench_store  # noqa: E402
+import headless_tk  # noqa: E402
+import pomodoro  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Statistics window benchmark')
+    parser.add_argument('--years', type=float, default=10)
+    parser.add_argument('--per-day', type=int, default=12, help='sessions per day')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--target-ms', type=float, default=100.0)
+    parser.add_argument('--real-tk', action='store_true')
+    args = parser.parse_args(argv)
+
+    rows = int(args.years * 365 * args.per_day)
+    store = pomodoro.SessionStore(pomodoro.DB_FILE)
+    with store.conn:
+        store.conn.executemany(pomodoro.SessionStore.INSERT_SQL, bench_store.synthetic_rows(rows, args.years))
+    store.close()
+
+    if args.real_tk:
+        import tkinter
+        root = tkinter.Tk()
+    else:
+        root = headless_tk.install(pomodoro)
+    app = pomodoro.PomodoroApp(root)
+    app.finish_startup()
+
+    opens = []
+    for _ in range(args.repeat):
+        app.day_stats = None
+        if app.stats_window is not None:
+            app.stats_window.destroy()
+        t0 = time.perf_counter()
+        app.open_stats()
+        if args.real_tk:
+            root.update()
+        opens.append((time.perf_counter() - t0) * 1000)
+
+    renders, calls = [], None
+    for _ in range(args.repeat):
+        if not args.real_tk:
+            headless_tk.RECORDER.reset()
+        t0 = time.perf_counter()
+        app.daily_increment('pomodoro')
+        renders.append((time.perf_counter() - t0) * 1000)
+        if not args.real_tk:
+            calls = headless_tk.RECORDER.total()
+
+    stats = app.day_stats
+    result = {
+        'sessions': rows,
+        'days': sum(1 for y in stats.years.values() for d in range(366) if y[d]),
+        'open_ms': {'best': round(min(opens), 2), 'worst': round(max(opens), 2)},
+        'render_after_completion_ms': round(min(renders), 3),
+        'tcl_calls_per_render': calls,
+        'target_ms': args.target_ms,
+        'ok': max(opens) <= args.target_ms,
+    }
+    app.exit_app()
+    print(json.dumps(result, indent=2))
+    return 0 if result['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
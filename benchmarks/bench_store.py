@@ -0,0 +1,87 @@
+# SessionStore benchmark: builds a synthetic multi-year history (one million
+# sessions by default) and times the aggregate queries the UI uses.
+#
+#   python benchmarks/bench_store.py --rows 1000000 --years 12
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['POMODORO_DATA_DIR'] = tempfile.mkdtemp(prefix='pomodoro-bench-')  # never the user's data
+from pomodoro import SessionStore  # noqa: E402
+
+KINDS = ('pomodoro', 'pomodoro', 'short', 'short', 'long')
+
+
+def synthetic_rows(n, years, seed=1):
+    rng = random.Random(seed)
+    end = time.time()
+    start = end - years * 365.25 * 86400
+    step = (end - start) / n
+    ts = start
+    for _ in range(n):
+        ts += step * rng.uniform(0.5, 1.5)
+        kind = rng.choice(KINDS)
+        outcome = 'completed' if rng.random() < 0.9 else 'skipped'
+        duration = {'pomodoro': 1500, 'short': 300, 'long': 2400}[kind]
+        yield (ts - duration, ts, datetime.date.fromtimestamp(ts).isoformat(), kind, outcome, duration)
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return round(best * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SessionStore benchmark')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--years', type=float, default=12)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix='pomodoro-store-'), 'sessions.db')
+    store = SessionStore(path)
+    t0 = time.perf_counter()
+    with store.conn:
+        store.conn.executemany(SessionStore.INSERT_SQL, synthetic_rows(args.rows, args.years))
+    load_s = time.perf_counter() - t0
+
+    today = datetime.date.today()
+    year_ago = (today - datetime.timedelta(days=365)).isoformat()
+    first = (today - datetime.timedelta(days=int(args.years * 366))).isoformat()
+    queries = {
+        'totals': lambda: store.totals(),
+        'day_totals(today)': lambda: store.day_totals(today.isoformat()),
+        'per_day(last year)': lambda: store.aggregate('day', year_ago, today.isoformat()),
+        'per_week(last year)': lambda: store.aggregate('week', year_ago, today.isoformat()),
+        'per_month(all)': lambda: store.aggregate('month', first, today.isoformat()),
+    }
+    results = {'rows': args.rows, 'years': args.years, 'load_s': round(load_s, 2), 'cold_ms': {}, 'cached_ms': {}}
+    for name, fn in queries.items():
+        results['cold_ms'][name] = timed(lambda: (store.cache.clear(), fn()), args.repeat)
+        results['cached_ms'][name] = timed(fn, args.repeat)
+    # one write invalidates the cache; time the insert itself too
+    results['insert_ms'] = timed(lambda: store.add('pomodoro', 'completed', 1500), args.repeat)
+    store.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{args.rows} sessions over {args.years} years loaded in {results['load_s']} s")
+        for name in queries:
+            print(f"  {name:22s} cold {results['cold_ms'][name]:8.3f} ms   cached {results['cached_ms'][name]:8.3f} ms")
+        print(f"  insert                 {results['insert_ms']:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# Theme-switch benchmark: time and Tcl calls for toggling dark mode and for
+# a phase change, with the statistics window open and closed. Widgets are
+# bound to named ttk styles, so a switch should cost a handful of style
+# configures and no per-widget `config` calls.
+#
+# Runs on the headless stand-in (calls counted by kind) or, with --real-tk,
+# on a real Tk with every Tcl command counted (needs a display, e.g. xvfb-run).
+#
+#   python benchmarks/bench_theme.py --switches 200
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+os.environ['POMODORO_DATA_DIR'] = tempfile.mkdtemp(prefix='pomodoro-bench-')  # never the user's data
+import headless_tk  # noqa: E402
+import pomodoro  # noqa: E402
+
+
+def measure(app, counter, switches, step):
+    calls = []
+    t0 = time.perf_counter()
+    for i in range(switches):
+        before = counter()
+        step(app, i)
+        calls.append(counter() - before)
+    elapsed = time.perf_counter() - t0
+    return {'us_per_switch': round(elapsed / switches * 1e6, 1),
+            'tcl_calls_per_switch': round(sum(calls) / len(calls), 1)}
+
+
+def toggle_dark(app, i):
+    app.dark_mode_var.set(i % 2 == 0)
+    app.toggle_dark_mode()
+
+
+def next_phase(app, i):
+    app.skip_timer()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Theme-switch benchmark')
+    parser.add_argument('--switches', type=int, default=200)
+    parser.add_argument('--real-tk', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.real_tk:
+        import tkinter
+        from bench_render import CountingTk
+        root = tkinter.Tk()
+        proxy = CountingTk(root.tk)
+        root.tk = proxy
+
+        def counter():
+            return proxy.calls
+    else:
+        root = headless_tk.install(pomodoro)
+
+        def counter():
+            return headless_tk.RECORDER.total()
+    app = pomodoro.PomodoroApp(root)
+    app.finish_startup()
+    app.writer.debounce = 3600  # keep settings writes out of the timing
+
+    results = {
+        'dark_toggle': measure(app, counter, args.switches, toggle_dark),
+        'phase_change': measure(app, counter, args.switches, next_phase),
+    }
+    app.open_stats()
+    results['dark_toggle_stats_open'] = measure(app, counter, args.switches, toggle_dark)
+    if not args.real_tk:
+        headless_tk.RECORDER.reset()
+        toggle_dark(app, 0)
+        results['calls_by_kind_per_toggle'] = dict(headless_tk.RECORDER.calls)
+    app.writer.debounce = 0
+    app.exit_app()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# Timer drift benchmark: legacy `after(1000)` decrement chain vs TimerEngine.
+#
+# Runs both loops against the real monotonic clock with simulated per-tick
+# UI work (update_ui/draw_progress cost) and optional CPU contention from
+# busy worker processes, then prints how late each session really ended.
+#
+#   python benchmarks/bench_timer_drift.py --seconds 30 --work-ms 15 --burners 4
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pomodoro import TimerEngine  # noqa: E402
+
+
+def burn(stop_at):
+    # CPU contention: spin until the deadline
+    while time.monotonic() < stop_at:
+        pass
+
+
+def simulate_work(work_ms, jitter_ms):
+    # Busy-wait to mimic Tk redraw cost plus occasional GC-like pauses
+    cost = work_ms + random.uniform(0, jitter_ms)
+    end = time.perf_counter() + cost / 1000.0
+    while time.perf_counter() < end:
+        pass
+
+
+def run_legacy(seconds, work_ms, jitter_ms):
+    # Mirrors the old run_timer: decrement, redraw, then sleep a fixed 1000 ms
+    start = time.monotonic()
+    time_left = seconds
+    while time_left > 0:
+        time_left -= 1
+        simulate_work(work_ms, jitter_ms)
+        time.sleep(1.0)
+    elapsed = time.monotonic() - start
+    return {'elapsed': round(elapsed, 4), 'drift_ms': round((elapsed - seconds) * 1000, 2)}
+
+
+def run_engine(seconds, work_ms, jitter_ms):
+    engine = TimerEngine()
+    engine.load(seconds)
+    engine.start()
+    while True:
+        left = engine.tick()
+        simulate_work(work_ms, jitter_ms)
+        if left <= 0:
+            break
+        time.sleep(engine.next_wakeup_ms() / 1000.0)
+    return engine.finish()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Timer drift benchmark')
+    parser.add_argument('--seconds', type=int, default=20, help='session length in seconds')
+    parser.add_argument('--work-ms', type=float, default=15.0, help='simulated UI work per tick')
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help='random extra work per tick')
+    parser.add_argument('--burners', type=int, default=0, help='busy processes for CPU contention')
+    parser.add_argument('--json', action='store_true', help='print machine-readable output')
+    args = parser.parse_args()
+
+    procs = []
+    if args.burners:
+        stop_at = time.monotonic() + 2 * args.seconds + 30
+        for _ in range(args.burners):
+            p = multiprocessing.Process(target=burn, args=(stop_at,), daemon=True)
+            p.start()
+            procs.append(p)
+    try:
+        results = {
+            'config': vars(args),
+            'legacy': run_legacy(args.seconds, args.work_ms, args.jitter_ms),
+            'engine': run_engine(args.seconds, args.work_ms, args.jitter_ms),
+        }
+    finally:
+        for p in procs:
+            p.terminate()
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"session length : {args.seconds} s, work {args.work_ms}+{args.jitter_ms} ms/tick, burners {args.burners}")
+        print(f"legacy chain   : drift {results['legacy']['drift_ms']:.1f} ms")
+        e = results['engine']
+        print(f"TimerEngine    : drift {e['drift_ms']:.1f} ms (end late {e['end_late_ms']:.1f} ms, "
+              f"ticks {e['ticks']}, tick late mean {e['mean_tick_late_ms']:.1f} / max {e['max_tick_late_ms']:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
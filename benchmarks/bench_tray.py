@@ -0,0 +1,79 @@
+# Tray icon benchmark: a long idle run in the tray, one tick per simulated
+# second, comparing a fresh PIL image per update with TrayFrameCache.
+# Reports frames rendered, icon swaps, CPU time and memory (tracemalloc).
+# Needs Pillow.
+#
+#   python benchmarks/bench_tray.py --hours 24
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['POMODORO_DATA_DIR'] = tempfile.mkdtemp(prefix='pomodoro-bench-')  # never the user's data
+import pomodoro  # noqa: E402
+
+
+def phases(seconds, durations, interval=4):
+    # Yields (state, remaining, total) for every simulated second
+    state, count, t = 'pomodoro', 0, 0
+    while t < seconds:
+        total = durations[state]
+        for remaining in range(total, 0, -1):
+            yield state, remaining, total
+            t += 1
+            if t >= seconds:
+                return
+        state, count = pomodoro.next_phase(state, count, interval)
+
+
+def run(mode, seconds, Image, ImageDraw):
+    durations = {'pomodoro': 25 * 60, 'short': 5 * 60, 'long': 40 * 60}
+    cache = pomodoro.TrayFrameCache(Image, ImageDraw)
+    shown = None
+    swaps = 0
+    tracemalloc.start()
+    cpu0 = time.process_time()
+    for state, remaining, total in phases(seconds, durations):
+        key = cache.key_for(state, pomodoro.PALETTES['light'], remaining, total)
+        if mode == 'naive':
+            cache.render(*key)  # new image every tick, like redrawing per update
+            swaps += 1
+        elif key != shown:
+            shown = key
+            cache.frame(key)
+            swaps += 1
+    cpu = time.process_time() - cpu0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'ticks': seconds, 'renders': cache.renders, 'icon_updates': swaps,
+            'cpu_s': round(cpu, 3), 'cpu_us_per_tick': round(cpu / seconds * 1e6, 2),
+            'mem_current_kb': round(current / 1024, 1), 'mem_peak_kb': round(peak / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tray icon benchmark')
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+    Image = pomodoro.optional_import('PIL.Image')
+    ImageDraw = pomodoro.optional_import('PIL.ImageDraw')
+    if not (Image and ImageDraw):
+        sys.exit('Pillow is not installed (pip install pillow).')
+    seconds = int(args.hours * 3600)
+    results = {'hours': args.hours, 'naive': run('naive', seconds, Image, ImageDraw),
+               'cached': run('cached', seconds, Image, ImageDraw)}
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name in ('naive', 'cached'):
+            r = results[name]
+            print(f"{name:7s}: {r['renders']:7d} renders, {r['icon_updates']:7d} icon updates, "
+                  f"{r['cpu_us_per_tick']:8.2f} us/tick CPU, peak {r['mem_peak_kb']:8.1f} KiB, held {r['mem_current_kb']:8.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,439 @@
+# Headless stand-in for the parts of tkinter (and ttk) that PomodoroApp uses.
+#
+# Widgets accept the same calls as Tk but only record them: every call that
+# would become a Tcl command is counted per kind, live widgets and canvas
+# items are tracked so leaks show up, and `after` callbacks run against a
+# virtual clock advanced with `root.advance(seconds)`.
+#
+#   import headless_tk, pomodoro
+#   root = headless_tk.install(pomodoro)     # swaps pomodoro.tk for this module
+#   app = pomodoro.PomodoroApp(root)
+#   app.engine.clock = root.clock
+#   root.advance(60)
+import collections
+import heapq
+import itertools
+import sys
+import threading
+import time
+import types
+
+
+class TclError(Exception):
+    pass
+
+
+class Recorder:
+    # Counts would-be Tcl commands by kind and tracks live objects
+    def __init__(self):
+        self.calls = collections.Counter()
+        self.live_widgets = 0
+        self.widgets_created = 0
+        self.toplevels_created = 0
+        self.live_items = 0
+
+    def total(self):
+        return sum(self.calls.values())
+
+    def reset(self):
+        self.calls.clear()
+
+
+RECORDER = Recorder()
+
+
+class Widget:
+    def __init__(self, master=None, *args, **kw):
+        self.master = master
+        self.options = dict(kw)
+        self.children = []
+        self.destroyed = False
+        self.bindings = {}
+        if master is not None:
+            master.children.append(self)
+        RECORDER.widgets_created += 1
+        RECORDER.live_widgets += 1
+        RECORDER.calls['create'] += 1
+
+    # Geometry management
+    def pack(self, *a, **kw):
+        RECORDER.calls['geometry'] += 1
+
+    def grid(self, *a, **kw):
+        RECORDER.calls['geometry'] += 1
+
+    def place(self, *a, **kw):
+        RECORDER.calls['geometry'] += 1
+
+    def pack_forget(self):
+        RECORDER.calls['geometry'] += 1
+
+    def place_forget(self):
+        RECORDER.calls['geometry'] += 1
+
+    # Options
+    def config(self, cnf=None, **kw):
+        RECORDER.calls['config'] += 1
+        if cnf:
+            kw.update(cnf)
+        self.options.update(kw)
+
+    configure = config
+
+    def cget(self, key):
+        return self.options.get(key)
+
+    def __getitem__(self, key):
+        return self.options.get(key)
+
+    def bind(self, sequence=None, func=None, add=None):
+        RECORDER.calls['bind'] += 1
+        self.bindings[sequence] = func
+
+    def lift(self, *a):
+        RECORDER.calls['window'] += 1
+
+    def focus_force(self):
+        RECORDER.calls['window'] += 1
+
+    def focus_get(self):
+        root = self.winfo_toplevel()
+        while root.master is not None:
+            root = root.master.winfo_toplevel()
+        return root if root.has_focus else None
+
+    def winfo_exists(self):
+        return 0 if self.destroyed else 1
+
+    def winfo_toplevel(self):
+        w = self
+        while w.master is not None and not isinstance(w, Toplevel):
+            w = w.master
+        return w
+
+    def after(self, ms, func=None, *args):
+        return self.winfo_toplevel().after(ms, func, *args)
+
+    def after_cancel(self, ident):
+        return self.winfo_toplevel().after_cancel(ident)
+
+    def destroy(self):
+        if self.destroyed:
+            return
+        for child in list(self.children):
+            child.destroy()
+        self.destroyed = True
+        RECORDER.live_widgets -= 1
+        RECORDER.calls['destroy'] += 1
+        if self.master is not None and self in self.master.children:
+            self.master.children.remove(self)
+
+
+class Frame(Widget):
+    pass
+
+
+class Label(Widget):
+    pass
+
+
+class Button(Widget):
+    pass
+
+
+class Spinbox(Widget):
+    pass
+
+
+class Checkbutton(Widget):
+    pass
+
+
+class Scale(Widget):
+    pass
+
+
+class OptionMenu(Widget):
+    def __init__(self, master, variable, value, *values, **kw):
+        super().__init__(master, **kw)
+        self.variable = variable
+
+
+class Canvas(Widget):
+    def __init__(self, master=None, **kw):
+        super().__init__(master, **kw)
+        self.items = {}
+        self.ids = itertools.count(1)
+
+    def _create(self, kind, coords, kw):
+        RECORDER.calls['canvas_create'] += 1
+        RECORDER.live_items += 1
+        item = next(self.ids)
+        self.items[item] = {'kind': kind, 'coords': coords, **kw}
+        return item
+
+    def create_oval(self, *coords, **kw):
+        return self._create('oval', coords, kw)
+
+    def create_arc(self, *coords, **kw):
+        return self._create('arc', coords, kw)
+
+    def create_rectangle(self, *coords, **kw):
+        return self._create('rectangle', coords, kw)
+
+    def create_text(self, *coords, **kw):
+        return self._create('text', coords, kw)
+
+    def create_image(self, *coords, **kw):
+        return self._create('image', coords, kw)
+
+    def find(self, item):
+        # Item ids, or every item carrying a tag
+        if isinstance(item, str):
+            return [i for i, opts in self.items.items() if item in str(opts.get('tags', '')).split()]
+        return [item]
+
+    def itemconfig(self, item, **kw):
+        RECORDER.calls['itemconfig'] += 1
+        for i in self.find(item):
+            self.items[i].update(kw)
+
+    itemconfigure = itemconfig
+
+    def coords(self, item, *coords):
+        RECORDER.calls['coords'] += 1
+        self.items[item]['coords'] = coords
+
+    def delete(self, *items):
+        RECORDER.calls['canvas_delete'] += 1
+        if 'all' in items:
+            items = list(self.items)
+        for item in items:
+            for i in self.find(item):
+                if self.items.pop(i, None) is not None:
+                    RECORDER.live_items -= 1
+
+    def destroy(self):
+        RECORDER.live_items -= len(self.items)
+        self.items.clear()
+        super().destroy()
+
+
+class PhotoImage:
+    def __init__(self, master=None, width=0, height=0, **kw):
+        self.width, self.height = width, height
+        RECORDER.calls['image_create'] += 1
+
+    def put(self, data, to=None):
+        RECORDER.calls['image_put'] += 1
+
+    def zoom(self, x, y=None):
+        RECORDER.calls['image_zoom'] += 1
+        return PhotoImage(width=self.width * x, height=self.height * (y or x))
+
+
+class Style:
+    # ttk.Style: every configure/map is one Tcl command
+    def __init__(self, master=None):
+        self.styles = collections.defaultdict(dict)
+
+    def configure(self, style, query_opt=None, **kw):
+        RECORDER.calls['style'] += 1
+        self.styles[style].update(kw)
+
+    def map(self, style, query_opt=None, **kw):
+        RECORDER.calls['style'] += 1
+
+    def lookup(self, style, option, state=None, default=None):
+        return self.styles.get(style, {}).get(option, default)
+
+    def theme_use(self, name=None):
+        RECORDER.calls['style'] += 1
+        return 'clam'
+
+
+class Variable:
+    def __init__(self, master=None, value=None, name=None):
+        self.value = value
+        self.traces = []
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+        for cb in self.traces:
+            cb()
+
+
+class IntVar(Variable):
+    pass
+
+
+class BooleanVar(Variable):
+    pass
+
+
+class StringVar(Variable):
+    pass
+
+
+class DoubleVar(Variable):
+    pass
+
+
+class Toplevel(Widget):
+    def __init__(self, master=None, **kw):
+        super().__init__(master, **kw)
+        RECORDER.toplevels_created += 1
+        self.window_state = 'normal'
+
+    def title(self, *a):
+        RECORDER.calls['window'] += 1
+
+    def geometry(self, *a):
+        RECORDER.calls['window'] += 1
+
+    def minsize(self, *a):
+        RECORDER.calls['window'] += 1
+
+    def resizable(self, *a):
+        RECORDER.calls['window'] += 1
+
+    def protocol(self, *a):
+        RECORDER.calls['window'] += 1
+
+    def attributes(self, *a):
+        RECORDER.calls['window'] += 1
+
+    def transient(self, *a):
+        RECORDER.calls['window'] += 1
+
+    def withdraw(self):
+        RECORDER.calls['window'] += 1
+        self.window_state = 'withdrawn'
+
+    def deiconify(self):
+        RECORDER.calls['window'] += 1
+        self.window_state = 'normal'
+
+    def iconify(self):
+        RECORDER.calls['window'] += 1
+        self.window_state = 'iconic'
+
+    def state(self):
+        return self.window_state
+
+    def winfo_viewable(self):
+        return 1 if self.window_state == 'normal' else 0
+
+    def update_idletasks(self):
+        pass
+
+
+class Tk(Toplevel):
+    # Root window with a virtual-time event loop
+    def __init__(self, *a, **kw):
+        super().__init__(None)
+        RECORDER.toplevels_created -= 1  # only count Toplevels the app creates
+        self.now = 0.0
+        self.queue = []
+        self.seq = itertools.count()
+        self.cancelled = set()
+        self.wakeup = threading.Condition()  # after() may be called from other threads, as with real Tk
+        self.has_focus = True  # what focus_get() reports; set False to simulate another app in front
+
+    def clock(self):
+        return self.now
+
+    def winfo_screenwidth(self):
+        return 1920
+
+    def winfo_screenheight(self):
+        return 1080
+
+    def winfo_toplevel(self):
+        return self
+
+    def after(self, ms, func=None, *args):
+        RECORDER.calls['after'] += 1
+        with self.wakeup:
+            ident = f'after#{next(self.seq)}'
+            heapq.heappush(self.queue, (self.now + ms / 1000.0, ident, func, args))
+            self.wakeup.notify()
+        return ident
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, ident):
+        RECORDER.calls['after_cancel'] += 1
+        self.cancelled.add(ident)
+
+    def pending(self):
+        return len(self.queue) - len(self.cancelled)
+
+    def advance(self, seconds):
+        # Run every callback due within the next `seconds` of virtual time
+        end = self.now + seconds
+        while True:
+            with self.wakeup:
+                if not (self.queue and self.queue[0][0] <= end):
+                    break
+                when, ident, func, args = heapq.heappop(self.queue)
+            if ident in self.cancelled:
+                self.cancelled.discard(ident)
+                continue
+            self.now = max(self.now, when)
+            func(*args)
+        self.now = end
+
+    def realtime(self, seconds):
+        # Like advance(), but sleeps in between so callbacks run at their
+        # real times; process CPU measured around it is the app's own cost
+        # plus this loop's. Use it with `app.engine.clock = root.clock`.
+        start = time.monotonic() - self.now
+        end = self.now + seconds
+        while True:
+            with self.wakeup:
+                due = min(self.queue[0][0] if self.queue else end, end)
+                delay = due - (time.monotonic() - start)
+                if delay > 0:
+                    self.wakeup.wait(delay)  # woken early by after() from another thread
+                    continue
+            self.advance(max(0.0, min(end, time.monotonic() - start) - self.now))
+            if self.now >= end:
+                return
+
+    def mainloop(self):
+        pass
+
+    def destroy(self):
+        self.queue.clear()
+        super().destroy()
+
+
+TTK_NAMES = ('Frame', 'Label', 'Button', 'Checkbutton', 'Spinbox', 'OptionMenu', 'Scale', 'Style')
+
+
+def _module():
+    mod = types.ModuleType('headless_tkinter')
+    for name, value in globals().items():
+        if not name.startswith('_'):
+            setattr(mod, name, value)
+    mod.ttk = types.ModuleType('headless_ttk')
+    for name in TTK_NAMES:
+        setattr(mod.ttk, name, globals()[name])
+    return mod
+
+
+def install(app_module):
+    # Point the app module's `tk` and `ttk` at this stand-in and return a fresh root
+    mod = _module()
+    app_module.tk = mod
+    app_module.ttk = mod.ttk
+    return Tk()
+
+
+if __name__ == '__main__':
+    sys.exit('headless_tk is a library for the benchmark scripts')
@@ -0,0 +1,111 @@
+# Load test for `pomodoro.py --serve`: many concurrent timers in one asyncio
+# process, all expiring through the server's single deadline heap.
+#
+# Timers get second-scale durations (bypassing the minute LIMITS, which is
+# fine for a load test) and auto-start, so the run churns through hundreds to
+# thousands of expirations per second, far above what minute-long phases
+# produce. Reports expiry latency percentiles, CPU use and HTTP API request
+# throughput.
+#
+#   python benchmarks/load_test_server.py --timers 10000 --seconds 20
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['POMODORO_DATA_DIR'] = tempfile.mkdtemp(prefix='pomodoro-serve-')  # never the user's data
+import pomodoro  # noqa: E402
+
+
+async def http_client(port, users, stop_at, counts):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    rng = random.Random()
+    try:
+        while time.monotonic() < stop_at:
+            user = rng.choice(users)
+            action = rng.choice(['status', 'status', 'status', 'pause', 'pause'])
+            if action == 'status':
+                req = f'GET /timers/{user} HTTP/1.1\r\nHost: x\r\n\r\n'
+            else:
+                req = f'POST /timers/{user}/{action} HTTP/1.1\r\nHost: x\r\nContent-Length: 0\r\n\r\n'
+            t0 = time.perf_counter()
+            writer.write(req.encode())
+            await writer.drain()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':')[1])
+            await reader.readexactly(length)
+            counts['requests'] += 1
+            counts['latency'].append(time.perf_counter() - t0)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    server = pomodoro.TimerServer(persist=not args.no_persist)
+    rng = random.Random(1)
+    users = [f'user{i:05d}' for i in range(args.timers)]
+    for user in users:
+        timer = server.get_timer(user)
+        timer.durations = {k: rng.uniform(args.min_duration, args.max_duration) for k in ('pomodoro', 'short', 'long')}
+        timer.auto_start = True
+        timer.engine.load(rng.uniform(0.1, args.max_duration))
+        timer.engine.start()
+        server.schedule(timer)
+
+    tcp = await asyncio.start_server(server.handle_client, '127.0.0.1', 0)
+    port = tcp.sockets[0].getsockname()[1]
+    expiry = asyncio.ensure_future(server.run_expiry())
+    counts = {'requests': 0, 'latency': []}
+    cpu0, wall0 = time.process_time(), time.monotonic()
+    stop_at = wall0 + args.seconds
+    clients = [asyncio.ensure_future(http_client(port, users, stop_at, counts)) for _ in range(args.clients)]
+    await asyncio.sleep(args.seconds)
+    await asyncio.gather(*clients)
+    cpu, wall = time.process_time() - cpu0, time.monotonic() - wall0
+    expiry.cancel()
+    tcp.close()
+    if server.writer:
+        server.writer.close()
+
+    stats = server.stats()
+    lat = sorted(counts['latency']) or [0.0]
+    return {
+        'timers': args.timers, 'seconds': round(wall, 2),
+        'expirations': stats['expired'], 'expirations_per_s': round(stats['expired'] / wall, 1),
+        'expiry_latency_ms': stats['expiry_latency_ms'],
+        'cpu_percent': round(cpu / wall * 100, 1),
+        'http_requests_per_s': round(counts['requests'] / wall, 1),
+        'http_latency_ms': {'p50': round(lat[len(lat) // 2] * 1000, 3), 'p99': round(lat[int(len(lat) * 0.99)] * 1000, 3)},
+        'writes': stats['writes'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless server load test')
+    parser.add_argument('--timers', type=int, default=10000)
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--min-duration', type=float, default=5.0, help='shortest phase in seconds')
+    parser.add_argument('--max-duration', type=float, default=30.0, help='longest phase in seconds')
+    parser.add_argument('--clients', type=int, default=4, help='concurrent keep-alive HTTP clients')
+    parser.add_argument('--no-persist', action='store_true', help='skip per-user state files')
+    parser.add_argument('--target-ms', type=float, default=10.0, help='p99 expiry latency target')
+    args = parser.parse_args()
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+    p99 = results['expiry_latency_ms']['p99'] or 0.0
+    print(f"p99 expiry latency {p99:.2f} ms ({'OK' if p99 <= args.target_ms else 'ABOVE'} target {args.target_ms} ms)")
+    sys.exit(0 if p99 <= args.target_ms else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+# Virtual-clock simulation: runs the real PomodoroApp on the headless
+# stand-in with no mainloop, both clocks virtual (the engine's monotonic
+# clock and the wall clock behind the schedule, session timestamps and
+# today's date), and replays a script of user behaviour over simulated
+# days: starts, pauses, skips, Spinbox changes, auto-start and long-break
+# interval changes, laptop suspends and app restarts. Workdays sometimes
+# run past midnight, so rollovers happen with a timer running.
+#
+# The script is generated from --seed (or read with --script, and written
+# with --dump-script) as JSON lines: {"t": epoch seconds, "do": action, ...}.
+#
+# Invariants, checked while it runs:
+#   - every phase transition follows the long_break_interval cadence
+#   - the session log (history + unflushed counters) and the SQLite store
+#     hold exactly the completions the app announced
+#   - today's counts are yesterday's 1 ms before each local midnight and
+#     reset 1 ms after it, with the window hidden and nothing else running
+#   - after each restart, history, store, today's counts and the daily
+#     counts in settings.json match
+#   - at the end, the store's per-day rollups match for every day
+# Reports simulated seconds per real second and completed cycles per second.
+#
+# Hidden (minimised, no tray backend) by default, so the timer wakes once
+# per phase; --visible keeps an unfocused window with per-second ticks.
+#
+#   python benchmarks/simulate.py --days 365 --seed 1
+#   TZ=Europe/Berlin python benchmarks/simulate.py --days 730   # DST days
+import argparse
+import collections
+import datetime
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+# Always a fresh data folder: the checks count from an empty history
+os.environ['POMODORO_DATA_DIR'] = tempfile.mkdtemp(prefix='pomodoro-sim-')
+os.environ.setdefault('POMODORO_AUDIO', 'null')
+import headless_tk  # noqa: E402
+import pomodoro  # noqa: E402
+
+KINDS = ('pomodoro', 'short', 'long')
+ACTIONS = {  # weights for the actions sprinkled over a workday
+    'start': 50, 'pause': 12, 'skip': 8, 'duration': 6, 'interval': 3, 'auto': 3, 'restart': 3, 'suspend': 2,
+}
+
+
+def local_midnight(day):
+    return datetime.datetime.combine(day, datetime.time()).timestamp()
+
+
+def make_script(start, days, seed):
+    # A seeded workday model; every action is stamped with its wall time
+    rng = random.Random(seed)
+    names, weights = list(ACTIONS), list(ACTIONS.values())
+    script = []
+    for d in range(days):
+        day = start + datetime.timedelta(days=d)
+        if rng.random() > (0.9 if day.weekday() < 5 else 0.25):
+            continue
+        day0 = local_midnight(day)
+        t = day0 + rng.uniform(7.5, 10) * 3600
+        late = rng.random() < 0.15
+        end = day0 + (rng.uniform(23.5, 25.5) if late else rng.uniform(16, 19)) * 3600
+        script.append({'t': t, 'do': 'auto', 'on': rng.random() < 0.5})
+        script.append({'t': t + 1, 'do': 'start'})
+        t += 1
+        while True:
+            t += rng.expovariate(1 / 600.0)
+            if t >= end:
+                break
+            action = rng.choices(names, weights)[0]
+            step = {'t': t, 'do': action}
+            if action == 'pause':
+                script.append(step)
+                t += rng.uniform(60, 900)
+                step = {'t': t, 'do': 'resume'}
+            elif action == 'duration':
+                key = rng.choice(KINDS)
+                step.update(key=key, minutes=rng.randint(*pomodoro.LIMITS[key]))
+            elif action == 'interval':
+                step['n'] = rng.randint(*pomodoro.LONG_BREAK_RANGE)
+            elif action == 'auto':
+                step['on'] = rng.random() < 0.5
+            elif action == 'suspend':
+                # Kept clear of midnight, like a lunch-time lid close
+                seconds = rng.uniform(300, 3600)
+                if t + seconds > day0 + 22 * 3600:
+                    continue
+                step['seconds'] = seconds
+                t += seconds
+            script.append(step)
+        script.append({'t': end, 'do': 'reset'})
+    return script
+
+
+class Simulation:
+    def __init__(self, epoch, visible):
+        self.epoch = epoch  # wall time at virtual clock 0
+        self.visible = visible
+        self.elapsed = 0.0  # virtual monotonic seconds, carried over restarts
+        self.suspended = 0.0  # wall seconds that passed with the monotonic clock stopped
+        self.root = self.app = None
+        self.totals = collections.Counter()  # completions announced by the app
+        self.days = collections.defaultdict(collections.Counter)
+        self.stats = collections.Counter()
+        self.failures = []
+
+    def wall(self):
+        return self.epoch + self.suspended + self.root.now
+
+    def check(self, ok, message):
+        self.stats['checks'] += 1
+        if not ok:
+            self.stats['failures'] += 1
+            if len(self.failures) < 20:
+                self.failures.append(f'{datetime.datetime.fromtimestamp(self.wall()).isoformat()} {message}')
+
+    # --- App lifecycle ---
+    def open(self):
+        root = headless_tk.install(pomodoro)
+        root.now = self.elapsed
+        app = pomodoro.PomodoroApp(root, clock=root.clock, wall_clock=lambda: self.epoch + self.suspended + root.now)
+        self.root, self.app = root, app
+        app.open_control = lambda: None  # not under test; its shutdown poll adds 0.5 s to every restart
+        root.advance(0)  # finish_startup
+        if self.visible:
+            root.has_focus = False
+            app.set_visibility('unfocused')
+        else:
+            root.iconify()
+            app.on_minimize(None)
+        self.observe(app)
+        self.check_persisted()
+
+    def close(self):
+        self.elapsed = self.root.now
+        self.app.exit_app()
+        today = datetime.date.fromtimestamp(self.wall()).isoformat()
+        with open(pomodoro.SETTINGS_FILE, encoding='utf-8') as f:
+            saved = json.load(f)['daily_counts']
+        if saved['date'] == today:
+            self.check(self.counts(saved) == self.counts(self.days[today]), f'settings.json daily counts {saved}')
+
+    def restart(self):
+        self.close()
+        self.open()
+        self.stats['restarts'] += 1
+
+    def observe(self, app):
+        # The app's outbound events are the record of what it completed;
+        # transitions are checked against the long-break cadence
+        emit, transition = app.emit_event, app.transition_state
+
+        def emit_event(kind, **fields):
+            if kind == 'complete':
+                phase = fields.get('phase', app.state)
+                self.totals[phase] += 1
+                self.days[datetime.date.fromtimestamp(fields['ended']).isoformat()][phase] += 1
+                self.stats['cycles'] += 1
+                self.stats['caught_up'] += bool(fields.get('caught_up'))
+            emit(kind, **fields)
+
+        def transition_state():
+            state, count, interval = app.state, app.pomodoro_count, app.long_break_interval
+            transition()
+            if state == 'pomodoro':
+                want = ('long' if (count + 1) % interval == 0 else 'short', count + 1)
+            else:
+                want = ('pomodoro', count)
+            self.check((app.state, app.pomodoro_count) == want,
+                       f'{state}#{count} (every {interval}) -> {app.state}#{app.pomodoro_count}, want {want}')
+            self.stats['long_breaks'] += app.state == 'long'
+
+        app.emit_event, app.transition_state = emit_event, transition_state
+
+    # --- Invariants ---
+    @staticmethod
+    def counts(d):
+        return {k: d.get(k, 0) for k in KINDS}
+
+    def check_counters(self):
+        app = self.app
+        logged = {k: app.history.get(k, 0) + app.counters[k] for k in KINDS}
+        self.check(logged == self.counts(self.totals), f'session log {logged} != {dict(self.totals)}')
+
+    def check_persisted(self):
+        app = self.app
+        self.check_counters()
+        if app.store:
+            stored = app.store.totals()
+            self.check(self.counts(stored) == self.counts(self.totals), f'store totals {stored}')
+        today, daily = app.today_str(), app.today_counts()
+        self.check(daily.get('date') == today and self.counts(daily) == self.counts(self.days[today]),
+                   f'daily counts after restart {daily}')
+
+    def check_today(self, label):
+        today = datetime.date.fromtimestamp(self.wall()).isoformat()
+        daily = self.app.today_counts()
+        self.check(daily.get('date') == today and self.counts(daily) == self.counts(self.days[today]),
+                   f'{label}: {daily}, want {today} {self.counts(self.days[today])}')
+        self.check_counters()
+        self.stats['midnight_checks'] += 1
+
+    def check_days(self):
+        store = self.app.store
+        if not store or not self.days:
+            return
+        rows = collections.defaultdict(collections.Counter)
+        for day, kind, count, _ in store.aggregate('day', min(self.days), max(self.days)):
+            rows[day][kind] = int(count)
+        for day in sorted(set(self.days) | set(rows)):
+            self.check(self.counts(rows[day]) == self.counts(self.days[day]),
+                       f'store {day} {dict(rows[day])} != {dict(self.days[day])}')
+
+    # --- Script replay ---
+    def run_until(self, ts):
+        self.root.advance(max(0.0, ts - self.wall()))
+
+    def apply(self, step):
+        app, action = self.app, step['do']
+        if action == 'start':
+            app.start_timer()
+        elif action == 'pause':
+            if app.is_running and not app.is_paused:
+                app.pause_timer()
+        elif action == 'resume':
+            if app.is_paused:
+                app.pause_timer()
+        elif action == 'skip':
+            app.skip_timer()
+        elif action == 'reset':
+            app.reset_timer()
+        elif action == 'duration':  # what the Spinbox arrows do
+            var = getattr(app, f"{step['key']}_var")
+            var.set(step['minutes'])
+            app.set_duration(step['key'], var)
+        elif action == 'interval':
+            app.long_break_var.set(step['n'])
+            app.update_long_break_interval()
+        elif action == 'auto':
+            app.auto_start_var.set(step['on'])
+            app.toggle_auto_start()
+        elif action == 'restart':
+            self.restart()
+        elif action == 'suspend':
+            # The wall clock moves on while the monotonic clock and the
+            # after() chain stand still
+            self.suspended += step['seconds']
+        else:
+            raise ValueError(f'unknown action {action!r}')
+        self.stats[action] += 1
+
+    def run(self, script, end):
+        # Script steps interleaved with probes 1 ms either side of every local midnight
+        probes = []
+        day = datetime.date.fromtimestamp(self.wall()) + datetime.timedelta(days=1)
+        while local_midnight(day) < end:
+            probes += [(local_midnight(day) - 0.001, 0, 'before midnight'), (local_midnight(day) + 0.001, 0, 'after midnight')]
+            day += datetime.timedelta(days=1)
+        steps = sorted([(s['t'], 1, s) for s in script] + probes, key=lambda e: (e[0], e[1]))
+        for ts, kind, step in steps:
+            self.run_until(ts)
+            if kind:
+                self.apply(step)
+            else:
+                self.check_today(step)
+        self.run_until(end)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Virtual-clock simulation of PomodoroApp')
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--start', default='2026-01-05', help='first simulated day (local time)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--script', help='replay a JSON-lines script instead of generating one')
+    parser.add_argument('--dump-script', help='write the generated script here')
+    parser.add_argument('--visible', action='store_true', help='unfocused window: one tick per second')
+    args = parser.parse_args(argv)
+
+    start = datetime.date.fromisoformat(args.start)
+    if args.script:
+        with open(args.script, encoding='utf-8') as f:
+            script = [json.loads(line) for line in f if line.strip()]
+        start = datetime.date.fromtimestamp(min(s['t'] for s in script)) if script else start
+    else:
+        script = make_script(start, args.days, args.seed)
+    if args.dump_script:
+        with open(args.dump_script, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(s) + '\n' for s in script)
+    epoch = local_midnight(start)
+    end = max([local_midnight(start + datetime.timedelta(days=args.days))] + [s['t'] + 1 for s in script])
+
+    sim = Simulation(epoch, args.visible)
+    t0, cpu0 = time.perf_counter(), time.process_time()
+    sim.open()
+    sim.run(script, end)
+    simulated = sim.wall() - epoch
+    sim.check_counters()
+    sim.check_days()
+    sim.close()
+    wall = time.perf_counter() - t0
+    stats = sim.stats
+    results = {
+        'days': round(simulated / 86400, 2), 'simulated_s': round(simulated), 'wall_s': round(wall, 3),
+        'cpu_s': round(time.process_time() - cpu0, 3),
+        'simulated_s_per_s': round(simulated / wall), 'cycles': stats['cycles'],
+        'cycles_per_s': round(stats['cycles'] / wall, 1),
+        'totals': sim.counts(sim.totals), 'long_breaks': stats['long_breaks'], 'caught_up': stats['caught_up'],
+        'actions': {a: stats[a] for a in list(ACTIONS) + ['resume', 'reset'] if stats[a]},
+        'restarts': stats['restarts'], 'midnight_checks': stats['midnight_checks'],
+        'checks': stats['checks'], 'failures': sim.failures, 'ok': not stats['failures'],
+    }
+    print(json.dumps(results, indent=2))
+    return 0 if results['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# Multi-instance stress test for the shared data directory.
+#
+# Starts N processes that each run a real PomodoroApp (headless Tk stand-in)
+# on the same POMODORO_DATA_DIR and complete thousands of cycles as fast as
+# they can. Afterwards it checks that nothing was lost:
+#   - the session log (replayed from scratch) holds every completion,
+#   - the SQLite store totals and today's counts match,
+#   - with --no-store (no SQLite, as on builds without it), the shared
+#     today-counters in counters.bin match instead.
+# The log segment size is shrunk so rotations happen while other processes
+# are appending.
+#
+#   python benchmarks/stress_multi_instance.py --procs 4 --cycles 2000
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+if __name__ == '__main__':  # never the user's data; spawned workers inherit it
+    os.environ['POMODORO_DATA_DIR'] = tempfile.mkdtemp(prefix='pomodoro-stress-')
+os.environ.setdefault('POMODORO_SAVE_DEBOUNCE', '0.05')
+import headless_tk  # noqa: E402
+import pomodoro  # noqa: E402
+
+SEGMENT_BYTES = 64 * 1024
+
+
+def worker(cycles, start, results, no_store):
+    pomodoro.SessionLog.SEGMENT_BYTES = SEGMENT_BYTES
+    if no_store:
+        pomodoro.sqlite3 = None
+    root = headless_tk.install(pomodoro)
+    app = pomodoro.PomodoroApp(root)
+    app.engine.clock = root.clock
+    app.muted = True
+    app.show_notification = lambda *a: None
+    root.advance(0.1)  # deferred init: store (or shared counters)
+    start.wait()
+    done = {'pomodoro': 0, 'short': 0, 'long': 0}
+    t0 = time.perf_counter()
+    for _ in range(cycles):
+        done[app.state] += 1
+        app.handle_cycle_end()
+    elapsed = time.perf_counter() - t0
+    app.exit_app()
+    results.put({'pid': os.getpid(), 'done': done, 'seconds': elapsed})
+
+
+def verify(no_store):
+    today = pomodoro.datetime.date.today().isoformat()
+    log = pomodoro.SessionLog(pomodoro.SESSION_LOG_FILE, os.path.join(pomodoro.DATA_DIR, 'verify_snapshot.json'))
+    replayed = log.load()  # no snapshot: full replay of every segment
+    with open(pomodoro.SNAPSHOT_FILE) as f:
+        snapshot = json.load(f)['counts']
+    seen = {'log_replay': replayed, 'log_snapshot': snapshot}
+    if no_store:
+        lock = pomodoro.FileLock(pomodoro.LOCK_FILE)
+        shared = pomodoro.SharedCounters(pomodoro.COUNTERS_FILE, lock)
+        day = shared.day_totals(today)
+        shared.close()
+        seen['shared_today'] = {k: day[k] for k in ('pomodoro', 'short', 'long')}
+    else:
+        store = pomodoro.SessionStore(pomodoro.DB_FILE)
+        seen['store'] = store.totals()
+        seen['store_today'] = store.day_totals(today)
+        store.close()
+    return seen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--procs', type=int, default=4)
+    parser.add_argument('--cycles', type=int, default=2000, help='completions per process')
+    parser.add_argument('--no-store', action='store_true', help='run without SQLite (today-counters in counters.bin)')
+    args = parser.parse_args(argv)
+
+    ctx = multiprocessing.get_context('fork' if hasattr(os, 'fork') else 'spawn')
+    start = ctx.Event()
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(args.cycles, start, results, args.no_store)) for _ in range(args.procs)]
+    for p in procs:
+        p.start()
+    time.sleep(0.5)
+    t0 = time.perf_counter()
+    start.set()
+    reports = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    wall = time.perf_counter() - t0
+
+    expected = {'pomodoro': 0, 'short': 0, 'long': 0}
+    for r in reports:
+        for k, n in r['done'].items():
+            expected[k] += n
+    seen = verify(args.no_store)
+    ok = all(v == expected for v in seen.values())
+    print(json.dumps({'data_dir': pomodoro.DATA_DIR, 'procs': args.procs, 'cycles': args.cycles,
+                      'wall_s': round(wall, 2),
+                      'cycles_per_s': round(args.procs * args.cycles / wall, 1),
+                      'expected': expected, 'seen': seen, 'ok': ok}, indent=2))
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
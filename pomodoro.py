@@ -1,27 +1,106 @@
+import time
+STARTUP_T0 = time.perf_counter()  # for --profile-startup
 import tkinter as tk
-from tkinter import messagebox
-import winsound
+from tkinter import ttk
+import abc
+import collections
 import json
 import os
 import datetime
+import array
+import struct
+import bisect
+import heapq
+import math
 import platform
+import queue
 import sys
+try:
+    import sqlite3
+except ImportError:  # stripped-down Python builds
+    sqlite3 = None
 try:
     import threading
     import itertools
 except ImportError:
     pass
-try:
-    from win10toast import ToastNotifier  # Windows toast notifications
-except ImportError:  # optional
-    ToastNotifier = None
-try:
-    import pystray  # system tray icon support
-    from PIL import Image, ImageDraw
-except ImportError:
-    pystray = None
-    Image = None
-    ImageDraw = None
+
+# Platform and optional backends (winsound, win10toast, pystray, PIL) are
+# imported on first use so they never slow down or break startup. Each one
+# has a loader with a plain import statement, so PyInstaller's scanner still
+# finds and bundles it.
+def _load_fcntl():
+    import fcntl
+    return fcntl
+
+
+def _load_mmap():
+    import mmap
+    return mmap
+
+
+def _load_winsound():
+    import winsound
+    return winsound
+
+
+def _load_win10toast():
+    import win10toast
+    return win10toast
+
+
+def _load_pystray():
+    import pystray
+    return pystray
+
+
+def _load_pil_image():
+    from PIL import Image
+    return Image
+
+
+def _load_pil_imagedraw():
+    from PIL import ImageDraw
+    return ImageDraw
+
+
+_optional_loaders = {
+    'fcntl': _load_fcntl,
+    'mmap': _load_mmap,
+    'winsound': _load_winsound,
+    'win10toast': _load_win10toast,
+    'pystray': _load_pystray,
+    'PIL.Image': _load_pil_image,
+    'PIL.ImageDraw': _load_pil_imagedraw,
+}
+_optional_modules = {}
+
+
+def optional_import(name):
+    # Returns the module, or None when it is not installed / not supported
+    if name not in _optional_modules:
+        try:
+            _optional_modules[name] = _optional_loaders[name]()
+        except Exception:  # ImportError, or backends failing to initialise
+            _optional_modules[name] = None
+    return _optional_modules[name]
+
+
+# Startup phase timings: list of (phase, seconds since interpreter reached this module)
+STARTUP_MARKS = []
+
+
+def mark_startup(phase):
+    STARTUP_MARKS.append((phase, time.perf_counter() - STARTUP_T0))
+
+
+def startup_report():
+    lines = ['Startup profile (ms):']
+    prev = 0.0
+    for phase, t in STARTUP_MARKS:
+        lines.append(f'  {phase:<22s}{(t - prev) * 1000:8.1f}   (t={t * 1000:7.1f})')
+        prev = t
+    return '\n'.join(lines)
 
 # --- Constants for themes and limits ---
 LIGHT_THEMES = {
@@ -34,36 +113,2477 @@ DARK_THEMES = {
     'short': {'color': '#6a9edb', 'emoji': '🫐', 'label': 'Short Break (Blueberry)'},
     'long': {'color': '#ffd54f', 'emoji': '🍌', 'label': 'Long Break (Banana)'}
 }
+# Window colours shared by every phase of the built-in themes
+BASE_COLORS = {
+    False: {'bg': '#f9f9f9', 'panel': '#ffffff', 'fg': '#222', 'secondary': '#888', 'border': '#e0e0e0'},
+    True: {'bg': '#1e1e1e', 'panel': '#2b2b2b', 'fg': '#f0f0f0', 'secondary': '#aaaaaa', 'border': '#444'},
+}
+
+
+# --- Palettes ---
+PhaseStyle = collections.namedtuple('PhaseStyle', 'color emoji label')
+
+
+class Palette(collections.namedtuple('Palette', 'name dark bg panel fg secondary border pomodoro short long')):
+    # One theme, compiled once: window colours plus a PhaseStyle per phase.
+    # Immutable and hashable, so it can key caches (tray frames).
+    __slots__ = ()
+
+    def phase(self, state):
+        return getattr(self, state)
+
+
+def valid_color(value):
+    return (isinstance(value, str) and value.startswith('#') and len(value) in (4, 7)
+            and all(c in '0123456789abcdefABCDEF' for c in value[1:]))
+
+
+def compile_palette(name, dark, themes, colors):
+    return Palette(name, dark, colors['bg'], colors['panel'], colors['fg'], colors['secondary'], colors['border'],
+                   *(PhaseStyle(themes[k]['color'], themes[k]['emoji'], themes[k]['label']) for k in ('pomodoro', 'short', 'long')))
+
+
+PALETTES = {
+    'light': compile_palette('light', False, LIGHT_THEMES, BASE_COLORS[False]),
+    'dark': compile_palette('dark', True, DARK_THEMES, BASE_COLORS[True]),
+}
+
+
+def load_palettes(path):
+    # Built-in palettes plus user themes from a JSON file such as
+    #   {"solarized": {"base": "dark", "bg": "#002b36", "pomodoro": {"color": "#dc322f"}}}
+    # Missing entries come from the base theme; invalid colours are ignored.
+    palettes = dict(PALETTES)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return palettes
+    if not isinstance(data, dict):
+        return palettes
+    for name, spec in data.items():
+        if not isinstance(spec, dict) or name in PALETTES:
+            continue
+        base = PALETTES['dark' if spec.get('base') == 'dark' else 'light']
+        colors = {k: spec[k] if valid_color(spec.get(k)) else getattr(base, k) for k in BASE_COLORS[False]}
+        themes = {}
+        for k in ('pomodoro', 'short', 'long'):
+            phase = spec.get(k) if isinstance(spec.get(k), dict) else {}
+            default = base.phase(k)
+            themes[k] = {'color': phase['color'] if valid_color(phase.get('color')) else default.color,
+                         'emoji': str(phase.get('emoji', default.emoji)),
+                         'label': str(phase.get('label', default.label))}
+        palettes[name] = compile_palette(name, base.dark, themes, colors)
+    return palettes
+
+
+# Heatmap cell colours for 0, 1-2, 3-4, 5-7 and 8+ pomodoros a day
+HEATMAP_LEVELS = (1, 3, 5, 8)
+HEATMAP_COLORS = {
+    False: ('#ebedf0', '#ffd2c8', '#ffa08c', '#ff6347', '#c0392b'),
+    True: ('#2d2d2d', '#5c2b22', '#8f3a2b', '#d9533c', '#ff826b'),
+}
 LIMITS = {
     'pomodoro': (25, 50),
     'short': (5, 15),
     'long': (40, 120)
 }
+LONG_BREAK_RANGE = (2, 12)
+
+
+# --- Cycle rules (shared by the GUI and the headless server) ---
+def next_phase(state, pomodoro_count, long_break_interval):
+    # Returns (next_state, pomodoro_count) after `state` ends
+    if state == 'pomodoro':
+        pomodoro_count += 1
+        if pomodoro_count % long_break_interval == 0:
+            return 'long', pomodoro_count
+        return 'short', pomodoro_count
+    return 'pomodoro', pomodoro_count
+
+
+def is_int(value):
+    # JSON integers only (bool is an int subclass)
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def valid_duration(key, minutes):
+    if key not in LIMITS or not is_int(minutes):
+        return False
+    minv, maxv = LIMITS[key]
+    return minv <= minutes <= maxv
+
+
+def valid_long_break_interval(val):
+    return is_int(val) and LONG_BREAK_RANGE[0] <= val <= LONG_BREAK_RANGE[1]
+
+
+def valid_daily_counts(counts):
+    # {'date': 'YYYY-MM-DD', 'pomodoro': n, 'short': n, 'long': n} as stored in settings.json
+    if not (isinstance(counts, dict) and isinstance(counts.get('date'), str)):
+        return False
+    try:
+        datetime.date.fromisoformat(counts['date'])
+    except ValueError:
+        return False
+    return all(is_int(counts.get(k, 0)) and counts.get(k, 0) >= 0 for k in LIMITS)
+
+# Data directory resolution (env override -> AppData -> frozen exe dir -> home fallback)
+CUSTOM_DATA_DIR = os.getenv('POMODORO_DATA_DIR')
+if CUSTOM_DATA_DIR:
+    DATA_DIR = CUSTOM_DATA_DIR
+else:
+    appdata = os.getenv('APPDATA')
+    if appdata:
+        DATA_DIR = os.path.join(appdata, 'PomodoroTimer')
+    elif getattr(sys, 'frozen', False):  # running from PyInstaller bundle
+        DATA_DIR = os.path.join(os.path.dirname(sys.executable), 'data')
+    else:
+        DATA_DIR = os.path.join(os.path.expanduser('~'), '.pomodoro_timer')
+HISTORY_FILE = os.path.join(DATA_DIR, 'history.json')
+SETTINGS_FILE = os.path.join(DATA_DIR, 'settings.json')
+SESSION_LOG_FILE = os.path.join(DATA_DIR, 'sessions.jsonl')
+SNAPSHOT_FILE = os.path.join(DATA_DIR, 'sessions_snapshot.json')
+DB_FILE = os.path.join(DATA_DIR, 'sessions.db')
+LOCK_FILE = os.path.join(DATA_DIR, 'data.lock')
+COUNTERS_FILE = os.path.join(DATA_DIR, 'counters.bin')
+# Seconds a settings change may wait so bursts (e.g. Spinbox scrolling) coalesce
+SAVE_DEBOUNCE = float(os.getenv('POMODORO_SAVE_DEBOUNCE', '0.5'))
+METRICS_FILE = os.path.join(DATA_DIR, 'metrics.jsonl')
+THEMES_FILE = os.path.join(DATA_DIR, 'themes.json')
+INTEGRATIONS_FILE = os.path.join(DATA_DIR, 'integrations.json')
+OUTBOX_FILE = os.path.join(DATA_DIR, 'outbox.jsonl')
+CONTROL_SOCKET = os.path.join(DATA_DIR, 'control.sock')
+
+
+# --- Instrumentation ---
+class LatencyHistogram:
+    # HDR-style log-linear histogram of durations in microseconds: 16 linear
+    # sub-buckets per power of two (<= 6.25% relative error), fixed memory,
+    # O(1) record. Larger values than ~2^41 us land in the last bucket.
+    SUB_BITS = 4
+    SUB_COUNT = 1 << SUB_BITS
+    LINEAR = 2 * SUB_COUNT  # values below this get one bucket each
+    MAX_EXP = 36
+
+    def __init__(self):
+        self.counts = [0] * (self.LINEAR + self.MAX_EXP * self.SUB_COUNT)
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def index(self, us):
+        if us < self.LINEAR:
+            return us
+        exp = us.bit_length() - (self.SUB_BITS + 1)
+        idx = self.LINEAR + (exp - 1) * self.SUB_COUNT + (us >> exp) - self.SUB_COUNT
+        return min(idx, len(self.counts) - 1)
+
+    def value_at(self, idx):
+        # Upper bound of a bucket, in microseconds
+        if idx < self.LINEAR:
+            return idx
+        exp, sub = divmod(idx - self.LINEAR, self.SUB_COUNT)
+        exp += 1
+        return ((self.SUB_COUNT + sub) << exp) + (1 << exp) - 1
+
+    def record(self, seconds):
+        us = max(0, int(seconds * 1e6))
+        self.counts[self.index(us)] += 1
+        self.count += 1
+        self.total_us += us
+        if us > self.max_us:
+            self.max_us = us
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        target = max(1, int(math.ceil(p / 100.0 * self.count)))
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(self.value_at(idx), self.max_us) / 1000.0
+        return self.max_us / 1000.0
+
+    def summary(self):
+        # Milliseconds
+        return {'count': self.count,
+                'mean': round(self.total_us / self.count / 1000.0, 3) if self.count else 0.0,
+                'p50': round(self.percentile(50), 3), 'p90': round(self.percentile(90), 3),
+                'p99': round(self.percentile(99), 3), 'max': round(self.max_us / 1000.0, 3)}
+
+
+class Metrics:
+    # Latency histograms for tick scheduling, rendering and persistence, a Tk
+    # event-loop lag watchdog, optional cProfile capture of chosen hot paths,
+    # and export to a rolling JSONL file and an optional localhost Prometheus
+    # endpoint. When disabled every hook is a single attribute check, and it
+    # can be switched on or off at runtime.
+    NAMES = ('tick_lateness', 'update_ui', 'refresh_timer', 'ring_frame', 'cycle_end', 'cycle_end_handler',
+             'deadline_to_start', 'persist_ui', 'persist_io', 'loop_lag')
+    WATCHDOG_MS = 250
+    EXPORT_MS = 60000
+    FILE_BYTES = 1 << 20  # rotate metrics.jsonl past this size (one backup kept)
+
+    def __init__(self, enabled=False, path=METRICS_FILE):
+        self.enabled = enabled
+        self.path = path
+        self.histograms = {name: LatencyHistogram() for name in self.NAMES}
+        self.profilers = {}  # name -> cProfile.Profile for paths being profiled
+        self.profiling = None  # name of the profiler currently collecting
+        self.root = None
+        self.watchdog_id = None
+        self.watchdog_expected = None
+        self.export_id = None
+        self.export_worker = BackgroundWorker('pomodoro-metrics', maxsize=4)
+        self.http_server = None
+        self.reports = {}  # name -> callable returning a JSON-able dict for snapshots
+
+    # --- Hooks (hot path) ---
+    def begin(self, name):
+        if not self.enabled:
+            return None
+        if name in self.profilers and self.profiling is None:
+            self.profiling = name
+            self.profilers[name].enable()
+        return time.perf_counter()
+
+    def end(self, name, t0):
+        if t0 is None:
+            return
+        self.histograms[name].record(time.perf_counter() - t0)
+        if self.profiling == name:
+            self.profilers[name].disable()
+            self.profiling = None
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self.histograms[name].record(seconds)
+
+    # --- Runtime control ---
+    def attach(self, root):
+        # Tk root used for the watchdog and periodic export
+        self.root = root
+        if self.enabled:
+            self.start_loops()
+
+    def set_enabled(self, enabled):
+        self.enabled = bool(enabled)
+        if self.enabled:
+            self.start_loops()
+        else:
+            self.stop_loops()
+
+    def start_loops(self):
+        if self.root is None:
+            return
+        if self.watchdog_id is None:
+            self.watchdog_expected = time.perf_counter() + self.WATCHDOG_MS / 1000.0
+            self.watchdog_id = self.root.after(self.WATCHDOG_MS, self.watchdog)
+        if self.export_id is None:
+            self.export_id = self.root.after(self.EXPORT_MS, self.periodic_export)
+
+    def stop_loops(self):
+        for ident in (self.watchdog_id, self.export_id):
+            if ident is not None:
+                try:
+                    self.root.after_cancel(ident)
+                except Exception:
+                    pass
+        self.watchdog_id = self.export_id = None
+
+    def watchdog(self):
+        # How late the Tk event loop ran a callback scheduled WATCHDOG_MS ago
+        now = time.perf_counter()
+        self.record('loop_lag', max(0.0, now - self.watchdog_expected))
+        self.watchdog_expected = now + self.WATCHDOG_MS / 1000.0
+        self.watchdog_id = self.root.after(self.WATCHDOG_MS, self.watchdog) if self.enabled else None
+
+    def profile(self, name, enabled=True):
+        # Start/stop collecting a cProfile for one hot path (e.g. 'update_ui')
+        if enabled and name not in self.profilers:
+            import cProfile
+            self.profilers[name] = cProfile.Profile()
+        elif not enabled and name in self.profilers:
+            if self.profiling == name:
+                self.profilers[name].disable()
+                self.profiling = None
+            self.dump_profile(name)
+            del self.profilers[name]
+
+    def dump_profile(self, name):
+        try:
+            ensure_data_dir()
+            self.profilers[name].dump_stats(os.path.join(DATA_DIR, f'profile-{name}.prof'))
+        except (OSError, KeyError):
+            pass
+
+    # --- Export ---
+    def snapshot(self):
+        snap = {'ts': round(time.time(), 3), 'enabled': self.enabled,
+                'histograms_ms': {name: h.summary() for name, h in self.histograms.items()}}
+        for name, report in self.reports.items():
+            snap[name] = report()
+        return snap
+
+    def periodic_export(self):
+        self.export_id = None
+        if not self.enabled:
+            return
+        self.export_worker.submit(self.append_snapshot, self.snapshot())
+        self.export_id = self.root.after(self.EXPORT_MS, self.periodic_export)
+
+    def append_snapshot(self, snap):
+        # Runs on the export worker thread
+        ensure_data_dir()
+        if os.path.exists(self.path) and os.path.getsize(self.path) > self.FILE_BYTES:
+            os.replace(self.path, self.path + '.1')
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(snap, separators=(',', ':')) + '\n')
+
+    def prometheus_text(self):
+        lines = []
+        for name, h in self.histograms.items():
+            metric = f'pomodoro_{name}_seconds'
+            lines.append(f'# TYPE {metric} summary')
+            for q in (0.5, 0.9, 0.99):
+                lines.append(f'{metric}{{quantile="{q}"}} {h.percentile(q * 100) / 1000.0:.6f}')
+            lines.append(f'{metric}_sum {h.total_us / 1e6:.6f}')
+            lines.append(f'{metric}_count {h.count}')
+        lines.append(f'pomodoro_metrics_enabled {int(self.enabled)}')
+        return '\n'.join(lines) + '\n'
+
+    def serve_prometheus(self, port, host='127.0.0.1'):
+        # Optional text endpoint on localhost, served from a daemon thread
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] == '/metrics':
+                    body = metrics.prometheus_text().encode()
+                    self.send_response(200)
+                else:
+                    body = b'not found\n'
+                    self.send_response(404)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.http_server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self.http_server.serve_forever, name='pomodoro-prometheus', daemon=True).start()
+        return self.http_server.server_address[1]
+
+    def close(self):
+        self.stop_loops()
+        if self.enabled:
+            self.export_worker.submit(self.append_snapshot, self.snapshot())
+        for name in list(self.profilers):
+            self.profile(name, False)
+        self.export_worker.close()
+        if self.http_server:
+            self.http_server.shutdown()
+
+
+def ensure_data_dir():
+    # Created on first write rather than at import
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+
+def atomic_write_json(path, data):
+    # Write to a temp file, fsync, then rename over the target so a crash
+    # leaves either the old or the new file, never a truncated one. The temp
+    # name is per process so instances sharing a data dir do not collide.
+    ensure_data_dir()
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# --- Background persistence ---
+class PersistenceWriter:
+    # Dedicated writer thread for small JSON files. Requests for the same path
+    # that arrive within the debounce window are coalesced (latest data wins)
+    # into one atomic write, so the Tk thread never touches the disk.
+    def __init__(self, debounce=SAVE_DEBOUNCE):
+        self.debounce = debounce
+        self.pending = {}  # path -> latest data
+        self.first_pending = None  # monotonic time of the oldest unwritten request
+        self.writing = False
+        self.urgent = False
+        self.closed = False
+        self.cond = threading.Condition()
+        self.thread = None
+        self.metrics = None  # optional Metrics; write durations go to 'persist_io'
+        # Instrumentation
+        self.requested = 0
+        self.written = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    def submit(self, path, data):
+        with self.cond:
+            if self.closed:
+                return
+            if path in self.pending:
+                self.coalesced += 1
+            self.pending[path] = data
+            self.requested += 1
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='pomodoro-writer', daemon=True)
+                self.thread.start()
+            if self.first_pending is None:
+                # Only the first request of a batch wakes the writer; later
+                # ones just join the batch it is already waiting on
+                self.first_pending = time.monotonic()
+                self.cond.notify_all()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closed:
+                    self.cond.wait()
+                if not self.pending and self.closed:
+                    return
+                # Wait out the debounce window unless a flush was requested
+                while not (self.urgent or self.closed):
+                    left = self.first_pending + self.debounce - time.monotonic()
+                    if left <= 0:
+                        break
+                    self.cond.wait(left)
+                batch, self.pending = self.pending, {}
+                self.first_pending = None
+                self.writing = True
+            for path, data in batch.items():
+                t0 = time.perf_counter()
+                try:
+                    atomic_write_json(path, data)
+                    ok = True
+                except (OSError, TypeError, ValueError):
+                    ok = False
+                if self.metrics:
+                    self.metrics.record('persist_io', time.perf_counter() - t0)
+                time.sleep(0)  # hand the GIL back between files on large batches
+                with self.cond:
+                    if ok:
+                        self.written += 1
+                    else:
+                        self.failed += 1
+            with self.cond:
+                self.writing = False
+                if not self.pending:
+                    self.urgent = False
+                self.cond.notify_all()
+
+    def flush(self, timeout=5.0):
+        # Block until everything submitted so far is on disk
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            if self.thread is None:
+                return True
+            self.urgent = True
+            self.cond.notify_all()
+            while self.pending or self.writing:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self.cond.wait(left)
+            return True
+
+    def close(self, timeout=5.0):
+        done = self.flush(timeout)
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
+        return done
+
+    def stats(self):
+        with self.cond:
+            return {'requested': self.requested, 'written': self.written,
+                    'coalesced': self.coalesced, 'failed': self.failed}
+
+
+# --- Background side effects ---
+class BackgroundWorker:
+    # One daemon thread behind a bounded queue for slow, fire-and-forget work
+    # (sound, toasts). When the queue is full new jobs are dropped and counted
+    # rather than blocking the Tk thread.
+    def __init__(self, name, maxsize=8):
+        self.name = name
+        self.jobs = queue.Queue(maxsize)
+        self.thread = None
+        self.dropped = 0
+        self.done = 0
+
+    def submit(self, fn, *args):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+            self.thread.start()
+        try:
+            self.jobs.put_nowait((fn, args))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            fn, args = job
+            try:
+                fn(*args)
+            except Exception:
+                pass
+            self.done += 1
+
+    def close(self, timeout=1.0):
+        if self.thread is not None:
+            try:
+                self.jobs.put(None, timeout=timeout)
+            except queue.Full:
+                return
+            self.thread.join(timeout)
+
+
+# --- Integration events ---
+class Subscriber(abc.ABC):
+    # Receives batches of session events on the event bus thread. deliver()
+    # raises on failure; the bus then spools the batch and retries later.
+    # Subclasses must implement deliver() or they cannot be instantiated.
+    def __init__(self, name, events=None):
+        self.name = name
+        self.events = set(events) if events else None  # None = every event type
+
+    def wants(self, event):
+        return self.events is None or event['event'] in self.events
+
+    @abc.abstractmethod
+    def deliver(self, events):
+        pass
+
+    def close(self):
+        pass
+
+
+class WebhookSubscriber(Subscriber):
+    # POSTs each batch as {"events": [...]} over one kept-alive connection
+    def __init__(self, name, url, headers=None, timeout=5.0, events=None):
+        super().__init__(name, events)
+        import http.client
+        import urllib.parse
+        self.client = http.client
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f'not an http(s) URL: {url!r}')
+        self.parts = parts
+        self.path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        self.headers = {'Content-Type': 'application/json', **{str(k): str(v) for k, v in (headers or {}).items()}}
+        self.timeout = timeout
+        self.conn = None
+
+    def deliver(self, events):
+        body = json.dumps({'events': events}, separators=(',', ':')).encode()
+        for attempt in (0, 1):  # the server may have closed the kept-alive connection
+            if self.conn is None:
+                cls = self.client.HTTPSConnection if self.parts.scheme == 'https' else self.client.HTTPConnection
+                self.conn = cls(self.parts.hostname, self.parts.port, timeout=self.timeout)
+            try:
+                self.conn.request('POST', self.path, body, self.headers)
+                resp = self.conn.getresponse()
+                resp.read()
+                break
+            except (OSError, self.client.HTTPException):
+                self.close()
+                if attempt:
+                    raise
+        if resp.status >= 300:
+            raise OSError(f'{self.name}: HTTP {resp.status}')
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class SocketSubscriber(Subscriber):
+    # Writes events as JSON lines to a Unix stream socket (e.g. a status-bar
+    # daemon); connects on first use and again after an error
+    def __init__(self, name, path, timeout=2.0, events=None):
+        super().__init__(name, events)
+        import socket
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError('Unix sockets are not supported on this platform')
+        self.socket = socket
+        self.path = os.path.expanduser(path)
+        self.timeout = timeout
+        self.sock = None
+
+    def deliver(self, events):
+        data = ''.join(json.dumps(e, separators=(',', ':')) + '\n' for e in events).encode()
+        if self.sock is None:
+            sock = self.socket.socket(self.socket.AF_UNIX, self.socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+            self.sock = sock
+        try:
+            self.sock.sendall(data)
+        except OSError:
+            self.close()
+            raise
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+class CommandSubscriber(Subscriber):
+    # Runs a command once per batch with the events as JSON lines on stdin;
+    # a non-zero exit status or a timeout counts as a failed delivery
+    def __init__(self, name, argv, timeout=10.0, events=None):
+        super().__init__(name, events)
+        import shlex
+        argv = shlex.split(argv) if isinstance(argv, str) else [str(a) for a in argv]
+        if not argv:
+            raise ValueError('empty command')
+        self.argv = [os.path.expanduser(argv[0])] + argv[1:]
+        self.timeout = timeout
+
+    def deliver(self, events):
+        import subprocess
+        data = ''.join(json.dumps(e, separators=(',', ':')) + '\n' for e in events).encode()
+        subprocess.run(self.argv, input=data, timeout=self.timeout, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+SUBSCRIBER_TYPES = {'webhook': (WebhookSubscriber, 'url'), 'socket': (SocketSubscriber, 'path'),
+                    'command': (CommandSubscriber, 'argv')}
+
+
+def load_subscribers(path):
+    # Subscribers from a JSON file such as
+    #   {"subscribers": [{"type": "webhook", "url": "http://dash.local/hook", "events": ["complete"]},
+    #                    {"type": "socket", "path": "~/.cache/pomobar.sock"},
+    #                    {"type": "command", "argv": ["~/bin/on-pomodoro"], "timeout": 5}]}
+    # Entries with an unknown type or a bad target are skipped.
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    specs = data.get('subscribers') if isinstance(data, dict) else None
+    subscribers = []
+    for i, spec in enumerate(specs if isinstance(specs, list) else []):
+        if not isinstance(spec, dict) or spec.get('type') not in SUBSCRIBER_TYPES:
+            continue
+        cls, target = SUBSCRIBER_TYPES[spec['type']]
+        name = str(spec.get('name') or f"{spec['type']}-{i}")
+        kw = {'events': spec.get('events') if isinstance(spec.get('events'), list) else None}
+        if spec['type'] == 'webhook':
+            kw['headers'] = spec.get('headers') if isinstance(spec.get('headers'), dict) else None
+        try:
+            if 'timeout' in spec:
+                kw['timeout'] = float(spec['timeout'])
+            subscribers.append(cls(name, spec[target], **kw))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return subscribers
+
+
+class EventBus:
+    # Session events for the outside world. emit() runs on the Tk thread and
+    # only appends to a bounded in-memory queue (when it is full the oldest
+    # event is dropped and counted). A delivery thread drains the queue in
+    # batches of up to BATCH events, lingering at most LINGER seconds to fill
+    # one, and hands each batch to every subscriber that wants it. A batch a
+    # subscriber cannot take is appended to the outbox file in the data
+    # directory and replayed with exponential backoff; while a subscriber
+    # has a backlog its new batches are spooled behind it, so order is kept.
+    # The outbox survives restarts and is shared by instances on the same
+    # data directory. Delivery is at-least-once; every event has a unique id.
+    QUEUE_SIZE = 1000
+    BATCH = 100
+    LINGER = 0.01
+    RETRY_MIN = 1.0
+    RETRY_MAX = 300.0
+    OUTBOX_LINES = 10000  # spooled batches kept at most; the oldest go first
+
+    def __init__(self, subscribers=(), outbox_path=OUTBOX_FILE):
+        self.subscribers = list(subscribers)
+        self.outbox_path = outbox_path
+        self.outbox_lock = FileLock(outbox_path + '.lock')  # own fd: never contends with the Tk thread's lock
+        self.queue = collections.deque()
+        self.cond = threading.Condition()
+        self.thread = None
+        self.closed = False
+        self.ids = itertools.count(1)
+        self.id_prefix = f'{os.getpid():x}.{int(time.time() * 1000):x}'
+        self.retry_at = {}  # subscriber name -> monotonic time of next replay, while it has a backlog
+        self.backoff = {}
+        self.latency = LatencyHistogram()  # emit -> delivered, per event and subscriber
+        self.emitted = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.failures = 0
+
+    # --- Tk thread ---
+    def start(self):
+        # Starts the delivery thread, which first picks up any outbox backlog
+        with self.cond:
+            if self.subscribers and self.thread is None and not self.closed:
+                self.thread = threading.Thread(target=self.run, name='pomodoro-events', daemon=True)
+                self.thread.start()
+
+    def emit(self, kind, **fields):
+        if not self.subscribers:
+            return
+        event = {'id': f'{self.id_prefix}.{next(self.ids)}', 'event': kind, 'ts': round(time.time(), 3), **fields}
+        with self.cond:
+            if self.closed:
+                return
+            if len(self.queue) >= self.QUEUE_SIZE:
+                self.queue.popleft()
+                self.dropped += 1
+            self.queue.append((time.perf_counter(), event))
+            self.emitted += 1
+            if len(self.queue) == 1 or len(self.queue) >= self.BATCH:
+                self.cond.notify()
+        if self.thread is None:
+            self.start()
+
+    def close(self, timeout=2.0):
+        # The thread drains the queue to the subscribers, or to the outbox
+        # for those that are down. Only a subscriber that hangs past
+        # `timeout` can cost the events still queued behind it.
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            if self.thread.is_alive():
+                return
+        for sub in self.subscribers:
+            sub.close()
+
+    def stats(self):
+        with self.cond:
+            return {'emitted': self.emitted, 'delivered': self.delivered, 'dropped': self.dropped,
+                    'spooled': self.spooled, 'replayed': self.replayed, 'failures': self.failures,
+                    'queued': len(self.queue), 'backlog': sorted(self.retry_at),
+                    'latency_ms': self.latency.summary()}
+
+    # --- Delivery thread ---
+    def run(self):
+        self.load_backlog()
+        while True:
+            with self.cond:
+                while not self.queue and not self.closed:
+                    wait = self.next_retry()
+                    if wait is not None and wait <= 0:
+                        break
+                    self.cond.wait(wait)
+                deadline = time.monotonic() + self.LINGER
+                while self.queue and len(self.queue) < self.BATCH and not self.closed:
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        break
+                    self.cond.wait(left)
+                batch = [self.queue.popleft() for _ in range(min(self.BATCH, len(self.queue)))]
+                closing = self.closed and not self.queue
+            if batch:
+                self.dispatch(batch)
+            if closing:
+                return
+            self.replay_due()
+
+    def dispatch(self, batch):
+        for sub in self.subscribers:
+            mine = [(t0, e) for t0, e in batch if sub.wants(e)]
+            if not mine:
+                continue
+            events = [e for _, e in mine]
+            if sub.name in self.retry_at:
+                self.spool(sub, events)
+                continue
+            try:
+                sub.deliver(events)
+            except Exception:
+                with self.cond:
+                    self.failures += 1
+                self.spool(sub, events)
+                self.retry_at[sub.name] = time.monotonic() + self.backoff.setdefault(sub.name, self.RETRY_MIN)
+                continue
+            now = time.perf_counter()
+            with self.cond:
+                self.delivered += len(events)
+                for t0, _ in mine:
+                    self.latency.record(now - t0)
+
+    def next_retry(self):
+        # Seconds until the earliest backlog replay, or None without a backlog
+        if not self.retry_at or self.closed:
+            return None
+        return max(0.0, min(self.retry_at.values()) - time.monotonic())
+
+    def spool(self, sub, events):
+        try:
+            with self.outbox_lock:
+                ensure_data_dir()
+                with open(self.outbox_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'to': sub.name, 'events': events}, separators=(',', ':')) + '\n')
+        except OSError:
+            return
+        with self.cond:
+            self.spooled += len(events)
+
+    def read_outbox(self):
+        try:
+            with open(self.outbox_path, 'r', encoding='utf-8') as f:
+                return f.readlines()
+        except OSError:
+            return []
+
+    def load_backlog(self):
+        # Batches spooled by an earlier run (or another instance) are due now
+        names = {sub.name for sub in self.subscribers}
+        now = time.monotonic()
+        for line in self.read_outbox():
+            try:
+                to = json.loads(line).get('to')
+            except (ValueError, AttributeError):
+                continue
+            if to in names:
+                self.retry_at[to] = now
+
+    def replay_due(self):
+        now = time.monotonic()
+        for sub in self.subscribers:
+            due = self.retry_at.get(sub.name)
+            if due is not None and due <= now and not self.closed:
+                self.replay(sub)
+
+    def replay(self, sub):
+        # Re-deliver this subscriber's spooled batches oldest first, stopping
+        # at the first failure; delivered lines (and lines for subscribers
+        # that are no longer configured) are dropped from the outbox
+        names = {s.name for s in self.subscribers}
+        failed = False
+        sent = 0
+        with self.outbox_lock:
+            lines = self.read_outbox()
+            keep = []
+            for line in lines:
+                try:
+                    rec = json.loads(line)
+                    to, events = rec['to'], rec['events']
+                except (ValueError, KeyError, TypeError):
+                    continue  # torn write
+                if to not in names:
+                    continue
+                if failed or to != sub.name:
+                    keep.append(line)
+                    continue
+                try:
+                    sub.deliver(events)
+                    sent += len(events)
+                except Exception:
+                    failed = True
+                    keep.append(line)
+            keep = keep[-self.OUTBOX_LINES:]
+            if len(keep) != len(lines):
+                try:
+                    if keep:
+                        tmp = f'{self.outbox_path}.{os.getpid()}.tmp'
+                        with open(tmp, 'w', encoding='utf-8') as f:
+                            f.writelines(keep)
+                        os.replace(tmp, self.outbox_path)
+                    else:
+                        os.remove(self.outbox_path)
+                except OSError:
+                    pass
+        with self.cond:
+            self.replayed += sent
+            self.delivered += sent
+            if failed:
+                self.failures += 1
+        if failed:
+            self.backoff[sub.name] = min(self.RETRY_MAX, self.backoff.get(sub.name, self.RETRY_MIN) * 2)
+            self.retry_at[sub.name] = time.monotonic() + self.backoff[sub.name]
+        else:
+            self.retry_at.pop(sub.name, None)
+            self.backoff.pop(sub.name, None)
+
+
+# --- Local control API ---
+class StatusWatch:
+    # One push subscriber: holds only the newest status line, so a slow
+    # reader skips intermediate states instead of building up a backlog
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.line = None
+        self.closed = False
+
+    def put(self, line):
+        with self.cond:
+            self.line = line
+            self.cond.notify()
+
+    def get(self):
+        # Next line to send, or None once closed
+        with self.cond:
+            while self.line is None and not self.closed:
+                self.cond.wait()
+            line, self.line = self.line, None
+            return line
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+
+class ControlServer:
+    # Local control and status API on a Unix stream socket in the data
+    # directory, one JSON object per line in each direction:
+    #   {"cmd": "status"|"start"|"pause"|"resume"|"toggle"|"skip"|"reset", "id": ...}
+    #     -> {"id": ..., "ok": true, "status": {...}} or {"id": ..., "ok": false, "error": "..."}
+    #   {"cmd": "subscribe"} -> the reply above, then {"event": "status", "status": {...}}
+    #     each time the status changes; nothing is sent while nothing changes.
+    # Connection threads never touch app state. Commands and status reads
+    # run on the Tk thread through `schedule` (root.after) and the reply
+    # waits for them. publish() is called on the Tk thread.
+    CALL_TIMEOUT = 5.0
+
+    def __init__(self, path, commands, status, schedule):
+        self.path = path
+        self.commands = commands  # name -> callable, run on the Tk thread
+        self.status = status  # callable returning the status dict, run on the Tk thread
+        self.schedule = schedule
+        self.server = None
+        self.watches = set()
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.pushes = 0
+
+    def start(self):
+        # False when Unix sockets are unavailable or another instance
+        # already answers on the socket
+        import socketserver
+        if not hasattr(socketserver, 'ThreadingUnixStreamServer'):
+            return False
+        ensure_data_dir()
+        if os.path.exists(self.path):
+            try:
+                control_request(self.path, 'status', timeout=1.0)
+                return False
+            except (OSError, ValueError):
+                try:
+                    os.unlink(self.path)  # left behind by a crashed instance
+                except OSError:
+                    return False
+        control = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    self.serve_lines()
+                except OSError:  # client went away
+                    pass
+
+            def serve_lines(self):
+                for line in self.rfile:
+                    try:
+                        req = json.loads(line)
+                        if not isinstance(req, dict):
+                            raise ValueError
+                    except ValueError:
+                        self.wfile.write(control.encode({'ok': False, 'error': 'bad request'}))
+                        continue
+                    if req.get('cmd') == 'subscribe':
+                        control.stream(self.wfile, req)
+                        return
+                    self.wfile.write(control.encode(control.reply(req)))
+
+        class Server(socketserver.ThreadingUnixStreamServer):
+            daemon_threads = True
+            request_queue_size = 64  # status bars and watchers may connect in a burst
+
+        # Owner-only from the moment it exists: a chmod after bind() would
+        # leave a window in which other local users could connect
+        umask = os.umask(0o177)
+        try:
+            self.server = Server(self.path, Handler)
+        except OSError:
+            return False
+        finally:
+            os.umask(umask)
+        threading.Thread(target=self.server.serve_forever, name='pomodoro-control', daemon=True).start()
+        return True
+
+    @staticmethod
+    def encode(msg):
+        return (json.dumps(msg, separators=(',', ':')) + '\n').encode()
+
+    def call(self, fn):
+        # Run fn (may be None) and read the status on the Tk thread
+        done = threading.Event()
+        box = {}
+
+        def run():
+            try:
+                if fn is not None:
+                    fn()
+                box['status'] = self.status()
+            except Exception as e:
+                box['error'] = str(e) or type(e).__name__
+            done.set()
+
+        self.schedule(run)
+        if not done.wait(self.CALL_TIMEOUT):
+            return {'ok': False, 'error': 'timed out waiting for the UI thread'}
+        if 'error' in box:
+            return {'ok': False, 'error': box['error']}
+        return {'ok': True, 'status': box['status']}
+
+    def reply(self, req):
+        self.requests += 1
+        cmd = req.get('cmd')
+        if cmd == 'status':
+            resp = self.call(None)
+        elif cmd in self.commands:
+            resp = self.call(self.commands[cmd])
+        else:
+            resp = {'ok': False, 'error': f'unknown command: {cmd!r}'}
+        if 'id' in req:
+            resp['id'] = req['id']
+        return resp
+
+    def stream(self, wfile, req):
+        watch = StatusWatch()
+        with self.lock:
+            self.watches.add(watch)
+        try:
+            wfile.write(self.encode(self.reply(req | {'cmd': 'status'})))
+            while True:
+                line = watch.get()
+                if line is None:
+                    return
+                wfile.write(line)
+        except OSError:  # subscriber went away
+            pass
+        finally:
+            with self.lock:
+                self.watches.discard(watch)
+
+    def publish(self, status):
+        line = self.encode({'event': 'status', 'status': status})
+        with self.lock:
+            watches = list(self.watches)
+        for watch in watches:
+            watch.put(line)
+        self.pushes += 1
+
+    def close(self):
+        with self.lock:
+            watches, self.watches = list(self.watches), set()
+        for watch in watches:
+            watch.close()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+
+def control_connect(path, timeout):
+    import socket
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def control_request(path, cmd, timeout=2.0):
+    # One request/response round trip; raises OSError when nothing listens
+    with control_connect(path, timeout) as sock, sock.makefile('rwb') as f:
+        f.write(ControlServer.encode({'cmd': cmd}))
+        f.flush()
+        line = f.readline()
+    if not line:
+        raise OSError('connection closed')
+    return json.loads(line)
+
+
+def format_status(status):
+    # One line for a status bar, e.g. "🍅 24:13" or "☕ 05:00 (paused)"
+    if status['ends_at'] is not None:
+        left = max(0, int(math.ceil(status['ends_at'] - time.time())))
+    else:
+        left = int(math.ceil(status['remaining']))
+    text = f"{status['emoji']} {left // 60:02d}:{left % 60:02d}"
+    if status['paused']:
+        text += ' (paused)'
+    elif not status['running']:
+        text += ' (stopped)'
+    return text
+
+
+def control_watch(path, fmt='text', out=sys.stdout):
+    # Follows pushes from a running app. The countdown text is produced
+    # locally from `ends_at`, one line per second while running, so the
+    # socket only carries actual state changes.
+    import socket
+    with control_connect(path, None) as sock:
+        sock.sendall(ControlServer.encode({'cmd': 'subscribe'}))
+        buf = b''
+        status = None
+        while True:
+            timeout = None  # block until the next push
+            if fmt == 'text' and status is not None and status['ends_at'] is not None:
+                left = status['ends_at'] - time.time()
+                timeout = max(0.01, left - math.floor(left))  # until the shown second changes
+            while b'\n' not in buf:
+                sock.settimeout(timeout)
+                try:
+                    chunk = sock.recv(65536)
+                except socket.timeout:
+                    break
+                if not chunk:
+                    return 0
+                buf += chunk
+            if b'\n' in buf:
+                line, buf = buf.split(b'\n', 1)
+                msg = json.loads(line)
+                if 'status' not in msg:
+                    raise OSError(msg.get('error', 'subscribe failed'))
+                status = msg['status']
+                if b'\n' in buf:
+                    continue  # print only the newest of a burst
+            out.write((json.dumps(status, separators=(',', ':')) if fmt == 'json' else format_status(status)) + '\n')
+            out.flush()
+
+
+def ctl(cmd, fmt='text', path=CONTROL_SOCKET):
+    # `pomodoro.py ctl ...`: talk to the running app
+    try:
+        if cmd == 'watch':
+            return control_watch(path, fmt)
+        resp = control_request(path, cmd)
+    except (OSError, ValueError) as e:
+        print(f'Pomodoro Timer is not running ({e})', file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        return 0
+    if not resp.get('ok'):
+        print(resp.get('error', 'failed'), file=sys.stderr)
+        return 1
+    print(json.dumps(resp['status']) if fmt == 'json' else format_status(resp['status']))
+    return 0
+
+
+# --- Multi-instance coordination ---
+class FileLock:
+    # Reentrant advisory lock (fcntl.flock) on a file in the data directory,
+    # taken by every process that shares it. Without fcntl (Windows) it is a
+    # no-op, i.e. single-instance behaviour as before. Before the data
+    # directory exists there is nothing to protect, so it is not created
+    # just to be locked.
+    def __init__(self, path=None):
+        self.path = path
+        self.fd = None
+        self.depth = 0
+        self.held = False
+        self.fcntl = optional_import('fcntl') if path else None
+
+    def __enter__(self):
+        if self.depth == 0 and self.fcntl and os.path.isdir(os.path.dirname(self.path)):
+            if self.fd is None:
+                self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self.fcntl.flock(self.fd, self.fcntl.LOCK_EX)
+            self.held = True
+        elif self.depth == 0:
+            self.held = False
+        self.depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self.depth -= 1
+        if self.depth == 0 and self.held:
+            self.fcntl.flock(self.fd, self.fcntl.LOCK_UN)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class SharedCounters:
+    # Today's completion counts shared by all instances through a small
+    # memory-mapped file. Each process owns one slot and is its only writer,
+    # so an increment is a plain store into shared memory: no lock, no
+    # syscall, no JSON. Readers sum the slots dated today. When a process
+    # exits, its slot keeps its counts; the next instance to start adopts it.
+    MAGIC = b'POMC'
+    HEADER = struct.Struct('<4sII')  # magic, version, slot count
+    SLOT = struct.Struct('<IIIII')  # pid, day ordinal, pomodoro, short, long
+    KINDS = ('pomodoro', 'short', 'long')
+    SLOTS = 64
+
+    def __init__(self, path, lock):
+        mmap = optional_import('mmap')
+        if not (mmap and lock.fcntl):
+            raise OSError('shared counters need mmap and fcntl')
+        self.path = path
+        self.pid = os.getpid()
+        size = self.HEADER.size + self.SLOTS * self.SLOT.size
+        with lock:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                self.created = os.fstat(fd).st_size < size
+                if self.created:
+                    os.write(fd, self.HEADER.pack(self.MAGIC, 1, self.SLOTS) + bytes(size - self.HEADER.size))
+                self.mm = mmap.mmap(fd, size)
+            finally:
+                os.close(fd)
+            if self.HEADER.unpack_from(self.mm, 0)[0] != self.MAGIC:
+                self.mm.close()
+                raise OSError('unrecognised counter file')
+            self.slot = self.claim()
+
+    def offset(self, i):
+        return self.HEADER.size + i * self.SLOT.size
+
+    def claim(self):
+        # Called under the data lock: first free slot, else one whose owner
+        # has exited (counts are kept and carried on)
+        free = None
+        for i in range(self.SLOTS):
+            pid = self.SLOT.unpack_from(self.mm, self.offset(i))[0]
+            if pid == 0 or not self.alive(pid):
+                free = i
+                break
+        if free is None:
+            self.mm.close()
+            raise OSError('no free counter slot')
+        struct.pack_into('<I', self.mm, self.offset(free), self.pid)
+        return free
+
+    @staticmethod
+    def alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            pass  # exists but owned by someone else
+        return True
+
+    def increment(self, kind, day):
+        # Lock-free: only this process writes its slot
+        off = self.offset(self.slot)
+        ordinal = datetime.date.fromisoformat(day).toordinal()
+        if self.SLOT.unpack_from(self.mm, off)[1] != ordinal:
+            self.SLOT.pack_into(self.mm, off, self.pid, ordinal, 0, 0, 0)
+        field = off + 8 + 4 * self.KINDS.index(kind)
+        struct.pack_into('<I', self.mm, field, struct.unpack_from('<I', self.mm, field)[0] + 1)
+
+    def seed(self, counts):
+        # New counter file: carry over today's counts from settings.json
+        ordinal = datetime.date.fromisoformat(counts['date']).toordinal()
+        self.SLOT.pack_into(self.mm, self.offset(self.slot), self.pid, ordinal,
+                            *(int(counts.get(k, 0)) for k in self.KINDS))
+
+    def day_totals(self, day):
+        ordinal = datetime.date.fromisoformat(day).toordinal()
+        out = {'date': day, 'pomodoro': 0, 'short': 0, 'long': 0}
+        for i in range(self.SLOTS):
+            _, slot_day, *counts = self.SLOT.unpack_from(self.mm, self.offset(i))
+            if slot_day == ordinal:
+                for k, n in zip(self.KINDS, counts):
+                    out[k] += n
+        return out
+
+    def close(self):
+        struct.pack_into('<I', self.mm, self.offset(self.slot), 0)  # release; counts stay
+        self.mm.flush()
+        self.mm.close()
+
+
+# --- Session event log ---
+class SessionLog:
+    # Append-only JSONL log with one record per completed, skipped or paused
+    # session. Appends are O(1) and fsync'd in batches; a snapshot of the
+    # counters plus the log offset it covers keeps startup replay short, and
+    # compaction rotates a large active log into numbered archive segments.
+    # Several processes may share the log: appends, snapshots and rotation
+    # run under the data lock, after first replaying whatever the others
+    # appended, so every instance's counts cover the whole log.
+    FSYNC_EVERY = 8  # records between fsyncs
+    FSYNC_INTERVAL = 5.0  # max seconds a record waits for fsync (PomodoroApp schedules it when idle)
+    SNAPSHOT_EVERY = 200  # records between snapshots
+    SEGMENT_BYTES = 1 << 20  # rotate the active log past this size
+
+    def __init__(self, log_path, snapshot_path, lock=None):
+        self.log_path = log_path
+        self.snapshot_path = snapshot_path
+        self.lock = lock or FileLock()
+        self.counts = {'pomodoro': 0, 'short': 0, 'long': 0}
+        self.offset = 0  # bytes of the active log covered by the snapshot
+        self.pos = 0  # bytes of the active log covered by self.counts
+        self.segment = 0  # number of the active log segment
+        self.file = None
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.since_snapshot = 0
+
+    def segment_path(self, n):
+        base, ext = os.path.splitext(self.log_path)
+        return f'{base}-{n:06d}{ext}'
+
+    # --- Startup ---
+    def load(self, legacy_history_path=None):
+        with self.lock:
+            return self._load(legacy_history_path)
+
+    def _load(self, legacy_history_path):
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'r') as f:
+                    snap = json.load(f)
+                self.counts = {k: int(snap['counts'].get(k, 0)) for k in self.counts}
+                self.offset = int(snap.get('offset', 0))
+                self.segment = int(snap.get('segment', 0))
+            except (ValueError, KeyError, OSError, AttributeError):
+                pass
+        elif legacy_history_path and os.path.exists(legacy_history_path):
+            # First run after upgrade: seed counters from the old history.json
+            try:
+                with open(legacy_history_path, 'r') as f:
+                    data = json.load(f)
+                self.counts = {k: int(data.get(k, 0)) for k in self.counts}
+            except (ValueError, OSError, AttributeError):
+                pass
+            self.write_snapshot()
+        self.pos = self.offset
+        self.merge(truncate_tail=True)
+        return dict(self.counts)
+
+    def merge(self, truncate_tail=False):
+        # Catch up with the log as it is on disk (under the lock). An archived
+        # segment numbered like ours means the log was rotated after we last
+        # read it (by another instance, or a crash mid-rotation): finish it first.
+        while os.path.exists(self.segment_path(self.segment)):
+            self.replay(self.segment_path(self.segment), self.pos)
+            self.segment += 1
+            self.pos = 0
+            if self.file:
+                self.file.close()
+                self.file = None
+        if not os.path.exists(self.log_path) or os.path.getsize(self.log_path) != self.pos:
+            self.pos = self.replay(self.log_path, self.pos, truncate_tail)
+
+    def open(self):
+        # The active log is opened on the first append
+        ensure_data_dir()
+        self.file = open(self.log_path, 'a')
+
+    def replay(self, path, offset, truncate_tail=False):
+        # Applies the complete records after `offset`; returns the end offset.
+        # Only an unterminated tail (a write torn by a crash) stops the replay;
+        # a corrupt line that does end in a newline is skipped, since other
+        # instances may have appended valid records after it.
+        if not os.path.exists(path):
+            return 0
+        good = offset
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # torn write at the tail
+                good += len(line)
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict):
+                    self.apply(rec)
+                    self.since_snapshot += 1
+        if truncate_tail and good < os.path.getsize(path):
+            with open(path, 'r+b') as f:
+                f.truncate(good)
+        return good
+
+    def apply(self, rec):
+        if rec.get('event') == 'completed' and rec.get('type') in self.counts:
+            self.counts[rec['type']] += 1
+
+    # --- Writing ---
+    def append(self, event, kind, duration, ts=None):
+        rec = {'ts': round(ts if ts is not None else time.time(), 3), 'event': event,
+               'type': kind, 'duration': int(duration)}
+        with self.lock:
+            self.write([rec])
+            if self.unsynced >= self.FSYNC_EVERY or time.monotonic() - self.last_sync >= self.FSYNC_INTERVAL:
+                self.sync()
+            if self.since_snapshot >= self.SNAPSHOT_EVERY:
+                self.compact()
+        return rec
+
+    def write(self, recs):
+        # Under the lock: merge the others' records, then append ours
+        self.merge()
+        if self.file is None:
+            self.open()
+        if os.path.getsize(self.log_path) > self.pos:
+            # An instance died mid-append and left an unterminated record:
+            # drop it, or ours would be glued onto it and lost with it
+            self.file.truncate(self.pos)
+        self.file.write(''.join(json.dumps(rec, separators=(',', ':')) + '\n' for rec in recs))
+        self.file.flush()
+        self.pos = self.file.tell()
+        for rec in recs:
+            self.apply(rec)
+        self.unsynced += len(recs)
+        self.since_snapshot += len(recs)
+
+    def refresh(self):
+        # Pick up other instances' records without writing
+        with self.lock:
+            self.merge()
+        return dict(self.counts)
+
+    def append_many(self, records):
+        # Batch of (event, kind, duration, ts): one write and one fsync
+        recs = [{'ts': round(ts, 3), 'event': event, 'type': kind, 'duration': int(duration)}
+                for event, kind, duration, ts in records]
+        if not recs:
+            return recs
+        with self.lock:
+            self.write(recs)
+            self.sync()
+            if self.since_snapshot >= self.SNAPSHOT_EVERY:
+                self.compact()
+        return recs
+
+    def sync(self):
+        if self.file and self.unsynced:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def compact(self):
+        # Snapshot the counters at the current end of the log; rotate the log
+        # into an archive segment once it grows past SEGMENT_BYTES.
+        with self.lock:
+            self.sync()
+            self.merge()
+            if self.file is None:
+                self.open()
+            if self.pos >= self.SEGMENT_BYTES:
+                self.file.close()
+                os.replace(self.log_path, self.segment_path(self.segment))
+                self.segment += 1
+                self.pos = 0
+                self.file = open(self.log_path, 'a')
+            self.offset = self.pos
+            self.write_snapshot()
+            self.since_snapshot = 0
+
+    def write_snapshot(self):
+        atomic_write_json(self.snapshot_path, {'version': 1, 'counts': self.counts,
+                                               'offset': self.offset, 'segment': self.segment})
+
+    def close(self):
+        if self.file:
+            self.compact()
+            self.file.close()
+            self.file = None
+
+# --- Timer engine (no Tk dependency) ---
+class TimerEngine:
+    # Countdown driven by an absolute deadline on a monotonic clock.
+    # Remaining time is always derived from the deadline, so late callbacks,
+    # redraw cost and GC pauses never add up to drift. The clock is pluggable
+    # (any zero-argument callable returning seconds) for headless testing.
+    DRIFT_LOG_SIZE = 50
+
+    def __init__(self, clock=None):
+        self.clock = clock or time.monotonic
+        self.deadline = None  # absolute clock value while running
+        self.left = 0.0  # remaining seconds while stopped/paused
+        self.expected_wake = None  # boundary the next tick was scheduled for
+        self.last_late = None  # lateness of the most recent tick (seconds)
+        self.session = None
+        self.drift_log = []  # reports of finished sessions (most recent last)
+
+    # --- Control ---
+    def load(self, seconds):
+        # Stop and set a fresh countdown (new phase / reset)
+        self.deadline = None
+        self.expected_wake = None
+        self.left = float(seconds)
+        self.session = None
+
+    def set_remaining(self, seconds):
+        # Change remaining time without changing run state (duration edits)
+        if self.deadline is not None:
+            self.deadline = self.clock() + seconds
+            self.expected_wake = None
+        else:
+            self.left = float(seconds)
+
+    def start(self):
+        if self.deadline is not None:
+            return
+        now = self.clock()
+        if self.session is None:
+            self.session = {'started': now, 'duration': self.left, 'ticks': 0,
+                            'late_total': 0.0, 'late_max': 0.0, 'paused': 0.0, 'paused_at': None}
+        elif self.session['paused_at'] is not None:
+            self.session['paused'] += now - self.session['paused_at']
+            self.session['paused_at'] = None
+        self.deadline = now + self.left
+
+    def pause(self):
+        if self.deadline is None:
+            return
+        now = self.clock()
+        self.left = max(0.0, self.deadline - now)
+        self.deadline = None
+        self.expected_wake = None
+        if self.session is not None:
+            self.session['paused_at'] = now
+
+    @property
+    def running(self):
+        return self.deadline is not None
+
+    # --- Queries ---
+    def remaining(self):
+        if self.deadline is None:
+            return self.left
+        return max(0.0, self.deadline - self.clock())
+
+    def remaining_seconds(self):
+        # Whole seconds for display: 25:00 is shown until a full second elapsed
+        return int(math.ceil(self.remaining() - 1e-6))
+
+    def expired(self):
+        return self.deadline is not None and self.clock() >= self.deadline
+
+    def next_wakeup_ms(self):
+        # Milliseconds until the display next changes (next whole-second boundary
+        # of the remaining time) instead of a fixed 1000 ms.
+        rem = self.remaining()
+        frac = rem - math.floor(rem)
+        if frac < 1e-3:
+            frac = 1.0 if rem >= 1.0 else rem
+        if self.deadline is not None:
+            self.expected_wake = self.clock() + frac
+        return max(1, int(math.ceil(frac * 1000)))
+
+    # --- Drift measurement ---
+    def tick(self):
+        # Call from each scheduled wake-up; records how late it fired relative to
+        # the boundary it was scheduled for, and returns whole seconds left.
+        now = self.clock()
+        self.last_late = None
+        if self.session is not None and self.expected_wake is not None:
+            late = self.last_late = max(0.0, now - self.expected_wake)
+            self.session['ticks'] += 1
+            self.session['late_total'] += late
+            self.session['late_max'] = max(self.session['late_max'], late)
+        self.expected_wake = None
+        return self.remaining_seconds()
+
+    def finish(self):
+        # Close the session once expiry is observed and report its drift:
+        # end_late_ms is how long after the true deadline the end was handled.
+        if self.session is None:
+            return None
+        now = self.clock()
+        s = self.session
+        deadline = self.deadline if self.deadline is not None else now
+        elapsed = now - s['started'] - s['paused']
+        report = {
+            'duration': s['duration'],
+            'elapsed': round(elapsed, 4),
+            'end_late_ms': round(max(0.0, now - deadline) * 1000, 2),
+            'drift_ms': round((elapsed - s['duration']) * 1000, 2),
+            'ticks': s['ticks'],
+            'mean_tick_late_ms': round(s['late_total'] / s['ticks'] * 1000, 2) if s['ticks'] else 0.0,
+            'max_tick_late_ms': round(s['late_max'] * 1000, 2),
+        }
+        self.drift_log.append(report)
+        del self.drift_log[:-self.DRIFT_LOG_SIZE]
+        self.load(0)
+        return report
+
+# --- Phase schedule ---
+SUSPEND_GAP = 3.0  # seconds the wall clock may run ahead of the timer before catching up
+MIDNIGHT_RECHECK = 3600  # longest wait between checks for the daily-count rollover
+SchedulePosition = collections.namedtuple('SchedulePosition', 'index state pomodoro_count remaining running')
+
+
+class ScheduleTimeline:
+    # Wall-clock phase boundaries from an anchor: at `anchor` the current phase
+    # (`state`) has `remaining` seconds left. With auto_start, the phases after
+    # it repeat every 2 * long_break_interval phases (the count grows by the
+    # interval each period), so one period of cumulative end offsets is enough.
+    # Any timestamp is located with a divmod and one bisect, however far ahead.
+    # Without auto_start the schedule stops after the current phase.
+    def __init__(self, anchor, state, pomodoro_count, remaining, durations, long_break_interval, auto_start):
+        self.anchor = anchor
+        self.state = state
+        self.pomodoro_count = pomodoro_count
+        self.remaining = remaining
+        self.durations = dict(durations)
+        self.long_break_interval = long_break_interval
+        self.auto_start = auto_start
+        self.phases = None  # one period: [(state, pomodoro_count)], built lazily
+        self.ends = None  # cumulative end offsets within the period
+
+    @property
+    def phase_end(self):
+        # Wall-clock end of the current phase
+        return self.anchor + self.remaining
+
+    def set_duration(self, key, seconds):
+        # A duration edit only invalidates the period table; the current
+        # phase's boundary stays put unless the app re-anchors it
+        if self.durations.get(key) != seconds:
+            self.durations[key] = seconds
+            self.phases = self.ends = None
+
+    def build(self):
+        self.phases, self.ends = [], []
+        state, count = next_phase(self.state, self.pomodoro_count, self.long_break_interval)
+        t = 0.0
+        for _ in range(2 * self.long_break_interval):
+            self.phases.append((state, count))
+            t += self.durations[state]
+            self.ends.append(t)
+            state, count = next_phase(state, count, self.long_break_interval)
+
+    def phase(self, index):
+        # (state, pomodoro_count, end, duration) of phase `index` (0 = current)
+        if index == 0:
+            return self.state, self.pomodoro_count, self.phase_end, self.durations[self.state]
+        if self.phases is None:
+            self.build()
+        k, j = divmod(index - 1, len(self.phases))
+        state, count = self.phases[j]
+        end = self.phase_end + k * self.ends[-1] + self.ends[j]
+        return state, count + k * self.long_break_interval, end, self.durations[state]
+
+    def completed(self, index):
+        # Phases that ended before phase `index` started, oldest first
+        for i in range(index):
+            yield self.phase(i)
+
+    def locate(self, ts):
+        offset = ts - self.anchor
+        if offset < self.remaining:
+            return SchedulePosition(0, self.state, self.pomodoro_count, self.remaining - offset, True)
+        state, count = next_phase(self.state, self.pomodoro_count, self.long_break_interval)
+        if not self.auto_start:
+            return SchedulePosition(1, state, count, self.durations[state], False)
+        if self.phases is None:
+            self.build()
+        k, r = divmod(offset - self.remaining, self.ends[-1])
+        j = bisect.bisect_right(self.ends, r)
+        state, count = self.phases[j]
+        return SchedulePosition(1 + int(k) * len(self.phases) + j, state,
+                                count + int(k) * self.long_break_interval, self.ends[j] - r, True)
+
+
+# --- Incremental rendering ---
+class WidgetRenderer:
+    # Remembers the last value pushed to every widget option / canvas item and
+    # only sends the options that changed, so an idle tick costs almost no Tcl
+    # traffic. `calls` counts the configure calls actually issued.
+    def __init__(self):
+        self.cache = {}
+        self.calls = 0
+
+    def _changed(self, key, opts):
+        cached = self.cache.setdefault(key, {})
+        changed = {k: v for k, v in opts.items() if k not in cached or cached[k] != v}
+        cached.update(changed)
+        return changed
+
+    def apply(self, widget, **opts):
+        changed = self._changed(widget, opts)
+        if changed:
+            widget.config(**changed)
+            self.calls += 1
+
+    def apply_item(self, canvas, item, **opts):
+        changed = self._changed((canvas, item), opts)
+        if changed:
+            canvas.itemconfig(item, **changed)
+            self.calls += 1
+
+    def apply_coords(self, canvas, item, *coords):
+        if self._changed((canvas, item, 'coords'), {'xy': coords}):
+            canvas.coords(item, *coords)
+            self.calls += 1
+
+    def invalidate(self):
+        # Forget everything (e.g. after widgets were rebuilt)
+        self.cache.clear()
+
+
+# --- Progress ring animation ---
+ANIMATION_FPS = {'focused': 60, 'unfocused': 1, 'hidden': 0}  # frame-rate cap per window state
+ANIMATION_CPU_BUDGET = float(os.getenv('POMODORO_CPU_BUDGET', '0.02'))  # share of one core for frames
+RING_STEP = 0.5  # degrees of arc per drawn step; about one pixel on the 100 px ring
+
+
+class RingAnimator:
+    # Frame scheduler for the progress ring between the once-a-second timer
+    # ticks. The next frame is due when the arc will have moved by one step,
+    # but never sooner than the mode's fps cap allows, nor so often that the
+    # measured frame cost exceeds `budget` of one core. Modes capped at 1 fps
+    # or less schedule nothing: the tick already redraws the ring each second,
+    # and so does a budget of 0 (POMODORO_CPU_BUDGET=0 turns the frames off).
+    # Wall and process CPU time are accounted per mode for the idle-CPU report.
+    def __init__(self, root, draw, fps=None, budget=ANIMATION_CPU_BUDGET, clock=None, cpu_clock=None):
+        self.root = root
+        self.draw = draw  # draws one frame; returns seconds until the next visible change, or None
+        self.fps = dict(ANIMATION_FPS if fps is None else fps)
+        self.budget = budget
+        self.clock = clock or time.perf_counter
+        self.cpu_clock = cpu_clock or time.process_time
+        self.mode = 'focused'
+        self.job = None
+        self.frame_cost = 0.0  # moving average of one frame's cost (seconds)
+        self.frames = collections.Counter()
+        self.usage = {mode: [0.0, 0.0] for mode in self.fps}  # mode -> [wall s, cpu s]
+        self.mark = (self.clock(), self.cpu_clock())
+
+    def set_mode(self, mode):
+        if mode == self.mode:
+            return False
+        self.account()
+        self.mode = mode
+        self.cancel()
+        return True
+
+    def account(self):
+        now = (self.clock(), self.cpu_clock())
+        usage = self.usage[self.mode]
+        usage[0] += now[0] - self.mark[0]
+        usage[1] += now[1] - self.mark[1]
+        self.mark = now
+
+    def interval(self, until_change):
+        fps = self.fps[self.mode]
+        if until_change is None or fps <= 1 or not self.budget > 0:
+            return None
+        return max(1.0 / fps, self.frame_cost / self.budget, until_change)
+
+    def schedule(self, until_change):
+        # (Re)arm the next frame; None stops the animation
+        self.cancel()
+        wait = self.interval(until_change)
+        if wait is not None:
+            self.job = self.root.after(max(1, int(wait * 1000)), self.frame)
+
+    def frame(self):
+        self.job = None
+        t0 = self.clock()
+        until_change = self.draw()
+        self.frame_cost += (self.clock() - t0 - self.frame_cost) * 0.1
+        self.frames[self.mode] += 1
+        self.schedule(until_change)
+
+    def cancel(self):
+        if self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+
+    def report(self):
+        # CPU is the whole process (all threads), i.e. what the app costs
+        # while sitting in each mode
+        self.account()
+        out = {}
+        for mode, (wall, cpu) in self.usage.items():
+            out[mode] = {'seconds': round(wall, 1),
+                         'cpu_percent': round(cpu / wall * 100, 3) if wall else None,
+                         'fps': round(self.frames[mode] / wall, 2) if wall else None}
+        out['frame_cost_ms'] = round(self.frame_cost * 1000, 3)
+        return out
+
+
+# --- Indexed session store ---
+class SessionStore:
+    # SQLite (WAL) store with one row per completed or skipped session.
+    # Triggers keep per-day, per-month and lifetime rollup tables up to date,
+    # so aggregates read a handful of rollup rows instead of scanning sessions.
+    # Aggregate results are cached until the next write.
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY,
+            start_ts REAL NOT NULL,
+            end_ts REAL NOT NULL,
+            day TEXT NOT NULL,
+            type TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            duration INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions(start_ts);
+        CREATE INDEX IF NOT EXISTS idx_sessions_type ON sessions(type, start_ts);
+        CREATE INDEX IF NOT EXISTS idx_sessions_key ON sessions(CAST(end_ts AS INTEGER), type, outcome);
+        CREATE TABLE IF NOT EXISTS daily_rollup (
+            day TEXT NOT NULL,
+            type TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            seconds INTEGER NOT NULL,
+            PRIMARY KEY (day, type, outcome)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS monthly_rollup (
+            month TEXT NOT NULL,
+            type TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            seconds INTEGER NOT NULL,
+            PRIMARY KEY (month, type, outcome)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS type_totals (
+            type TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            seconds INTEGER NOT NULL,
+            PRIMARY KEY (type, outcome)
+        ) WITHOUT ROWID;
+        CREATE TRIGGER IF NOT EXISTS trg_sessions_rollup AFTER INSERT ON sessions BEGIN
+            INSERT INTO daily_rollup (day, type, outcome, count, seconds)
+            VALUES (NEW.day, NEW.type, NEW.outcome, 1, NEW.duration)
+            ON CONFLICT (day, type, outcome)
+            DO UPDATE SET count = count + 1, seconds = seconds + excluded.seconds;
+            INSERT INTO monthly_rollup (month, type, outcome, count, seconds)
+            VALUES (substr(NEW.day, 1, 7), NEW.type, NEW.outcome, 1, NEW.duration)
+            ON CONFLICT (month, type, outcome)
+            DO UPDATE SET count = count + 1, seconds = seconds + excluded.seconds;
+            INSERT INTO type_totals (type, outcome, count, seconds)
+            VALUES (NEW.type, NEW.outcome, 1, NEW.duration)
+            ON CONFLICT (type, outcome)
+            DO UPDATE SET count = count + 1, seconds = seconds + excluded.seconds;
+        END;
+        CREATE TABLE IF NOT EXISTS baseline (
+            type TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        );
+    '''
+    INSERT_SQL = 'INSERT INTO sessions (start_ts, end_ts, day, type, outcome, duration) VALUES (?, ?, ?, ?, ?, ?)'
+    # Imports are deduplicated on (end second, type, outcome) via idx_sessions_key
+    IMPORT_SQL = '''
+        INSERT INTO sessions (start_ts, end_ts, day, type, outcome, duration)
+        SELECT ?, ?, ?, ?, ?, ? WHERE NOT EXISTS (
+            SELECT 1 FROM sessions WHERE CAST(end_ts AS INTEGER) = CAST(? AS INTEGER) AND type = ? AND outcome = ?)
+    '''
+    TOTALS_SQL = '''
+        SELECT type, SUM(count) FROM (
+            SELECT type, count FROM baseline
+            UNION ALL
+            SELECT type, count FROM type_totals WHERE outcome = 'completed'
+        ) GROUP BY type
+    '''
+    RANGE_SQL = {
+        'day': '''
+            SELECT day, type, count, seconds FROM daily_rollup
+            WHERE day >= ? AND day <= ? AND outcome = ?
+            ORDER BY day
+        ''',
+        'week': '''
+            SELECT date(day, '-6 days', 'weekday 1') AS week, type, SUM(count), SUM(seconds)
+            FROM daily_rollup WHERE day >= ? AND day <= ? AND outcome = ?
+            GROUP BY week, type ORDER BY week
+        ''',
+        'month': '''
+            SELECT month, type, count, seconds FROM monthly_rollup
+            WHERE month >= substr(?, 1, 7) AND month <= substr(?, 1, 7) AND outcome = ?
+            ORDER BY month
+        ''',
+    }
+
+    def __init__(self, path):
+        self.path = path
+        ensure_data_dir()
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.created = not self.conn.execute("SELECT 1 FROM sqlite_master WHERE name='sessions'").fetchone()
+        self.conn.executescript(self.SCHEMA)
+        self.cache = {}
+        self.data_version = None
+
+    def seed(self, lifetime, today):
+        # New database: lifetime totals from older versions become a baseline;
+        # today's counts are kept as a rollup row so "Today" survives.
+        with self.conn:
+            for k in ('pomodoro', 'short', 'long'):
+                day_count = int(today.get(k, 0)) if today else 0
+                self.conn.execute('INSERT OR REPLACE INTO baseline (type, count) VALUES (?, ?)',
+                                  (k, max(0, int(lifetime.get(k, 0)) - day_count)))
+                if day_count:
+                    self.conn.execute('INSERT OR REPLACE INTO daily_rollup VALUES (?, ?, ?, ?, 0)',
+                                      (today['date'], k, 'completed', day_count))
+                    self.conn.execute('INSERT OR REPLACE INTO monthly_rollup VALUES (?, ?, ?, ?, 0)',
+                                      (today['date'][:7], k, 'completed', day_count))
+                    self.conn.execute('INSERT OR REPLACE INTO type_totals VALUES (?, ?, ?, 0)',
+                                      (k, 'completed', day_count))
+        self.cache.clear()
+
+    def add(self, kind, outcome, duration, end_ts=None):
+        end_ts = end_ts if end_ts is not None else time.time()
+        start_ts = end_ts - duration
+        day = datetime.date.fromtimestamp(end_ts).isoformat()  # same day as the daily counters
+        with self.conn:
+            self.conn.execute(self.INSERT_SQL, (start_ts, end_ts, day, kind, outcome, int(duration)))
+        self.cache.clear()
+
+    def add_many(self, rows):
+        # Rows of (kind, outcome, duration, end_ts) in one transaction
+        with self.conn:
+            self.conn.executemany(self.INSERT_SQL, (
+                (end_ts - duration, end_ts, datetime.date.fromtimestamp(end_ts).isoformat(),
+                 kind, outcome, int(duration)) for kind, outcome, duration, end_ts in rows))
+        self.cache.clear()
+
+    def import_many(self, rows):
+        # Rows of (kind, outcome, duration, end_ts) in one transaction; rows
+        # already present (e.g. from an earlier import) are skipped. Returns
+        # the rows that were new.
+        added = []
+        with self.conn:
+            for kind, outcome, duration, end_ts in rows:
+                cur = self.conn.execute(self.IMPORT_SQL, (
+                    end_ts - duration, end_ts, datetime.date.fromtimestamp(end_ts).isoformat(),
+                    kind, outcome, int(duration), end_ts, kind, outcome))
+                if cur.rowcount:
+                    added.append((kind, outcome, duration, end_ts))
+        if added:
+            self.cache.clear()
+        return added
+
+    def iter_sessions(self, start_ts=None, end_ts=None):
+        # Streams (start_ts, end_ts, type, outcome, duration) in start order
+        return self.conn.execute(
+            'SELECT start_ts, end_ts, type, outcome, duration FROM sessions WHERE start_ts >= ? AND start_ts < ? ORDER BY start_ts',
+            (start_ts if start_ts is not None else float('-inf'), end_ts if end_ts is not None else float('inf')))
+
+    def daily_completed(self):
+        # (day, type, count) for every day; the stats window loads from this
+        return self.conn.execute("SELECT day, type, count FROM daily_rollup WHERE outcome = 'completed'")
+
+    def external_version(self):
+        # Bumped by commits from other connections (other app instances)
+        return self.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def cached(self, key, sql, params=()):
+        # data_version changes when another connection (another instance of
+        # the app) commits, so their sessions invalidate the cache too
+        version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        if version != self.data_version:
+            self.cache.clear()
+            self.data_version = version
+        if key not in self.cache:
+            self.cache[key] = self.conn.execute(sql, params).fetchall()
+        return self.cache[key]
+
+    # --- Aggregates ---
+    def totals(self):
+        rows = self.cached('totals', self.TOTALS_SQL)
+        out = {'pomodoro': 0, 'short': 0, 'long': 0}
+        out.update({k: int(v) for k, v in rows})
+        return out
+
+    def day_totals(self, day):
+        out = {'pomodoro': 0, 'short': 0, 'long': 0}
+        for _, kind, count, _ in self.aggregate('day', day, day):
+            out[kind] = int(count)
+        return out
+
+    def aggregate(self, period, start_day, end_day, outcome='completed'):
+        # Rows of (bucket, type, count, seconds) for 'day', 'week' or 'month'
+        # buckets between two ISO dates (inclusive)
+        return self.cached(('range', period, start_day, end_day, outcome), self.RANGE_SQL[period],
+                           (start_day, end_day, outcome))
+
+    def close(self):
+        self.conn.close()
+
+
+# --- Statistics ---
+class DayStats:
+    # Completed sessions per day, kept in one array per year (3 kinds x 366
+    # days), with rollups updated on every add: totals, per-weekday, per-ISO-
+    # week and per-month counts and the pomodoro streak. Every statistic is
+    # O(1) to read; only the heatmap looks at a year of cells.
+    KINDS = ('pomodoro', 'short', 'long')
+
+    def __init__(self):
+        self.years = {}  # year -> array('I') of 3 * 366 counts
+        self.totals = [0, 0, 0]
+        self.weekday = [0] * 7  # pomodoros per weekday (Monday = 0)
+        self.weeks = collections.Counter()  # (iso year, iso week, kind) -> count
+        self.months = collections.Counter()  # ('YYYY-MM', kind) -> count
+        self.first = None  # ordinal of the first active day
+        self.streak = 0  # length of the run of pomodoro days ending at streak_end
+        self.streak_end = None
+        self.longest = 0
+
+    @staticmethod
+    def day_info(date):
+        # Everything add() needs to know about a day, computed once
+        ordinal = date.toordinal()
+        iso = date.isocalendar()
+        return (date.year, ordinal - datetime.date(date.year, 1, 1).toordinal(), ordinal,
+                (iso[0], iso[1]), date.isoformat()[:7], date.weekday())
+
+    def count(self, date, kind='pomodoro'):
+        year = self.years.get(date.year)
+        if year is None:
+            return 0
+        return year[self.KINDS.index(kind) * 366 + date.toordinal() - datetime.date(date.year, 1, 1).toordinal()]
+
+    def add(self, day, kind, n=1, streaks=True, info=None):
+        if info is None:
+            info = self.day_info(datetime.date.fromisoformat(day) if isinstance(day, str) else day)
+        year_no, yday, ordinal, week, month, weekday = info
+        k = self.KINDS.index(kind)
+        year = self.years.get(year_no)
+        if year is None:
+            year = self.years[year_no] = array.array('I', bytes(4 * 3 * 366))
+        i = k * 366 + yday
+        was = year[i]
+        year[i] = was + n
+        self.totals[k] += n
+        self.weeks[week + (kind,)] += n
+        self.months[(month, kind)] += n
+        if self.first is None or ordinal < self.first:
+            self.first = ordinal
+        if k == 0:
+            self.weekday[weekday] += n
+            if streaks and not was and n:
+                self.extend_streak(ordinal)
+
+    def extend_streak(self, ordinal):
+        # A day just got its first pomodoro
+        if self.streak_end is not None and ordinal <= self.streak_end:
+            self.recompute_streaks()  # back-filled day (import, catch-up)
+        elif self.streak_end is not None and ordinal == self.streak_end + 1:
+            self.streak += 1
+            self.streak_end = ordinal
+        else:
+            self.streak, self.streak_end = 1, ordinal
+        self.longest = max(self.longest, self.streak)
+
+    def recompute_streaks(self):
+        # One pass over the active days (after a bulk load)
+        self.streak, self.streak_end, self.longest = 0, None, 0
+        for year in sorted(self.years):
+            counts = self.years[year]
+            start = datetime.date(year, 1, 1).toordinal()
+            for d in range(366):
+                if counts[d]:  # index 365 is only ever set in leap years
+                    self.extend_streak(start + d)
+
+    @classmethod
+    def from_rows(cls, rows):
+        stats = cls()
+        infos = {}
+        for day, kind, count in rows:
+            if kind in cls.KINDS and count:
+                info = infos.get(day)
+                if info is None:
+                    info = infos[day] = cls.day_info(datetime.date.fromisoformat(day))
+                stats.add(day, kind, int(count), streaks=False, info=info)
+        stats.recompute_streaks()
+        return stats
+
+    # --- Statistics ---
+    def current_streak(self, today):
+        # A streak is still alive if the last pomodoro day is today or yesterday
+        if self.streak_end is None or today.toordinal() - self.streak_end > 1:
+            return 0
+        return self.streak
+
+    def weekday_averages(self, today):
+        # Average pomodoros per weekday since the first active day
+        if self.first is None:
+            return [0.0] * 7
+        days = today.toordinal() - self.first + 1
+        first_wd = datetime.date.fromordinal(self.first).weekday()
+        out = []
+        for wd in range(7):
+            n = days // 7 + (1 if (wd - first_wd) % 7 < days % 7 else 0)
+            out.append(self.weekday[wd] / n if n else 0.0)
+        return out
+
+    def break_ratio(self):
+        # Breaks taken per pomodoro completed
+        return (self.totals[1] + self.totals[2]) / self.totals[0] if self.totals[0] else 0.0
+
+    def week_total(self, today, kind='pomodoro'):
+        iso = today.isocalendar()
+        return self.weeks[(iso[0], iso[1], kind)]
+
+    def month_total(self, today, kind='pomodoro'):
+        return self.months[(today.isoformat()[:7], kind)]
+
+    def heatmap(self, today, colors, weeks=53):
+        # PhotoImage data (7 rows x `weeks` columns, Monday on top, the last
+        # column holds today) built in one pass; future days use colour 0
+        start = today.toordinal() - today.weekday() - 7 * (weeks - 1)
+        last = today.toordinal()
+        rows = []
+        for wd in range(7):
+            cells = []
+            for w in range(weeks):
+                ordinal = start + 7 * w + wd
+                n = self.count(datetime.date.fromordinal(ordinal)) if ordinal <= last else 0
+                cells.append(colors[bisect.bisect_right(HEATMAP_LEVELS, n)])
+            rows.append('{' + ' '.join(cells) + '}')
+        return ' '.join(rows), start
+
+
+# --- Tray icon frames ---
+class TrayFrameCache:
+    # Tray icons quantised to STEPS progress steps per phase and theme, each
+    # rendered once with PIL on first use and then reused. At most
+    # (STEPS + 1) x 3 phases x palettes-in-use small frames are ever held.
+    STEPS = 60
+    SIZE = 64
+
+    def __init__(self, Image, ImageDraw, steps=STEPS):
+        self.Image = Image
+        self.ImageDraw = ImageDraw
+        self.steps = steps
+        self.frames = {}
+        self.renders = 0
+
+    def key_for(self, state, palette, remaining, total):
+        frac = 1 - (remaining / total) if total > 0 else 0
+        step = min(self.steps, max(0, int(frac * self.steps)))
+        return (state, palette, step)
+
+    def frame(self, key):
+        img = self.frames.get(key)
+        if img is None:
+            img = self.frames[key] = self.render(*key)
+        return img
+
+    def render(self, state, palette, step):
+        self.renders += 1
+        size = self.SIZE
+        img = self.Image.new('RGBA', (size, size), (0, 0, 0, 0))
+        d = self.ImageDraw.Draw(img)
+        box = (4, 4, size - 4, size - 4)
+        d.ellipse(box, fill=palette.panel, outline='#888888', width=3)
+        if step:
+            d.pieslice(box, start=-90, end=-90 + 360 * step / self.steps, fill=palette.phase(state).color)
+        return img
+
+    def prerender(self, palettes=PALETTES.values()):
+        for palette in palettes:
+            for state in LIMITS:
+                for step in range(self.steps + 1):
+                    self.frame((state, palette, step))
+
+
+# --- Audio cues ---
+SAMPLE_RATE = 22050
+CUES = {
+    # name -> notes as (frequency Hz, seconds); 0 Hz is a rest. The System*
+    # names are the Windows sound aliases earlier versions played: winsound
+    # still plays those system sounds, other backends these tones.
+    'SystemAsterisk': ((880, 0.12), (1320, 0.22)),
+    'SystemExclamation': ((660, 0.1), (0, 0.04), (660, 0.1), (0, 0.04), (990, 0.25)),
+    'SystemHand': ((440, 0.4),),
+    'SystemQuestion': ((990, 0.12), (740, 0.12), (990, 0.25)),
+    'Chime': ((1046, 0.16), (1318, 0.16), (1568, 0.45)),
+}
+DEFAULT_CUE = 'SystemAsterisk'
+SYSTEM_SOUNDS = ('SystemAsterisk', 'SystemExclamation', 'SystemHand', 'SystemQuestion')
+
+
+def valid_cue(name):
+    # A built-in cue or the path of a WAV file
+    return isinstance(name, str) and (name in CUES or name.lower().endswith('.wav'))
+PLAYER_ARGS = {'paplay': [], 'aplay': ['-q'], 'afplay': []}  # command-line players, tried in this order
+
+
+def synthesize_cue(notes, volume, rate=SAMPLE_RATE):
+    # 16-bit mono PCM. Each note gets a 5 ms attack and an exponential decay,
+    # so it starts and ends without clicks.
+    pcm = array.array('h')
+    amp = 32767 * 0.7 * volume
+    attack = max(1, int(0.005 * rate))
+    for freq, seconds in notes:
+        n = int(seconds * rate)
+        if not freq:
+            pcm.extend([0] * n)
+            continue
+        step = 2 * math.pi * freq / rate
+        decay = 5.0 / n
+        pcm.extend(int(amp * min(1.0, i / attack) * math.exp(-decay * i) * math.sin(step * i)) for i in range(n))
+    return pcm
+
+
+def decode_wav(path, volume):
+    # A 16-bit PCM WAV file as (samples, rate, channels), scaled by volume
+    import wave
+    with wave.open(path, 'rb') as w:
+        if w.getsampwidth() != 2:
+            raise ValueError(f'{path}: only 16-bit PCM WAV files are supported')
+        rate, channels = w.getframerate(), w.getnchannels()
+        pcm = array.array('h', w.readframes(w.getnframes()))
+    if sys.byteorder == 'big':
+        pcm.byteswap()
+    if volume < 1.0:
+        pcm = array.array('h', (int(v * volume) for v in pcm))
+    return pcm, rate, channels
+
+
+class AudioClip:
+    # One rendered cue: a complete in-memory WAV, plus a temp file written
+    # on demand for players that need a path
+    def __init__(self, key, pcm, rate=SAMPLE_RATE, channels=1):
+        import io
+        import wave
+        if sys.byteorder == 'big':
+            pcm = array.array('h', pcm)
+            pcm.byteswap()
+        buf = io.BytesIO()
+        with wave.open(buf, 'wb') as w:
+            w.setnchannels(channels)
+            w.setsampwidth(2)
+            w.setframerate(rate)
+            w.writeframes(pcm.tobytes())
+        self.key = key
+        self.wav = buf.getvalue()
+        self.seconds = len(pcm) / channels / rate
+        self.path = None
+
+    def file(self):
+        if self.path is None:
+            import tempfile
+            fd, path = tempfile.mkstemp(prefix='pomodoro-cue-', suffix='.wav')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.wav)
+            self.path = path
+        return self.path
+
+    def discard(self):
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+
+def render_clip(cue, volume):
+    # Built-in cue names are synthesised; anything else is taken as the path
+    # of a WAV file. Unknown names and unreadable files give the default cue.
+    key = (cue, volume)
+    if cue not in CUES and os.path.isfile(os.path.expanduser(cue)):
+        try:
+            pcm, rate, channels = decode_wav(os.path.expanduser(cue), volume)
+            return AudioClip(key, pcm, rate, channels)
+        except (OSError, EOFError, ValueError):
+            pass
+    return AudioClip(key, synthesize_cue(CUES.get(cue, CUES[DEFAULT_CUE]), volume))
+
+
+class NullAudio:
+    # Plays nothing; records what would have been played (tests, benchmarks)
+    name = 'null'
+
+    def __init__(self):
+        self.played = []
+
+    def play(self, clip, started):
+        started()
+        self.played.append(clip.key)
+
+
+class FileSinkAudio:
+    # Writes each played clip to a WAV file instead of a device
+    name = 'file'
+
+    def __init__(self, path):
+        self.path = path
+        self.played = 0
+
+    def play(self, clip, started):
+        started()
+        with open(self.path, 'wb') as f:
+            f.write(clip.wav)
+        self.played += 1
+
+
+class WinsoundAudio:
+    # Plays the in-memory WAV, or the user's Windows system sound for the
+    # SYSTEM_SOUNDS aliases (at the system volume); blocks the audio thread
+    # (not the UI) for the length of the cue
+    name = 'winsound'
+
+    def __init__(self, winsound):
+        self.winsound = winsound
+
+    def play(self, clip, started):
+        started()
+        cue = clip.key[0]
+        if cue in SYSTEM_SOUNDS:
+            self.winsound.PlaySound(cue, self.winsound.SND_ALIAS)
+        else:
+            self.winsound.PlaySound(clip.wav, self.winsound.SND_MEMORY | self.winsound.SND_NODEFAULT)
+
+
+class CommandAudio:
+    # A command-line player (PulseAudio/PipeWire paplay, ALSA aplay, macOS
+    # afplay) started without waiting for it to finish
+    def __init__(self, name, argv):
+        self.name = name
+        self.argv = argv
+        self.procs = []
+
+    def play(self, clip, started):
+        import subprocess
+        self.procs = [p for p in self.procs if p.poll() is None]
+        self.procs.append(subprocess.Popen(self.argv + [clip.file()], stdin=subprocess.DEVNULL,
+                                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        started()
+
+
+class BellAudio:
+    # Last resort: the terminal bell, as before
+    name = 'bell'
+
+    def play(self, clip, started):
+        started()
+        print('\a', end='', flush=True)
+
+
+def audio_backend(spec=None):
+    # spec: 'winsound', 'paplay', 'aplay', 'afplay', 'null', 'file:PATH', or
+    # None for the first one available on this system
+    if spec == 'null':
+        return NullAudio()
+    if spec and spec.startswith('file:'):
+        return FileSinkAudio(spec[5:])
+    import shutil
+    names = [spec] if spec else ['winsound'] if platform.system() == 'Windows' else list(PLAYER_ARGS)
+    for name in names:
+        if name == 'winsound':
+            winsound = optional_import('winsound')
+            if winsound:
+                return WinsoundAudio(winsound)
+        elif name in PLAYER_ARGS and shutil.which(name):
+            return CommandAudio(name, [shutil.which(name)] + PLAYER_ARGS[name])
+    return BellAudio()
+
+
+class AudioEngine:
+    # Non-blocking cue playback. play() only queues a job for the audio
+    # thread, which renders each (cue, volume) once into an in-memory WAV,
+    # reuses it from the cache afterwards and hands it to the backend. The
+    # backend is chosen on first use ($POMODORO_AUDIO overrides). Start
+    # latency is measured from the play() call to the backend starting.
+    CACHE_CLIPS = 16
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.cache = {}  # (cue, volume) -> AudioClip; audio thread only
+        self.worker = BackgroundWorker('pomodoro-audio', maxsize=4)
+        self.latency = LatencyHistogram()
+        self.renders = 0
+        self.plays = 0
+        self.failed = 0
+
+    def play(self, cue, volume):
+        return self.worker.submit(self.run, cue, round(volume, 2), time.perf_counter())
+
+    def preload(self, cues, volume):
+        # Render ahead of time so the first cycle end plays from the cache;
+        # one job, so it never takes queue slots from play()
+        return self.worker.submit(self.render, list(dict.fromkeys(cues)), round(volume, 2))
+
+    def render(self, cues, volume):
+        for cue in cues:
+            self.clip(cue, volume)
+
+    def clip(self, cue, volume):
+        key = (cue, volume)
+        clip = self.cache.get(key)
+        if clip is None:
+            if len(self.cache) >= self.CACHE_CLIPS:
+                self.cache.pop(next(iter(self.cache))).discard()
+            clip = self.cache[key] = render_clip(cue, volume)
+            self.renders += 1
+        return clip
+
+    def run(self, cue, volume, t0):
+        clip = self.clip(cue, volume)
+        if self.backend is None:
+            self.backend = audio_backend(os.getenv('POMODORO_AUDIO'))
+        try:
+            self.backend.play(clip, lambda: self.latency.record(time.perf_counter() - t0))
+            self.plays += 1
+        except Exception:
+            self.failed += 1
+
+    def stats(self):
+        return {'backend': getattr(self.backend, 'name', None), 'plays': self.plays, 'renders': self.renders,
+                'failed': self.failed, 'dropped': self.worker.dropped, 'start_latency_ms': self.latency.summary()}
+
+    def close(self):
+        self.worker.close()
+        for clip in list(self.cache.values()):
+            clip.discard()
 
-# Data directory resolution (env override -> AppData -> frozen exe dir -> home fallback)
-CUSTOM_DATA_DIR = os.getenv('POMODORO_DATA_DIR')
-if CUSTOM_DATA_DIR:
-    DATA_DIR = CUSTOM_DATA_DIR
-else:
-    appdata = os.getenv('APPDATA')
-    if appdata:
-        DATA_DIR = os.path.join(appdata, 'PomodoroTimer')
-    elif getattr(sys, 'frozen', False):  # running from PyInstaller bundle
-        DATA_DIR = os.path.join(os.path.dirname(sys.executable), 'data')
-    else:
-        DATA_DIR = os.path.join(os.path.expanduser('~'), '.pomodoro_timer')
-os.makedirs(DATA_DIR, exist_ok=True)
-HISTORY_FILE = os.path.join(DATA_DIR, 'history.json')
-SETTINGS_FILE = os.path.join(DATA_DIR, 'settings.json')
 
 class PomodoroApp:
-    def __init__(self, root):
+    def __init__(self, root, clock=None, wall_clock=None):
+        # clock (monotonic seconds) drives the countdown and wall_clock (epoch
+        # seconds) the schedule, session timestamps and today's date; both
+        # can be virtual (benchmarks/simulate.py)
         self.root = root
         self.root.title('🍅 Pomodoro Timer')
-        self.root.geometry('520x680')
         self.root.minsize(480, 640)
         self.root.resizable(True, True)
-        self.center_window()
+        self.center_window(520, 680)
         self.root.protocol('WM_DELETE_WINDOW', self.exit_app)
 
         # --- Timer state ---
@@ -78,116 +2598,215 @@ class PomodoroApp:
             'short': 5 * 60,
             'long': 40 * 60
         }
+        self.engine = TimerEngine(clock)
+        self.engine.load(self.time_left)
+        self.wall_clock = wall_clock or time.time  # schedule time; survives suspend unlike the engine's clock
+        self.timeline = None  # ScheduleTimeline while running
+        self.last_drift = None  # drift report of the last completed session
         self.long_break_interval = 4  # customizable
         self.auto_start = False
         self.muted = False
-        self.sound_choice = 'SystemAsterisk'
+        self.sound_choice = DEFAULT_CUE
+        self.sound_cues = {}  # phase -> cue played when that phase ends (default: sound_choice)
+        self.volume = 80  # percent
         self.dark_mode = False
+        self.light_theme = 'light'  # palette names used in light / dark mode
+        self.dark_theme = 'dark'
+        self.palettes = PALETTES  # plus user themes from themes.json (load_settings)
+        self.palette = PALETTES['light']
         self.daily_counts = {'date': self.today_str(), 'pomodoro': 0, 'short': 0, 'long': 0}
+        self.midnight = None  # after() id of the daily-count rollover
+        self.log_sync = None  # after() id of the pending session-log fsync
         self.tray_icon = None
         self.notifier = None
         self.window_hidden = False
         self.tray_thread = None
+        self.tray_frames = None  # TrayFrameCache, created with the first tray icon
+        self.tray_key = None  # frame currently shown in the tray
+        self.tray_title = None
+        self.renderer = WidgetRenderer()
+        self.metrics = Metrics(enabled=os.getenv('POMODORO_METRICS') == '1')
+        self.visibility = 'focused'  # 'focused', 'unfocused' or 'hidden' (withdrawn/iconified)
+        self.visibility_check = None  # pending after_idle re-check after focus events
+        self.animator = RingAnimator(self.root, self.animate_ring)
+        self.metrics.reports['animation'] = self.animator.report
+        self.writer = PersistenceWriter()
+        self.writer.metrics = self.metrics
+        self.notify_worker = BackgroundWorker('pomodoro-notify')
+        self.audio = AudioEngine()
+        self.metrics.reports['audio'] = self.audio.stats
+        self.bus = EventBus(load_subscribers(INTEGRATIONS_FILE) if os.path.exists(INTEGRATIONS_FILE) else ())
+        self.control = None  # ControlServer on CONTROL_SOCKET, opened after the first paint
+        self.control_key = None  # last status pushed to control subscribers
+        self.banner_hide = None
+        self.style_key = None  # (state, palette) of the last restyle
 
         # --- History and counters ---
+        self.data_lock = FileLock(LOCK_FILE)  # shared with other instances on this data dir
+        self.shared = None  # SharedCounters for today's counts when there is no store
+        self.day_stats = None  # DayStats, loaded when the statistics window first opens
+        self.day_stats_version = None  # store data_version the stats were loaded at
+        self.stats_window = None
         self.history = self.load_history()
         self.load_settings()
+        self.store = None  # opened right after the first paint
         self.counters = {'pomodoro': 0, 'short': 0, 'long': 0}
+        mark_startup('settings/history load')
 
         # --- UI ---
         self.build_ui()
-        self.setup_notifications()
         self.update_ui()
+        mark_startup('build_ui')
+        self.root.after_idle(self.finish_startup)
+
+    def finish_startup(self):
+        # Runs once the first frame is up; work the first paint does not need
+        mark_startup('first paint')
+        self.store = self.open_store()
+        self.shared = None if self.store else self.open_shared_counters()
+        self.metrics.attach(self.root)
+        self.bus.start()
+        self.control = self.open_control()
+        if not self.muted:
+            self.audio.preload([self.cue_for(phase) for phase in self.durations], self.volume / 100)
+        self.schedule_midnight()
+        self.update_ui()
+        mark_startup('deferred init')
 
     # --- UI Construction ---
     def build_ui(self):
+        # Widgets only name a ttk style; colours live in the styles, so a theme
+        # or phase switch reconfigures a few styles, not every widget
+        self.style = ttk.Style(self.root)
+        self.style.theme_use('clam')  # honours background/foreground options on every platform
+        self.configure_static_styles()
         # Root frame
-        self.frame = tk.Frame(self.root, bg=self.bg_color())
+        self.frame = ttk.Frame(self.root, style='App.TFrame')
         self.frame.pack(fill='both', expand=True)
         # Header
-        self.title_label = tk.Label(self.frame, text='🍅 Pomodoro Timer', font=('Arial', 22, 'bold'), bg=self.bg_color())
+        self.title_label = ttk.Label(self.frame, text='🍅 Pomodoro Timer', style='Title.TLabel')
         self.title_label.pack(pady=(18, 6))
-        self.emoji_label = tk.Label(self.frame, text=self.current_themes()['pomodoro']['emoji'], font=('Arial', 54), bg=self.bg_color())
+        self.emoji_label = ttk.Label(self.frame, text=self.palette.pomodoro.emoji, style='Emoji.TLabel')
         self.emoji_label.pack(pady=(0, 6))
-        self.timer_label = tk.Label(self.frame, text=self.format_time(self.time_left), font=('Arial Rounded MT Bold', 54, 'bold'), bg=self.bg_color())
+        self.timer_label = ttk.Label(self.frame, text=self.format_time(self.time_left), style='Timer.TLabel')
         self.timer_label.pack(pady=(0, 8))
-        self.state_label = tk.Label(self.frame, text=self.current_themes()['pomodoro']['label'], font=('Arial', 15, 'bold'), bg=self.bg_color())
+        self.state_label = ttk.Label(self.frame, text=self.palette.pomodoro.label, style='Phase.TLabel')
         self.state_label.pack(pady=(0, 14))
         # Counters
-        self.counter_bar = tk.Frame(self.frame, bg=self.panel_bg(), bd=0, highlightbackground='#444' if self.dark_mode else '#e0e0e0', highlightthickness=1)
+        self.counter_bar = ttk.Frame(self.frame, style='Panel.TFrame')
         self.counter_bar.pack(pady=(0, 16), fill='x')
-        self.counter_label = tk.Label(self.counter_bar, text=self.get_counter_text(), font=('Arial', 13, 'bold'), bg=self.panel_bg(), fg=self.fg_color(), pady=10)
+        self.counter_label = ttk.Label(self.counter_bar, text=self.get_counter_text(), style='Counter.TLabel', anchor='center', padding=(0, 10))
         self.counter_label.pack(fill='x')
         # History cumulative label
-        self.history_label = tk.Label(self.frame, text=self.get_history_text(), font=('Arial', 10), bg=self.bg_color(), fg=self.secondary_text_color(), justify='center')
+        self.history_label = ttk.Label(self.frame, text=self.get_history_text(), style='Secondary.TLabel', justify='center')
         self.history_label.pack(pady=(0, 10))
         # Control buttons
-        btn_frame = tk.Frame(self.frame, bg=self.bg_color())
+        btn_frame = ttk.Frame(self.frame, style='App.TFrame')
         btn_frame.pack(pady=6)
-        self.start_btn = tk.Button(btn_frame, text='▶ Start', command=self.start_timer, font=('Arial', 13, 'bold'), bg='#ff6347', fg='white', bd=0, padx=18, pady=8)
+        self.start_btn = ttk.Button(btn_frame, text='▶ Start', command=self.start_timer, style='Start.TButton')
         self.start_btn.grid(row=0, column=0, padx=10)
-        self.pause_btn = tk.Button(btn_frame, text='⏸ Pause', command=self.pause_timer, font=('Arial', 13, 'bold'), bg='#ffa500', fg='white', bd=0, padx=18, pady=8)
+        self.pause_btn = ttk.Button(btn_frame, text='⏸ Pause', command=self.pause_timer, style='Pause.TButton')
         self.pause_btn.grid(row=0, column=1, padx=10)
-        self.reset_btn = tk.Button(btn_frame, text='🔄 Reset', command=self.reset_timer, font=('Arial', 13, 'bold'), bg='#e0e0e0', fg='#333', bd=0, padx=18, pady=8)
+        self.reset_btn = ttk.Button(btn_frame, text='🔄 Reset', command=self.reset_timer, style='Reset.TButton')
         self.reset_btn.grid(row=0, column=2, padx=10)
-        self.skip_btn = tk.Button(btn_frame, text='⏭ Skip', command=self.skip_timer, font=('Arial', 13, 'bold'), bg='#4682b4', fg='white', bd=0, padx=18, pady=8)
+        self.skip_btn = ttk.Button(btn_frame, text='⏭ Skip', command=self.skip_timer, style='Skip.TButton')
         self.skip_btn.grid(row=0, column=3, padx=10)
-        self.exit_btn = tk.Button(btn_frame, text='❌ Exit', command=self.exit_app, font=('Arial', 13, 'bold'), bg='#d9534f', fg='white', bd=0, padx=18, pady=8)
+        self.exit_btn = ttk.Button(btn_frame, text='❌ Exit', command=self.exit_app, style='Exit.TButton')
         self.exit_btn.grid(row=0, column=4, padx=10)
         # Duration controls
-        self.length_frame = tk.Frame(self.frame, bg=self.bg_color())
+        self.length_frame = ttk.Frame(self.frame, style='App.TFrame')
         self.length_frame.pack(pady=(18, 0))
         self.add_duration_control('Pomodoro', 'pomodoro', 0)
         self.add_duration_control('Short Break', 'short', 1)
         self.add_duration_control('Long Break', 'long', 2)
         # Settings panel
-        settings_frame = tk.Frame(self.frame, bg=self.bg_color())
+        settings_frame = ttk.Frame(self.frame, style='App.TFrame')
         settings_frame.pack(pady=(10, 0), fill='x')
-        tk.Label(settings_frame, text='Long break every', font=('Arial', 11), bg=self.bg_color(), fg=self.secondary_text_color()).grid(row=0, column=0, sticky='e', padx=4, pady=4)
+        ttk.Label(settings_frame, text='Long break every', style='Setting.TLabel').grid(row=0, column=0, sticky='e', padx=4, pady=4)
         self.long_break_var = tk.IntVar(value=self.long_break_interval)
-        tk.Spinbox(settings_frame, from_=2, to=12, width=4, textvariable=self.long_break_var, command=self.update_long_break_interval, justify='center').grid(row=0, column=1, padx=4)
-        tk.Label(settings_frame, text='pomodoros', font=('Arial', 11), bg=self.bg_color(), fg=self.secondary_text_color()).grid(row=0, column=2, sticky='w')
+        ttk.Spinbox(settings_frame, from_=LONG_BREAK_RANGE[0], to=LONG_BREAK_RANGE[1], width=4, textvariable=self.long_break_var, command=self.update_long_break_interval, justify='center', style='App.TSpinbox').grid(row=0, column=1, padx=4)
+        ttk.Label(settings_frame, text='pomodoros', style='Setting.TLabel').grid(row=0, column=2, sticky='w')
         self.auto_start_var = tk.BooleanVar(value=self.auto_start)
-        tk.Checkbutton(settings_frame, text='Auto-start next', variable=self.auto_start_var, command=self.toggle_auto_start, bg=self.bg_color(), fg=self.fg_color(), selectcolor=self.panel_bg()).grid(row=0, column=3, padx=8)
+        ttk.Checkbutton(settings_frame, text='Auto-start next', variable=self.auto_start_var, command=self.toggle_auto_start, style='App.TCheckbutton').grid(row=0, column=3, padx=8)
         self.mute_var = tk.BooleanVar(value=self.muted)
-        tk.Checkbutton(settings_frame, text='Mute', variable=self.mute_var, command=self.toggle_mute, bg=self.bg_color(), fg=self.fg_color(), selectcolor=self.panel_bg()).grid(row=0, column=4, padx=8)
+        ttk.Checkbutton(settings_frame, text='Mute', variable=self.mute_var, command=self.toggle_mute, style='App.TCheckbutton').grid(row=0, column=4, padx=8)
         self.dark_mode_var = tk.BooleanVar(value=self.dark_mode)
-        tk.Checkbutton(settings_frame, text='Dark', variable=self.dark_mode_var, command=self.toggle_dark_mode, bg=self.bg_color(), fg=self.fg_color(), selectcolor=self.panel_bg()).grid(row=0, column=5, padx=8)
-        tk.Label(settings_frame, text='Sound', font=('Arial', 11), bg=self.bg_color(), fg=self.secondary_text_color()).grid(row=1, column=0, sticky='e', padx=4, pady=4)
+        ttk.Checkbutton(settings_frame, text='Dark', variable=self.dark_mode_var, command=self.toggle_dark_mode, style='App.TCheckbutton').grid(row=0, column=5, padx=8)
+        ttk.Label(settings_frame, text='Sound', style='Setting.TLabel').grid(row=1, column=0, sticky='e', padx=4, pady=4)
         self.sound_var = tk.StringVar(value=self.sound_choice)
-        sound_options = ['SystemAsterisk', 'SystemExclamation', 'SystemHand', 'SystemQuestion']
-        tk.OptionMenu(settings_frame, self.sound_var, *sound_options, command=lambda _: self.update_sound_choice()).grid(row=1, column=1, columnspan=2, sticky='w', padx=4)
+        sound_options = list(CUES)
+        ttk.OptionMenu(settings_frame, self.sound_var, self.sound_choice, *sound_options, command=lambda _: self.update_sound_choice(), style='App.TMenubutton').grid(row=1, column=1, columnspan=2, sticky='w', padx=4)
+        ttk.Button(settings_frame, text='📊 Stats', command=self.open_stats, style='Stats.TButton').grid(row=1, column=3, padx=8)
+        ttk.Label(settings_frame, text='Volume', style='Setting.TLabel').grid(row=2, column=0, sticky='e', padx=4, pady=4)
+        self.volume_var = tk.IntVar(value=self.volume)
+        ttk.Scale(settings_frame, from_=0, to=100, variable=self.volume_var, command=lambda _: self.update_volume(), style='App.Horizontal.TScale').grid(row=2, column=1, columnspan=3, sticky='we', padx=4)
         # Progress
-        self.progress_canvas = tk.Canvas(self.frame, width=220, height=220, bg=self.bg_color(), highlightthickness=0)
+        self.progress_canvas = tk.Canvas(self.frame, width=220, height=220, bg=self.palette.bg, highlightthickness=0)
         self.progress_canvas.pack(pady=14)
-        self.progress_arc = None
+        # Ring items are created once and then only reconfigured
+        self.progress_oval = self.progress_canvas.create_oval(10, 10, 210, 210, outline=self.palette.secondary, width=10)
+        self.progress_arc = self.progress_canvas.create_arc(10, 10, 210, 210, start=-90, extent=0, style='arc', outline=self.palette.phase(self.state).color, width=10)
         # Daily counts
-        self.daily_label = tk.Label(self.frame, text=self.get_daily_text(), font=('Arial', 10, 'bold'), bg=self.bg_color(), fg=self.secondary_text_color())
+        self.daily_label = ttk.Label(self.frame, text=self.get_daily_text(), style='Daily.TLabel')
         self.daily_label.pack(pady=(4, 6))
+        # Cycle-end banner (shown with place() over the top of the window)
+        self.banner = tk.Label(self.frame, font=('Arial', 12, 'bold'), fg='white', padx=14, pady=6, cursor='hand2')
+        self.banner.bind('<Button-1>', self.hide_banner)
         # Shortcuts
-        for seq, func in [('<space>', self.pause_timer), ('<s>', self.start_timer), ('<S>', self.start_timer), ('<r>', self.reset_timer), ('<R>', self.reset_timer), ('<k>', self.skip_timer), ('<K>', self.skip_timer), ('<Escape>', self.exit_app)]:
+        for seq, func in [('<space>', self.pause_timer), ('<s>', self.start_timer), ('<S>', self.start_timer), ('<r>', self.reset_timer), ('<R>', self.reset_timer), ('<k>', self.skip_timer), ('<K>', self.skip_timer), ('<t>', self.open_stats), ('<T>', self.open_stats), ('<Escape>', self.exit_app)]:
             self.root.bind(seq, lambda e, f=func: f())
+        self.root.bind('<Control-m>', lambda e: self.toggle_metrics())
         # Minimize / restore
         self.root.bind('<Unmap>', self.on_minimize)
         self.root.bind('<Map>', self.on_restore)
+        self.root.bind('<FocusIn>', self.on_focus)
+        self.root.bind('<FocusOut>', self.on_focus)
+
+    def configure_static_styles(self):
+        # Fonts, padding and the fixed button colours; set once
+        st = self.style
+        st.configure('Title.TLabel', font=('Arial', 22, 'bold'))
+        st.configure('Emoji.TLabel', font=('Arial', 54))
+        st.configure('Timer.TLabel', font=('Arial Rounded MT Bold', 54, 'bold'))
+        st.configure('Phase.TLabel', font=('Arial', 15, 'bold'))
+        st.configure('Counter.TLabel', font=('Arial', 13, 'bold'))
+        st.configure('Secondary.TLabel', font=('Arial', 10))
+        st.configure('Daily.TLabel', font=('Arial', 10, 'bold'))
+        st.configure('Setting.TLabel', font=('Arial', 11))
+        st.configure('Duration.TLabel', font=('Arial', 12))
+        st.configure('Mono.TLabel', font=('Consolas', 10))
+        st.configure('Summary.TLabel', font=('Arial', 12, 'bold'))
+        st.configure('Panel.TFrame', borderwidth=1, relief='solid')
+        for name, bg, fg in (('Start', '#ff6347', 'white'), ('Pause', '#ffa500', 'white'), ('Skip', '#4682b4', 'white'),
+                             ('Exit', '#d9534f', 'white'), ('Reset', '#e0e0e0', '#333'), ('Stats', '#e0e0e0', '#333')):
+            st.configure(f'{name}.TButton', font=('Arial', 11 if name == 'Stats' else 13, 'bold'), background=bg,
+                         foreground=fg, borderwidth=0, padding=(18, 8) if name != 'Stats' else (10, 4))
+            st.map(f'{name}.TButton', background=[('disabled', '#cccccc'), ('active', bg)],
+                   foreground=[('disabled', '#f4f4f4')])
 
     def add_duration_control(self, label, key, row):
         minv, maxv = LIMITS[key]
-        tk.Label(self.length_frame, text=f'{label} ({minv}-{maxv} min):', font=('Arial', 12), bg=self.bg_color(), fg=self.secondary_text_color()).grid(row=row, column=0, sticky='e', padx=6, pady=4)
+        ttk.Label(self.length_frame, text=f'{label} ({minv}-{maxv} min):', style='Duration.TLabel').grid(row=row, column=0, sticky='e', padx=6, pady=4)
         var = tk.IntVar(value=self.durations[key] // 60)
-        spin = tk.Spinbox(self.length_frame, from_=minv, to=maxv, textvariable=var, width=6, font=('Arial', 12), command=lambda k=key, v=var: self.set_duration(k, v), justify='center')
+        spin = ttk.Spinbox(self.length_frame, from_=minv, to=maxv, textvariable=var, width=6, font=('Arial', 12), command=lambda k=key, v=var: self.set_duration(k, v), justify='center', style='App.TSpinbox')
         spin.grid(row=row, column=1, padx=6, pady=4)
         setattr(self, f'{key}_var', var)
 
     # --- Notification / Tray Setup ---
     def setup_notifications(self):
-        if platform.system() == 'Windows' and ToastNotifier:
-            try:
-                self.notifier = ToastNotifier()
-            except Exception:
-                self.notifier = None
+        # Called on the first notification; False marks "no toast backend"
+        self.notifier = False
+        if platform.system() == 'Windows':
+            win10toast = optional_import('win10toast')
+            if win10toast:
+                try:
+                    self.notifier = win10toast.ToastNotifier()
+                except Exception:
+                    self.notifier = False
 
     def show_notification(self, title: str, message: str):
+        if self.notifier is None:
+            self.setup_notifications()
         if self.notifier:
             try:
                 self.notifier.show_toast(title, message, duration=5, threaded=True)
@@ -195,14 +2814,20 @@ class PomodoroApp:
                 pass
 
     def create_tray_icon(self):
-        if not (pystray and Image and ImageDraw):
-            return
         if self.tray_icon:
             return
-        # Create simple circular icon
-        img = Image.new('RGB', (64, 64), color=(30, 30, 30) if self.dark_mode else (255, 255, 255))
-        d = ImageDraw.Draw(img)
-        d.ellipse((8, 8, 56, 56), fill=(255, 99, 71))
+        # Tray backend is only imported the first time the window is minimised
+        pystray = optional_import('pystray')
+        Image = optional_import('PIL.Image')
+        ImageDraw = optional_import('PIL.ImageDraw')
+        if not (pystray and Image and ImageDraw):
+            return
+        if self.tray_frames is None:
+            self.tray_frames = TrayFrameCache(Image, ImageDraw)
+        self.tray_key = self.tray_frames.key_for(self.state, self.palette, self.time_left, self.durations[self.state])
+        img = self.tray_frames.frame(self.tray_key)
+        self.tray_title = self.tray_tooltip()
+        # Menu callbacks run on the tray thread; they only queue work for Tk
         menu = pystray.Menu(
             pystray.MenuItem('Show', self.restore_from_tray),
             pystray.MenuItem('Start', lambda: self.safe_ui_call(self.start_timer)),
@@ -210,23 +2835,85 @@ class PomodoroApp:
             pystray.MenuItem('Skip', lambda: self.safe_ui_call(self.skip_timer)),
             pystray.MenuItem('Quit', lambda: self.safe_ui_call(self.exit_app))
         )
-        self.tray_icon = pystray.Icon('pomodoro', img, 'Pomodoro Timer', menu)
+        icon = self.tray_icon = pystray.Icon('pomodoro', img, self.tray_title, menu)
         def run_icon():
             try:
-                self.tray_icon.run()
+                icon.run()
             except Exception:
                 pass
         self.tray_thread = threading.Thread(target=run_icon, daemon=True)
         self.tray_thread.start()
 
-    def restore_from_tray(self, *args):
-        self.safe_ui_call(self.show_window)
-        if self.tray_icon:
+    def tray_tooltip(self):
+        label = self.palette.phase(self.state).label
+        if not self.is_running:
+            return f'Pomodoro Timer - {label}'
+        mins = (self.time_left + 59) // 60
+        return f"Pomodoro Timer - {label}: {mins} min left{' (paused)' if self.is_paused else ''}"
+
+    def update_tray(self):
+        # Tk thread only. Swaps in a cached frame when the quantised progress,
+        # phase or theme changed; the tooltip changes at most once a minute.
+        icon = self.tray_icon
+        if icon is None:
+            return
+        key = self.tray_frames.key_for(self.state, self.palette, self.time_left, self.durations[self.state])
+        try:
+            if key != self.tray_key:
+                self.tray_key = key
+                icon.icon = self.tray_frames.frame(key)
+            title = self.tray_tooltip()
+            if title != self.tray_title:
+                self.tray_title = title
+                icon.title = title
+        except Exception:
+            pass
+
+    def remove_tray_icon(self):
+        icon, self.tray_icon = self.tray_icon, None
+        if icon:
             try:
-                self.tray_icon.stop()
+                icon.stop()
             except Exception:
                 pass
-            self.tray_icon = None
+
+    def restore_from_tray(self, *args):
+        # Tray thread: hand the whole restore (including stopping the icon)
+        # to the Tk thread, which owns all tray icon state
+        self.safe_ui_call(self.show_window)
+
+    def open_control(self):
+        # Local control socket for status bars and scripts (`pomodoro.py ctl`);
+        # None when unsupported or when another instance already serves it
+        control = ControlServer(CONTROL_SOCKET, {
+            'start': self.start_timer,
+            'toggle': self.pause_timer,
+            'pause': lambda: self.is_running and not self.is_paused and self.pause_timer(),
+            'resume': lambda: self.is_paused and self.pause_timer(),
+            'skip': self.skip_timer,
+            'reset': self.reset_timer,
+        }, self.control_status, self.safe_ui_call)
+        return control if control.start() else None
+
+    def control_status(self):
+        # ends_at is the wall-clock end of the phase while it counts down, so
+        # clients can show a live countdown without asking again
+        phase = self.palette.phase(self.state)
+        today = self.today_counts()
+        return {'phase': self.state, 'label': phase.label, 'emoji': phase.emoji,
+                'running': self.is_running, 'paused': self.is_paused,
+                'remaining': round(self.engine.remaining(), 1), 'duration': self.durations[self.state],
+                'ends_at': round(self.timeline.phase_end, 3) if self.timeline else None,
+                'pomodoro_count': self.pomodoro_count, 'long_break_interval': self.long_break_interval,
+                'today': {k: today.get(k, 0) for k in ('pomodoro', 'short', 'long')}}
+
+    def publish_status(self):
+        # Push to control subscribers only when something they show changed
+        status = self.control_status()
+        key = dict(status, remaining=None) if status['ends_at'] is not None else status
+        if key != self.control_key:
+            self.control_key = key
+            self.control.publish(status)
 
     def safe_ui_call(self, fn):
         try:
@@ -235,111 +2922,311 @@ class PomodoroApp:
             pass
 
     def show_window(self):
+        self.remove_tray_icon()
         if self.window_hidden:
             self.root.deiconify()
             self.window_hidden = False
+        self.update_visibility()
 
     # --- Timer Logic ---
     def start_timer(self):
         if not self.is_running:
             self.is_running = True
             self.is_paused = False
+            self.engine.start()
+            self.rebase_timeline()
+            self.emit_event('start')
             self.run_timer()
+            self.update_ui()
 
     def run_timer(self):
+        # Each wake-up re-reads the remaining time from the engine's deadline and
+        # sleeps until the next whole-second boundary, so the chain cannot drift.
+        self.timer = None
         if self.is_running and not self.is_paused:
+            if self.timeline_skew() > SUSPEND_GAP:
+                self.catch_up()
+                return
+            self.time_left = self.engine.tick()
+            if self.engine.last_late is not None:
+                self.metrics.record('tick_lateness', self.engine.last_late)
             if self.time_left > 0:
-                self.time_left -= 1
-                self.update_ui()
-                self.timer = self.root.after(1000, self.run_timer)
+                self.refresh_timer()
+                wake = self.hidden_wakeup_ms() if self.visibility == 'hidden' else self.engine.next_wakeup_ms()
+                self.timer = self.root.after(wake, self.run_timer)
             else:
                 self.update_ui()  # show 00:00
                 self.is_running = False
+                self.last_drift = self.engine.finish()
                 self.handle_cycle_end()
 
+    def hidden_wakeup_ms(self):
+        # While withdrawn only the tray shows the timer: sleep until its frame
+        # or its minutes-left tooltip would change, or until the phase ends
+        rem = self.engine.remaining()
+        wait = rem
+        if self.tray_icon is not None:
+            step = self.durations[self.state] / self.tray_frames.steps
+            wait = min(wait, rem % 60 or 60.0, rem % step or step)
+        return max(1, int(math.ceil(wait * 1000)))
+
+    def cancel_tick(self):
+        if self.timer:
+            self.root.after_cancel(self.timer)
+            self.timer = None
+
     def pause_timer(self):
         if self.is_running:
             self.is_paused = not self.is_paused
-            if not self.is_paused:
+            if self.is_paused:
+                self.cancel_tick()
+                self.engine.pause()
+                self.timeline = None
+                self.time_left = self.engine.remaining_seconds()
+                self.record_session('paused', self.elapsed_in_phase())
+                self.emit_event('pause')
+            else:
+                self.engine.start()
+                self.rebase_timeline()
+                self.emit_event('resume')
                 self.run_timer()
             self.update_ui()
 
+    def rebase_timeline(self):
+        # Anchor the wall-clock schedule at the engine's current position
+        if self.is_running and not self.is_paused:
+            self.timeline = ScheduleTimeline(self.wall_clock(), self.state, self.pomodoro_count,
+                                             self.engine.remaining(), self.durations,
+                                             self.long_break_interval, self.auto_start)
+        else:
+            self.timeline = None
+
+    def timeline_skew(self):
+        # How far the wall clock is ahead of the engine. The monotonic clock
+        # stops during suspend on some platforms, and the after() chain stalls
+        # on all of them. A negative skew means the wall clock was set back,
+        # so the schedule is re-anchored instead.
+        if self.timeline is None:
+            return 0.0
+        skew = self.engine.remaining() - (self.timeline.phase_end - self.wall_clock())
+        if skew < -SUSPEND_GAP:
+            self.rebase_timeline()
+        return skew
+
+    def catch_up(self, ts=None):
+        # Jump to the phase the schedule says is current at `ts` (default:
+        # now). Phases that ended in between are credited in one batch.
+        ts = self.wall_clock() if ts is None else ts
+        pos = self.timeline.locate(ts)
+        done = list(self.timeline.completed(pos.index))
+        self.cancel_tick()
+        if not done:
+            # Still the same phase (a short suspend): only the deadline moves.
+            # Nothing begins, so no 'start' event, and the drift session goes on.
+            self.engine.set_remaining(pos.remaining)
+            self.rebase_timeline()
+            self.run_timer()
+            return 0
+        self.credit_completions(done)
+        self.state, self.pomodoro_count = pos.state, pos.pomodoro_count
+        self.engine.load(pos.remaining)
+        self.is_running = False
+        self.is_paused = False
+        if pos.running:
+            self.start_timer()
+        else:
+            self.timeline = None
+            self.time_left = self.durations[self.state]
+            self.engine.load(self.time_left)
+            self.update_ui()
+        self.play_sound(done[-1][0])
+        self.show_banner('Welcome back!', f'{len(done)} session(s) ended while away')
+        return len(done)
+
+    def credit_completions(self, phases):
+        # Bulk version of the completion bookkeeping in handle_cycle_end:
+        # one log write + fsync, one store transaction, one settings save
+        if not phases:
+            return
+        self.check_daily_reset()
+        today = self.daily_counts['date']
+        for kind, _, end, duration in phases:
+            self.counters[kind] += 1
+            self.emit_event('complete', phase=kind, duration=duration, remaining=0, ended=round(end, 3), caught_up=True)
+            if self.day_stats is not None:
+                self.day_stats.add(datetime.date.fromtimestamp(end), kind)
+            if datetime.date.fromtimestamp(end).isoformat() == today:
+                if self.shared:
+                    self.shared.increment(kind, today)
+                else:
+                    self.daily_counts[kind] = self.daily_counts.get(kind, 0) + 1
+        if self.shared:
+            self.daily_counts = self.shared.day_totals(today)
+        try:
+            self.session_log.append_many(('completed', kind, duration, end) for kind, _, end, duration in phases)
+        except (OSError, ValueError):
+            pass
+        if self.store:
+            try:
+                self.store.add_many((kind, 'completed', duration, end) for kind, _, end, duration in phases)
+            except sqlite3.Error:
+                pass
+        self.flush_session_counters()
+        self.save_settings()
+
+    def emit_event(self, kind, **fields):
+        # Outbound integration event (see EventBus); a no-op without subscribers
+        if self.bus.subscribers:
+            self.bus.emit(kind, **{'phase': self.state, 'remaining': round(self.engine.remaining(), 1),
+                                   'duration': self.durations[self.state],
+                                   'pomodoro_count': self.pomodoro_count, **fields})
+
     def reset_timer(self):
-        if self.timer:
-            self.root.after_cancel(self.timer)
+        self.cancel_tick()
         self.is_running = False
         self.is_paused = False
+        self.timeline = None
         self.time_left = self.durations[self.state]
+        self.engine.load(self.time_left)
+        self.emit_event('reset')
         self.update_ui()
 
     def skip_timer(self):
         # Skip without counting completion
-        if self.timer:
-            self.root.after_cancel(self.timer)
+        self.cancel_tick()
+        if self.is_running:
+            self.record_session('skipped', self.elapsed_in_phase())
+        self.emit_event('skip', elapsed=self.elapsed_in_phase())
         self.is_running = False
         self.is_paused = False
+        self.timeline = None
         self.transition_state()  # no counter increment
         self.time_left = self.durations[self.state]
+        self.engine.load(self.time_left)
         self.update_ui()
 
     def handle_cycle_end(self):
-        self.play_sound()
+        # Bookkeeping and the next phase come first; sound, toast and banner
+        # are dispatched afterwards and never delay the next start.
+        t0 = time.perf_counter()
+        m0 = self.metrics.begin('cycle_end')
+        ended = self.state
+        label = self.palette.phase(ended).label
         self.counters[self.state] += 1
+        self.record_session('completed', self.durations[self.state])
+        self.emit_event('complete', remaining=0, ended=round(self.wall_clock(), 3))
         self.daily_increment(self.state)
         self.flush_session_counters()  # persist
-        self.show_popup(f'{self.current_themes()[self.state]["label"]} Ended!', 'Time for the next step!')
-        self.show_notification('Session Complete', f'{self.current_themes()[self.state]["label"]} finished')
         self.transition_state()
         self.time_left = self.durations[self.state]
-        self.update_ui()
+        self.engine.load(self.time_left)
         if self.auto_start:
             self.start_timer()
+        else:
+            self.update_ui()
+        handler = time.perf_counter() - t0
+        self.metrics.record('cycle_end_handler', handler)
+        if self.auto_start and self.last_drift:
+            self.metrics.record('deadline_to_start', self.last_drift['end_late_ms'] / 1000.0 + handler)
+        # Side effects
+        self.play_sound(ended)
+        self.notify_worker.submit(self.show_notification, 'Session Complete', f'{label} finished')
+        self.show_banner(f'{label} Ended!', 'Time for the next step!')
+        self.metrics.end('cycle_end', m0)
 
     def transition_state(self):
-        if self.state == 'pomodoro':
-            self.pomodoro_count += 1
-            if self.pomodoro_count % self.long_break_interval == 0:
-                self.state = 'long'
-            else:
-                self.state = 'short'
-        else:
-            self.state = 'pomodoro'
+        self.state, self.pomodoro_count = next_phase(self.state, self.pomodoro_count, self.long_break_interval)
 
     # --- Duration and UI Updates ---
     def set_duration(self, key, var):
         val = var.get()
-        minv, maxv = LIMITS[key]
-        if minv <= val <= maxv:
+        if valid_duration(key, val):
             self.durations[key] = val * 60
             if self.state == key:
                 self.time_left = self.durations[key]
+                self.engine.set_remaining(self.time_left)
+                self.rebase_timeline()
                 self.update_ui()
+            elif self.timeline:
+                self.timeline.set_duration(key, self.durations[key])
 
     def update_ui(self):
+        # Full refresh (state changes, button presses). Everything goes through
+        # the renderer, so only values that actually changed reach Tk.
         self.check_daily_reset()
-        theme = self.current_themes()[self.state]
-        # Colors
-        self.frame.config(bg=self.bg_color())
-        self.timer_label.config(text=self.format_time(self.time_left), bg=self.bg_color(), fg=self.fg_color())
-        self.emoji_label.config(text=theme['emoji'], bg=self.bg_color())
-        self.state_label.config(text=theme['label'], fg=theme['color'], bg=self.bg_color())
-        self.title_label.config(fg=theme['color'], bg=self.bg_color())
-        self.counter_bar.config(bg=self.panel_bg(), highlightbackground='#444' if self.dark_mode else '#e0e0e0')
-        self.counter_label.config(text=self.get_counter_text(), bg=self.panel_bg(), fg=self.fg_color())
-        self.history_label.config(text=self.get_history_text(), bg=self.bg_color(), fg=self.secondary_text_color())
-        self.daily_label.config(text=self.get_daily_text(), bg=self.bg_color(), fg=self.secondary_text_color())
-        # Buttons theme adaptation minimal (could be expanded)
+        if self.control is not None and self.control.watches:
+            self.publish_status()
+        if self.visibility == 'hidden':
+            self.update_tray()  # showing the window again runs a full update
+            return
+        t0 = self.metrics.begin('update_ui')
+        if self.style_key != (self.state, self.palette):
+            self.apply_style()
+        phase = self.palette.phase(self.state)
+        r = self.renderer
+        r.apply(self.emoji_label, text=phase.emoji)
+        r.apply(self.state_label, text=phase.label)
+        r.apply(self.counter_label, text=self.get_counter_text())
+        r.apply(self.history_label, text=self.get_history_text())
+        r.apply(self.daily_label, text=self.get_daily_text())
         # Button states
         if self.is_running and not self.is_paused:
-            self.start_btn.config(state='disabled')
-            self.pause_btn.config(text='⏸ Pause', state='normal')
+            r.apply(self.start_btn, state='disabled')
+            r.apply(self.pause_btn, text='⏸ Pause', state='normal')
         elif self.is_running and self.is_paused:
-            self.start_btn.config(state='disabled')
-            self.pause_btn.config(text='▶ Resume', state='normal')
+            r.apply(self.start_btn, state='disabled')
+            r.apply(self.pause_btn, text='▶ Resume', state='normal')
         else:
-            self.start_btn.config(state='normal')
-            self.pause_btn.config(text='⏸ Pause', state='disabled')
+            r.apply(self.start_btn, state='normal')
+            r.apply(self.pause_btn, text='⏸ Pause', state='disabled')
+        self.refresh_timer()
+        self.animate()
+        self.metrics.end('update_ui', t0)
+
+    def refresh_timer(self):
+        # Per-second path: only the time text and the ring can change
+        if self.visibility == 'hidden':
+            self.update_tray()
+            return
+        t0 = self.metrics.begin('refresh_timer')
+        self.renderer.apply(self.timer_label, text=self.format_time(self.time_left))
         self.draw_progress()
+        self.update_tray()
+        self.metrics.end('refresh_timer', t0)
+
+    def apply_style(self):
+        # Colours depend only on (state, palette). A palette switch restyles
+        # the named ttk styles once; a phase switch touches two styles and
+        # the ring.
+        palette_changed = self.style_key is None or self.style_key[1] is not self.palette
+        self.style_key = (self.state, self.palette)
+        if palette_changed:
+            self.apply_palette()
+        color = self.palette.phase(self.state).color
+        self.style.configure('Title.TLabel', foreground=color)
+        self.style.configure('Phase.TLabel', foreground=color)
+        self.renderer.apply_item(self.progress_canvas, self.progress_arc, outline=color)
+
+    def apply_palette(self):
+        p, st = self.palette, self.style
+        st.configure('.', background=p.bg, foreground=p.fg)  # default for every style
+        st.configure('App.TFrame', background=p.bg)
+        st.configure('Panel.TFrame', background=p.panel, bordercolor=p.border)
+        for name in ('Secondary', 'Daily', 'Setting', 'Duration', 'Mono'):
+            st.configure(f'{name}.TLabel', foreground=p.secondary)
+        st.configure('Counter.TLabel', background=p.panel)
+        st.configure('App.TCheckbutton', indicatorbackground=p.panel)
+        st.map('App.TCheckbutton', background=[('active', p.bg)])
+        st.configure('App.TSpinbox', fieldbackground=p.panel, arrowcolor=p.fg, bordercolor=p.border)
+        st.configure('App.TMenubutton', background=p.panel, arrowcolor=p.fg)
+        st.configure('App.Horizontal.TScale', background=p.bg, troughcolor=p.panel)
+        r = self.renderer
+        r.apply(self.progress_canvas, bg=p.bg)
+        r.apply_item(self.progress_canvas, self.progress_oval, outline=p.secondary)
+        if self.stats_window is not None and self.stats_window.winfo_exists():
+            self.stats_window.config(bg=p.bg)
+            self.stats_canvas.config(bg=p.bg)
+            self.render_stats()
 
     # --- Utility Functions ---
     def format_time(self, seconds):
@@ -351,46 +3238,189 @@ class PomodoroApp:
         return f"🍅 {self.counters['pomodoro']}   🫐 {self.counters['short']}   🍌 {self.counters['long']}"
 
     def get_history_text(self):
-        return f"Cumulative: P {self.history.get('pomodoro', 0)}, S {self.history.get('short', 0)}, L {self.history.get('long', 0)}"
+        totals = self.history
+        if self.store:
+            try:
+                totals = self.store.totals()
+            except sqlite3.Error:
+                pass
+        return f"Cumulative: P {totals.get('pomodoro', 0)}, S {totals.get('short', 0)}, L {totals.get('long', 0)}"
 
     def get_daily_text(self):
-        return f"Today: P {self.daily_counts.get('pomodoro',0)}, S {self.daily_counts.get('short',0)}, L {self.daily_counts.get('long',0)}"
+        counts = self.today_counts()
+        return f"Today: P {counts.get('pomodoro',0)}, S {counts.get('short',0)}, L {counts.get('long',0)}"
+
+    # --- Statistics window ---
+    def load_day_stats(self):
+        # Per-day rollups from the store (other instances included); without
+        # SQLite only today's counters are known
+        if self.store:
+            try:
+                version = self.store.external_version()
+                if self.day_stats is None or version != self.day_stats_version:
+                    self.day_stats = DayStats.from_rows(self.store.daily_completed())
+                    self.day_stats_version = version
+                return self.day_stats
+            except sqlite3.Error:
+                pass
+        if self.day_stats is None:
+            self.day_stats = DayStats.from_rows(
+                (self.daily_counts['date'], k, self.daily_counts.get(k, 0)) for k in DayStats.KINDS)
+        return self.day_stats
+
+    def open_stats(self):
+        if self.stats_window is not None and self.stats_window.winfo_exists():
+            self.stats_window.lift()
+            self.render_stats()
+            return
+        win = self.stats_window = tk.Toplevel(self.root, bg=self.palette.bg)
+        win.title('📊 Statistics')
+        win.resizable(False, False)
+        win.transient(self.root)
+        win.bind('<Escape>', lambda e: win.destroy())
+        self.stats_summary = ttk.Label(win, style='Summary.TLabel', justify='left')
+        self.stats_summary.pack(padx=16, pady=(14, 6), anchor='w')
+        # The whole year is one image item: a 53 x 7 PhotoImage scaled up
+        cell = 13
+        self.stats_canvas = tk.Canvas(win, width=53 * cell + 40, height=7 * cell + 24, bg=self.palette.bg, highlightthickness=0)
+        self.stats_canvas.pack(padx=16)
+        for wd, name in ((0, 'Mon'), (2, 'Wed'), (4, 'Fri')):
+            self.stats_canvas.create_text(30, 22 + wd * cell + cell // 2, text=name, anchor='e', font=('Arial', 8), fill=self.palette.secondary, tags='axis')
+        self.stats_heat = tk.PhotoImage(width=53, height=7)
+        self.stats_image = None
+        self.stats_cell = cell
+        self.stats_weekdays = ttk.Label(win, style='Mono.TLabel', justify='left')
+        self.stats_weekdays.pack(padx=16, pady=(8, 14), anchor='w')
+        self.render_stats()
 
-    def show_popup(self, title, message):
+    def render_stats(self):
+        if self.stats_window is None or not self.stats_window.winfo_exists():
+            return
+        stats = self.load_day_stats()
+        today = datetime.date.fromisoformat(self.today_str())
+        self.stats_summary.config(text=(
+            f'Streak: {stats.current_streak(today)} days (longest {stats.longest})\n'
+            f'This week: {stats.week_total(today)}   This month: {stats.month_total(today)}   '
+            f'Lifetime: {stats.totals[0]}\n'
+            f'Breaks per pomodoro: {stats.break_ratio():.2f}'))
+        data, start = stats.heatmap(today, HEATMAP_COLORS[self.palette.dark])
+        self.stats_canvas.itemconfig('axis', fill=self.palette.secondary)
+        self.stats_heat.put(data, to=(0, 0))
+        scaled = self.stats_heat.zoom(self.stats_cell)
+        if self.stats_image is None:
+            self.stats_image = self.stats_canvas.create_image(36, 22, anchor='nw', image=scaled)
+        else:
+            self.stats_canvas.itemconfig(self.stats_image, image=scaled)
+        self.stats_scaled = scaled  # Tk images need a live Python reference
+        # Month names above the first week of each month (at most 13 items)
+        self.stats_canvas.delete('month')
+        for w in range(53):
+            first = datetime.date.fromordinal(start + 7 * w)
+            if first.day <= 7:
+                self.stats_canvas.create_text(36 + w * self.stats_cell, 10, text=first.strftime('%b'), anchor='w',
+                                              font=('Arial', 8), fill=self.palette.secondary, tags='month')
+        names = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+        self.stats_weekdays.config(text='Avg pomodoros  ' + '  '.join(
+            f'{n} {a:.1f}' for n, a in zip(names, stats.weekday_averages(today))))
+
+    def show_banner(self, title, message, timeout_ms=8000):
+        # Non-modal in-app banner (replaces the blocking messagebox); click or
+        # wait to dismiss. The window is raised so the banner gets noticed.
+        try:
+            color = self.palette.phase(self.state).color
+            self.banner.config(text=f'{title}  {message}', bg=color)
+            self.banner.place(relx=0.5, y=6, anchor='n')
+            self.banner.lift()
+            if not self.window_hidden:
+                self.root.lift()
+            if self.banner_hide:
+                self.root.after_cancel(self.banner_hide)
+            self.banner_hide = self.root.after(timeout_ms, self.hide_banner)
+        except tk.TclError:
+            pass
+
+    def hide_banner(self, event=None):
+        self.banner_hide = None
         try:
-            popup = tk.Toplevel(self.root)
-            popup.withdraw()
-            popup.attributes('-topmost', True)
-            popup.after(0, lambda: popup.focus_force())
-            messagebox.showinfo(title, message, parent=popup)
-            popup.destroy()
+            self.banner.place_forget()
         except tk.TclError:
             pass
 
-    def center_window(self):
-        self.root.update_idletasks()
-        w = self.root.winfo_width()
-        h = self.root.winfo_height()
+    def center_window(self, w, h):
+        # Uses the requested size directly, so no update_idletasks layout pass
         sw = self.root.winfo_screenwidth()
         sh = self.root.winfo_screenheight()
         x = (sw // 2) - (w // 2)
         y = (sh // 2) - (h // 2)
-        self.root.geometry(f'+{x}+{y}')
+        self.root.geometry(f'{w}x{h}+{x}+{y}')
 
     # --- History Persistence ---
     def load_history(self):
-        if os.path.exists(HISTORY_FILE):
+        # Counters are rebuilt from the session log (snapshot + tail replay);
+        # an old history.json is migrated on the first run.
+        self.session_log = SessionLog(SESSION_LOG_FILE, SNAPSHOT_FILE, self.data_lock)
+        try:
+            return self.session_log.load(HISTORY_FILE)
+        except OSError:
+            return {'pomodoro': 0, 'short': 0, 'long': 0}
+
+    def open_store(self):
+        if not sqlite3:
+            return None
+        try:
+            with self.data_lock:  # only one instance seeds a new database
+                store = SessionStore(DB_FILE)
+                if store.created:
+                    store.seed(self.history, self.daily_counts if self.daily_counts.get('date') == self.today_str() else None)
+            return store
+        except (sqlite3.Error, OSError):
+            return None
+
+    def open_shared_counters(self):
+        try:
+            ensure_data_dir()
+            shared = SharedCounters(COUNTERS_FILE, self.data_lock)
+        except (OSError, ValueError):
+            return None  # no mmap/fcntl: today's counts stay per-instance
+        if shared.created and self.daily_counts.get('date') == self.today_str():
+            shared.seed(self.daily_counts)
+        self.daily_counts = shared.day_totals(self.today_str())
+        return shared
+
+    def record_session(self, event, duration):
+        # One log record per completed/skipped/paused session (O(1) append);
+        # completed and skipped sessions also go to the indexed store
+        t0 = self.metrics.begin('persist_ui')
+        ts = self.wall_clock()
+        try:
+            self.session_log.append(event, self.state, duration, ts)
+        except (OSError, ValueError, AttributeError):
+            pass
+        if self.session_log.unsynced and self.log_sync is None:
+            # append() only checks FSYNC_INTERVAL on the next record; this
+            # covers the last one before an idle stretch
+            self.log_sync = self.root.after(int(SessionLog.FSYNC_INTERVAL * 1000), self.sync_session_log)
+        if self.store and event != 'paused':
             try:
-                with open(HISTORY_FILE, 'r') as f:
-                    data = json.load(f)
-                    # backward compatibility
-                    return {k: int(data.get(k, 0)) for k in ('pomodoro','short','long')}
-            except (ValueError, OSError, json.JSONDecodeError):
-                return {'pomodoro': 0, 'short': 0, 'long': 0}
-        return {'pomodoro': 0, 'short': 0, 'long': 0}
+                self.store.add(self.state, event, duration, ts)
+            except sqlite3.Error:
+                pass
+        self.metrics.end('persist_ui', t0)
+
+    def sync_session_log(self):
+        self.log_sync = None
+        try:
+            self.session_log.sync()
+        except (OSError, ValueError):
+            pass
+
+    def elapsed_in_phase(self):
+        return max(0, int(round(self.durations[self.state] - self.engine.remaining())))
 
     def flush_session_counters(self):
-        # add current session counters to history and reset session counters
+        # add current session counters to history and reset session counters;
+        # the records are already in the log, so this only makes them durable
+        # (merged with whatever other instances appended meanwhile)
         modified = False
         for k in self.counters:
             if self.counters[k]:
@@ -398,42 +3428,138 @@ class PomodoroApp:
                 self.counters[k] = 0
                 modified = True
         if modified:
-            with open(HISTORY_FILE, 'w') as f:
-                json.dump(self.history, f)
+            try:
+                self.session_log.sync()
+                self.history = self.session_log.refresh()
+            except (OSError, ValueError):
+                pass
 
     def daily_increment(self, key):
         self.check_daily_reset()
-        self.daily_counts[key] = self.daily_counts.get(key, 0) + 1
+        if self.shared:
+            # Lock-free increment of our slot; the sum includes other instances
+            self.shared.increment(key, self.daily_counts['date'])
+            self.daily_counts = self.shared.day_totals(self.daily_counts['date'])
+        else:
+            self.daily_counts[key] = self.daily_counts.get(key, 0) + 1
+        if self.day_stats is not None:
+            self.day_stats.add(self.daily_counts['date'], key)  # rollups stay current
+            self.render_stats()
         self.save_settings()  # persist daily counts in settings
 
     def check_daily_reset(self):
         today = self.today_str()
         if self.daily_counts.get('date') != today:
-            self.daily_counts = {'date': today, 'pomodoro': 0, 'short': 0, 'long': 0}
+            if self.shared:
+                self.daily_counts = self.shared.day_totals(today)
+            else:
+                self.daily_counts = {'date': today, 'pomodoro': 0, 'short': 0, 'long': 0}
             self.save_settings()
 
+    def today_counts(self):
+        # The store is the one source for today's counts once it is open: it
+        # has other instances' sessions and imported ones (pomodoro import).
+        # Without SQLite the shared counters stand in. daily_counts follows
+        # whichever it is, so the window, ctl status and settings.json agree.
+        day = self.daily_counts['date']
+        if self.store:
+            try:
+                self.daily_counts = dict(self.store.day_totals(day), date=day)
+            except sqlite3.Error:
+                pass
+        elif self.shared:
+            self.daily_counts = self.shared.day_totals(day)
+        return self.daily_counts
+
+    def schedule_midnight(self):
+        # Today's counts roll over at local midnight even if nothing else
+        # refreshes the window then. The wait is re-armed at least every
+        # MIDNIGHT_RECHECK seconds from the wall clock, so a suspend or clock
+        # change cannot push the rollover back by more than that.
+        now = self.wall_clock()
+        tomorrow = datetime.date.fromtimestamp(now) + datetime.timedelta(days=1)
+        wait = min(datetime.datetime.combine(tomorrow, datetime.time()).timestamp() - now, MIDNIGHT_RECHECK)
+        self.midnight = self.root.after(max(1, int(math.ceil(wait * 1000))), self.on_midnight)
+
+    def on_midnight(self):
+        if self.daily_counts.get('date') != self.today_str():
+            self.update_ui()  # check_daily_reset, then the "Today" line
+        self.schedule_midnight()  # woke early (or to re-check): waits again
+
     def save_history(self):
         self.flush_session_counters()
 
     def exit_app(self):
+        self.remove_tray_icon()
+        self.animator.cancel()
+        if self.midnight:
+            self.root.after_cancel(self.midnight)
+        if self.log_sync:
+            self.root.after_cancel(self.log_sync)
         self.flush_session_counters()
         self.save_settings()
+        self.writer.close()  # deterministic flush of pending settings
+        self.notify_worker.close()
+        self.audio.close()
+        self.bus.close()
+        if self.control:
+            self.control.close()
+        self.metrics.close()
+        try:
+            self.session_log.close()
+        except (OSError, ValueError):
+            pass
+        if self.store:
+            self.store.close()
+        if self.shared:
+            self.shared.close()
+        self.data_lock.close()
         self.root.destroy()
 
     # --- Settings persistence ---
     def load_settings(self):
+        # settings.json may be edited by hand, so every field is checked on
+        # its own: a missing or malformed value keeps its default and the
+        # rest of the file still loads
+        data = {}
         if os.path.exists(SETTINGS_FILE):
             try:
                 with open(SETTINGS_FILE, 'r') as f:
                     data = json.load(f)
-                self.long_break_interval = int(data.get('long_break_interval', self.long_break_interval))
-                self.auto_start = bool(data.get('auto_start', self.auto_start))
-                self.muted = bool(data.get('muted', self.muted))
-                self.sound_choice = data.get('sound_choice', self.sound_choice)
-                self.dark_mode = bool(data.get('dark_mode', self.dark_mode))
-                self.daily_counts = data.get('daily_counts', self.daily_counts)
-            except (ValueError, OSError, json.JSONDecodeError):
+            except (ValueError, OSError, TypeError):
                 pass
+        if not isinstance(data, dict):
+            data = {}
+
+        def field(key, default, check):
+            value = data.get(key, default)
+            return value if check(value) else default
+
+        is_bool = lambda v: isinstance(v, bool)  # noqa: E731
+        is_str = lambda v: isinstance(v, str)  # noqa: E731
+        self.long_break_interval = field('long_break_interval', self.long_break_interval,
+                                         lambda v: is_int(v) and valid_long_break_interval(v))
+        self.auto_start = field('auto_start', self.auto_start, is_bool)
+        self.muted = field('muted', self.muted, is_bool)
+        self.sound_choice = field('sound_choice', self.sound_choice, valid_cue)
+        cues = data.get('sound_cues')
+        if isinstance(cues, dict):
+            self.sound_cues = {phase: cue for phase, cue in cues.items() if phase in LIMITS and valid_cue(cue)}
+        volume = data.get('volume')
+        if isinstance(volume, (int, float)) and not isinstance(volume, bool) and math.isfinite(volume):
+            self.volume = min(100, max(0, int(round(volume))))
+        self.dark_mode = field('dark_mode', self.dark_mode, is_bool)
+        self.light_theme = field('light_theme', self.light_theme, is_str)
+        self.dark_theme = field('dark_theme', self.dark_theme, is_str)
+        self.daily_counts = field('daily_counts', self.daily_counts, valid_daily_counts)
+        if os.path.exists(THEMES_FILE):
+            self.palettes = load_palettes(THEMES_FILE)
+        self.select_palette()
+
+    def select_palette(self):
+        # Unknown theme names fall back to the built-in light/dark palette
+        name = self.dark_theme if self.dark_mode else self.light_theme
+        self.palette = self.palettes.get(name) or PALETTES['dark' if self.dark_mode else 'light']
 
     def save_settings(self):
         data = {
@@ -441,27 +3567,37 @@ class PomodoroApp:
             'auto_start': self.auto_start,
             'muted': self.muted,
             'sound_choice': self.sound_choice,
+            'sound_cues': self.sound_cues,
+            'volume': self.volume,
             'dark_mode': self.dark_mode,
-            'daily_counts': self.daily_counts
+            'light_theme': self.light_theme,
+            'dark_theme': self.dark_theme,
+            'daily_counts': dict(self.today_counts())
         }
-        try:
-            with open(SETTINGS_FILE, 'w') as f:
-                json.dump(data, f)
-        except OSError:
-            pass
+        # Queued to the writer thread; bursts of changes become one write
+        self.writer.submit(SETTINGS_FILE, data)
 
     # --- Utility additions ---
     def today_str(self):
-        return datetime.date.today().isoformat()
+        return datetime.date.fromtimestamp(self.wall_clock()).isoformat()
 
     def update_long_break_interval(self):
         val = self.long_break_var.get()
-        if 2 <= val <= 12:
+        if valid_long_break_interval(val):
             self.long_break_interval = val
+            if self.timeline:
+                self.rebase_timeline()
             self.save_settings()
 
+    def toggle_metrics(self):
+        # Instrumentation can be switched on/off while running (Ctrl+M)
+        self.metrics.set_enabled(not self.metrics.enabled)
+        self.show_banner('Metrics', 'on' if self.metrics.enabled else 'off', timeout_ms=1500)
+
     def toggle_auto_start(self):
         self.auto_start = self.auto_start_var.get()
+        if self.timeline:
+            self.rebase_timeline()
         self.save_settings()
 
     def toggle_mute(self):
@@ -470,54 +3606,91 @@ class PomodoroApp:
 
     def toggle_dark_mode(self):
         self.dark_mode = self.dark_mode_var.get()
+        self.select_palette()
         self.update_ui()
         self.save_settings()
 
     def update_sound_choice(self):
         self.sound_choice = self.sound_var.get()
+        self.audio.preload([self.sound_choice], self.volume / 100)
         self.save_settings()
 
-    def current_themes(self):
-        return DARK_THEMES if self.dark_mode else LIGHT_THEMES
-
-    def bg_color(self):
-        return '#1e1e1e' if self.dark_mode else '#f9f9f9'
-
-    def panel_bg(self):
-        return '#2b2b2b' if self.dark_mode else '#ffffff'
-
-    def fg_color(self):
-        return '#f0f0f0' if self.dark_mode else '#222'
+    def update_volume(self):
+        volume = int(round(float(self.volume_var.get())))
+        if volume != self.volume:
+            self.volume = volume
+            self.save_settings()
 
-    def secondary_text_color(self):
-        return '#aaaaaa' if self.dark_mode else '#888'
+    def cue_for(self, phase):
+        return self.sound_cues.get(phase) or self.sound_choice
 
-    def play_sound(self):
-        if self.muted:
+    def play_sound(self, phase=None):
+        # Queues the cue for the phase that ended; rendering and playback
+        # happen on the audio thread
+        if self.muted or not self.volume:
             return
-        try:
-            if platform.system() == 'Windows':
-                winsound.PlaySound(self.sound_choice, winsound.SND_ALIAS)
-            else:
-                print('\a')
-        except Exception:
-            pass
+        self.audio.play(self.cue_for(phase or self.state), self.volume / 100)
 
     # Progress ring drawing
     def draw_progress(self):
-        self.progress_canvas.delete('all')
+        # Only the arc extent moves; colours are handled by apply_style. While
+        # running the fractional remaining time is used, so ticks and
+        # animation frames agree; the extent is quantised to RING_STEP.
         total = self.durations[self.state]
-        remaining = self.time_left
+        remaining = self.engine.remaining() if self.engine.running else self.time_left
         if total <= 0:
             return
-        frac = 1 - (remaining / total)
-        start_angle = -90
-        extent = frac * 360
-        # Background circle
-        self.progress_canvas.create_oval(10, 10, 210, 210, outline=self.secondary_text_color(), width=10)
-        # Progress arc
-        color = self.current_themes()[self.state]['color']
-        self.progress_canvas.create_arc(10, 10, 210, 210, start=start_angle, extent=extent, style='arc', outline=color, width=10)
+        frac = min(1.0, max(0.0, 1 - (remaining / total)))
+        extent = round(round(frac * 360 / RING_STEP) * RING_STEP, 1)
+        self.renderer.apply_item(self.progress_canvas, self.progress_arc, extent=extent)
+
+    def animate_ring(self):
+        # One animator frame; returns seconds until the arc moves another step
+        if not self.is_running or self.is_paused or self.visibility == 'hidden':
+            return None
+        t0 = self.metrics.begin('ring_frame')
+        self.draw_progress()
+        self.metrics.end('ring_frame', t0)
+        return RING_STEP / 360.0 * self.durations[self.state]
+
+    def animate(self):
+        # Start or stop the animator to match the run state
+        if self.is_running and not self.is_paused:
+            if self.animator.job is None:
+                self.animator.schedule(0)
+        else:
+            self.animator.cancel()
+
+    # Window visibility: drives the frame rate and whether anything is drawn
+    def on_focus(self, event):
+        # Focus events arrive per widget; re-check once the burst is over
+        if self.visibility_check is None:
+            self.visibility_check = self.root.after_idle(self.update_visibility)
+
+    def update_visibility(self):
+        self.visibility_check = None
+        if self.window_hidden or self.root.state() in ('iconic', 'withdrawn'):
+            mode = 'hidden'
+        else:
+            try:
+                focused = self.root.focus_get() is not None
+            except (KeyError, tk.TclError):  # focus on a widget tkinter does not know
+                focused = True
+            mode = 'focused' if focused else 'unfocused'
+        self.set_visibility(mode)
+
+    def set_visibility(self, mode):
+        if not self.animator.set_mode(mode):
+            return
+        was_hidden, self.visibility = self.visibility == 'hidden', mode
+        if mode == 'hidden':
+            return
+        if was_hidden:
+            self.update_ui()  # nothing was drawn while hidden
+            if self.is_running and not self.is_paused:
+                self.cancel_tick()  # back from the sparse hidden wake-ups to per-second ticks
+                self.run_timer()
+        self.animate()
 
     # Minimize/restore events (placeholder tray behavior)
     def on_minimize(self, event):
@@ -526,13 +3699,667 @@ class PomodoroApp:
             self.window_hidden = True
             self.root.withdraw()
             self.create_tray_icon()
+            self.set_visibility('hidden')
 
     def on_restore(self, event):
         if not self.window_hidden:
             return
         self.show_window()
 
-if __name__ == '__main__':
+# --- Headless multi-timer server (--serve) ---
+USERS_DIR = os.path.join(DATA_DIR, 'users')
+USER_ID_CHARS = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._-')
+
+
+def valid_user_id(user):
+    return 0 < len(user) <= 64 and set(user) <= USER_ID_CHARS and not user.startswith('.')
+
+
+class HeadlessTimer:
+    # One user's timer without Tk: same cycle rules, limits and TimerEngine as
+    # the GUI. Persisted as settings.json + history.json in DATA_DIR/users/<id>/.
+    def __init__(self, user, clock):
+        self.user = user
+        self.clock = clock
+        self.state = 'pomodoro'
+        self.pomodoro_count = 0
+        self.durations = {'pomodoro': 25 * 60, 'short': 5 * 60, 'long': 40 * 60}
+        self.long_break_interval = 4
+        self.auto_start = False
+        self.is_paused = False
+        self.history = {'pomodoro': 0, 'short': 0, 'long': 0}
+        self.engine = TimerEngine(clock)
+        self.engine.load(self.durations[self.state])
+        self.generation = 0  # bumped whenever the deadline changes (stale heap entries)
+
+    @property
+    def is_running(self):
+        return self.engine.running or self.is_paused
+
+    def start(self):
+        if not self.is_running:
+            self.engine.start()
+
+    def pause(self):
+        if self.engine.running:
+            self.engine.pause()
+            self.is_paused = True
+        elif self.is_paused:
+            self.engine.start()
+            self.is_paused = False
+
+    def reset(self):
+        self.is_paused = False
+        self.engine.load(self.durations[self.state])
+
+    def skip(self):
+        self.is_paused = False
+        self.state, self.pomodoro_count = next_phase(self.state, self.pomodoro_count, self.long_break_interval)
+        self.engine.load(self.durations[self.state])
+
+    def complete(self):
+        # Deadline reached: count it, move to the next phase, auto-start if set
+        self.engine.finish()
+        self.history[self.state] += 1
+        self.skip()
+        if self.auto_start:
+            self.engine.start()
+
+    def configure(self, data):
+        # Same validation as the GUI spinboxes. Everything is checked before
+        # anything changes, so a rejected request leaves the timer as it was.
+        if not isinstance(data, dict):
+            raise ValueError('body must be a JSON object')
+        durations = data.get('durations') or {}
+        if not isinstance(durations, dict):
+            raise ValueError('durations must be an object of minutes per phase')
+        for key, minutes in durations.items():
+            if not valid_duration(key, minutes):
+                raise ValueError(f'invalid duration for {key!r}')
+        if 'long_break_interval' in data and not valid_long_break_interval(data['long_break_interval']):
+            raise ValueError('invalid long_break_interval')
+        if 'auto_start' in data and not isinstance(data['auto_start'], bool):
+            raise ValueError('auto_start must be true or false')
+        for key, minutes in durations.items():
+            self.durations[key] = minutes * 60
+        if self.state in durations and not self.is_running:
+            self.engine.load(self.durations[self.state])
+        if 'long_break_interval' in data:
+            self.long_break_interval = data['long_break_interval']
+        if 'auto_start' in data:
+            self.auto_start = data['auto_start']
+
+    def status(self):
+        return {'user': self.user, 'state': self.state, 'running': self.is_running, 'paused': self.is_paused,
+                'time_left': self.engine.remaining_seconds(), 'pomodoro_count': self.pomodoro_count,
+                'durations': {k: v // 60 for k, v in self.durations.items()},
+                'long_break_interval': self.long_break_interval, 'auto_start': self.auto_start,
+                'history': dict(self.history)}
+
+    # --- Persistence ---
+    def settings_data(self):
+        # Running timers store a wall-clock end so they survive a server restart
+        left = self.engine.remaining()
+        return {'state': self.state, 'pomodoro_count': self.pomodoro_count,
+                'durations': dict(self.durations), 'long_break_interval': self.long_break_interval,
+                'auto_start': self.auto_start, 'paused': self.is_paused, 'time_left': left,
+                'ends_at': time.time() + left if self.engine.running else None}
+
+    def load(self, settings, history):
+        # Stored values go through the same checks as configure(); invalid
+        # entries are dropped and keep their defaults
+        if settings.get('state') in LIMITS:
+            self.state = settings['state']
+        count = settings.get('pomodoro_count')
+        if is_int(count) and count >= 0:
+            self.pomodoro_count = count
+        durations = settings.get('durations')
+        if isinstance(durations, dict):
+            self.durations.update({k: v for k, v in durations.items()
+                                   if is_int(v) and v % 60 == 0 and valid_duration(k, v // 60)})
+        if valid_long_break_interval(settings.get('long_break_interval')):
+            self.long_break_interval = settings['long_break_interval']
+        self.auto_start = settings.get('auto_start') is True
+        self.history.update({k: v for k, v in history.items() if k in self.history and is_int(v) and v >= 0})
+        left = settings.get('time_left')
+        valid_seconds = lambda v: isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v)  # noqa: E731
+        self.engine.load(min(max(0.0, float(left)), self.durations[self.state]) if valid_seconds(left)
+                         else self.durations[self.state])
+        if valid_seconds(settings.get('ends_at')):
+            self.engine.load(min(max(0.0, settings['ends_at'] - time.time()), self.durations[self.state]))
+            self.engine.start()
+        elif settings.get('paused'):
+            self.engine.start()
+            self.engine.pause()
+            self.is_paused = True
+
+
+class TimerServer:
+    # Hosts many HeadlessTimers in one asyncio loop. All expirations live in a
+    # single heap of (deadline, seq, user, generation); one task sleeps until
+    # the earliest deadline, so idle timers cost nothing per second.
+    LATENCY_SAMPLES = 100000
+    SAVE_DEBOUNCE = 2.0  # per-user state changes far more often than the GUI's
+
+    def __init__(self, users_dir=USERS_DIR, clock=None, persist=True):
+        self.users_dir = users_dir
+        self.clock = clock or time.monotonic
+        self.persist = persist
+        self.timers = {}
+        self.heap = []
+        self.seq = itertools.count()
+        self.wakeup = None  # asyncio.Event, created inside the loop
+        self.writer = PersistenceWriter(self.SAVE_DEBOUNCE) if persist else None
+        self.folders = set()  # user folders known to exist
+        self.expired = 0
+        self.errors = 0  # timers that failed to complete and were reset
+        self.latencies = []  # expiry lateness in seconds (bounded ring)
+
+    # --- Timers ---
+    def get_timer(self, user):
+        timer = self.timers.get(user)
+        if timer is None:
+            timer = HeadlessTimer(user, self.clock)
+            if self.persist:
+                folder = os.path.join(self.users_dir, user)
+                settings = self.read_json(os.path.join(folder, 'settings.json'))
+                history = self.read_json(os.path.join(folder, 'history.json'))
+                if settings or history:
+                    timer.load(settings, history)
+            self.timers[user] = timer
+            self.schedule(timer)
+        return timer
+
+    @staticmethod
+    def read_json(path):
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, timer):
+        if self.writer:
+            folder = os.path.join(self.users_dir, timer.user)
+            if folder not in self.folders:
+                os.makedirs(folder, exist_ok=True)
+                self.folders.add(folder)
+            self.writer.submit(os.path.join(folder, 'settings.json'), timer.settings_data())
+            self.writer.submit(os.path.join(folder, 'history.json'), dict(timer.history))
+
+    def schedule(self, timer):
+        # Old heap entries for this timer become stale via the generation number
+        timer.generation += 1
+        deadline = timer.engine.deadline
+        if deadline is not None:
+            entry = (deadline, next(self.seq), timer.user, timer.generation)
+            heapq.heappush(self.heap, entry)
+            if self.heap[0] is entry and self.wakeup is not None:
+                self.wakeup.set()
+
+    def command(self, user, action, body=None):
+        if not valid_user_id(user):
+            raise KeyError(user)
+        timer = self.get_timer(user)
+        if action == 'start':
+            timer.start()
+        elif action == 'pause':
+            timer.pause()
+        elif action == 'skip':
+            timer.skip()
+        elif action == 'reset':
+            timer.reset()
+        elif action == 'configure':
+            timer.configure({} if body is None else body)
+        elif action != 'status':
+            raise KeyError(action)
+        if action != 'status':
+            self.schedule(timer)
+            self.save(timer)
+        return timer.status()
+
+    # --- Expiry loop ---
+    def expire_due(self):
+        now = self.clock()
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            deadline, _, user, generation = heapq.heappop(heap)
+            timer = self.timers.get(user)
+            if timer is None or generation != timer.generation:
+                continue  # paused, reset or rescheduled since
+            self.record_latency(now - deadline)
+            try:
+                timer.complete()
+                self.expired += 1
+            except Exception:
+                # One broken timer must not stop expiry for all the others:
+                # it is stopped at the start of its phase instead
+                self.errors += 1
+                timer.is_paused = False
+                timer.engine.load(timer.durations.get(timer.state, 0))
+            self.schedule(timer)
+            self.save(timer)
+
+    def record_latency(self, late):
+        if len(self.latencies) < self.LATENCY_SAMPLES:
+            self.latencies.append(late)
+        else:
+            self.latencies[self.expired % self.LATENCY_SAMPLES] = late
+
+    async def run_expiry(self):
+        import asyncio
+        self.wakeup = asyncio.Event()
+        while True:
+            self.expire_due()
+            timeout = self.heap[0][0] - self.clock() if self.heap else None
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self):
+        lat = sorted(self.latencies)
+
+        def pct(p):
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 3) if lat else None
+        return {'timers': len(self.timers), 'scheduled': len(self.heap), 'expired': self.expired, 'errors': self.errors,
+                'expiry_latency_ms': {'p50': pct(0.5), 'p99': pct(0.99), 'max': pct(1.0)},
+                'writes': self.writer.stats() if self.writer else None}
+
+    # --- JSON over HTTP/1.1 (TCP or Unix socket) ---
+    def route(self, method, path, body):
+        # GET /timers/<user>, POST /timers/<user>/<action>, GET /stats
+        parts = [p for p in path.split('?')[0].split('/') if p]
+        if method == 'GET' and parts == ['stats']:
+            return 200, self.stats()
+        if len(parts) == 2 and parts[0] == 'timers' and method == 'GET':
+            return 200, self.command(parts[1], 'status')
+        if len(parts) == 3 and parts[0] == 'timers' and method == 'POST':
+            return 200, self.command(parts[1], parts[2], body)
+        return 404, {'error': 'not found'}
+
+    async def handle_client(self, reader, writer):
+        import asyncio
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep = headers.get('connection', '').lower() != 'close'
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    # The body cannot be framed, so the connection ends here
+                    code, payload, keep = 400, {'error': 'invalid Content-Length'}, False
+                else:
+                    raw = await reader.readexactly(length) if length else b''
+                    try:
+                        body = json.loads(raw) if raw else None
+                        code, payload = self.route(method, path, body)
+                    except KeyError:
+                        code, payload = 404, {'error': 'not found'}
+                    except (ValueError, TypeError) as e:
+                        code, payload = 400, {'error': str(e) or 'bad request'}
+                data = json.dumps(payload).encode()
+                reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found'}[code]
+                writer.write(f'HTTP/1.1 {code} {reason}\r\nContent-Type: application/json\r\n'
+                             f'Content-Length: {len(data)}\r\nConnection: {"keep-alive" if keep else "close"}\r\n\r\n'.encode() + data)
+                await writer.drain()
+                if not keep:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, socket_path=None):
+        import asyncio
+        if socket_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=socket_path)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+        expiry = asyncio.ensure_future(self.run_expiry())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expiry.cancel()
+            if self.writer:
+                self.writer.close()
+
+
+def serve(host, port, socket_path=None):
+    import asyncio
+    server = TimerServer()
+    where = socket_path or f'http://{host}:{port}'
+    print(f'Pomodoro timer server on {where} (data: {USERS_DIR})', flush=True)
+    try:
+        asyncio.run(server.serve(host, port, socket_path))
+    except KeyboardInterrupt:
+        pass
+
+
+# --- History export / import ---
+# Sessions stream between the store and CSV, JSONL or iCalendar one record
+# at a time, so memory stays flat whatever the history size. Imports are
+# written in batches and deduplicated, so importing a file twice is a no-op.
+EXPORT_FIELDS = ('start', 'end', 'type', 'outcome', 'duration')
+IMPORT_BATCH = 5000
+TYPE_ALIASES = {
+    'pomodoro': 'pomodoro', 'focus': 'pomodoro', 'work': 'pomodoro', 'session': 'pomodoro',
+    'short': 'short', 'short_break': 'short', 'short break': 'short', 'break': 'short',
+    'long': 'long', 'long_break': 'long', 'long break': 'long',
+}
+TYPE_KEYWORDS = ('long break', 'short break', 'break', 'pomodoro', 'focus', 'work')  # searched in free-text titles
+OUTCOME_ALIASES = {
+    'completed': 'completed', 'complete': 'completed', 'done': 'completed', 'finished': 'completed',
+    'confirmed': 'completed', 'tentative': 'completed',  # iCalendar STATUS of a logged event
+    'skipped': 'skipped', 'skip': 'skipped', 'cancelled': 'skipped', 'canceled': 'skipped',
+}
+FIELD_ALIASES = {
+    'start': ('start', 'start_time', 'started_at', 'begin', 'dtstart'),
+    'end': ('end', 'end_time', 'ended_at', 'finished_at', 'dtend'),
+    'type': ('type', 'kind', 'category', 'categories', 'x-pomodoro-type', 'summary', 'title'),
+    'outcome': ('outcome', 'x-pomodoro-outcome', 'status'),
+    'duration': ('duration', 'duration_s', 'seconds'),
+}
+
+
+def format_utc(ts):
+    return datetime.datetime.fromtimestamp(int(ts), datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def parse_time(value):
+    # Epoch seconds, ISO 8601 (with Z/offset, or local) or iCalendar basic
+    # format (20240101T101500Z, or an all-day 20240101 read as local
+    # midnight); returns epoch seconds
+    value = str(value).strip()
+    if len(value) == 8 and value.isdigit():
+        try:
+            return datetime.datetime.strptime(value, '%Y%m%d').timestamp()
+        except ValueError:
+            pass  # not a date: epoch seconds
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    if len(value) >= 15 and value[8] == 'T' and value[:8].isdigit():
+        value = f'{value[:4]}-{value[4:6]}-{value[6:8]}T{value[9:11]}:{value[11:13]}:{value[13:15]}{value[15:]}'
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.datetime.fromisoformat(value).timestamp()
+
+
+def export_records(store, since=None, until=None):
+    for start_ts, end_ts, kind, outcome, duration in store.iter_sessions(since, until):
+        yield {'start': format_utc(start_ts), 'end': format_utc(end_ts), 'type': kind,
+               'outcome': outcome, 'duration': duration}
+
+
+def write_csv(records, out):
+    import csv
+    writer = csv.DictWriter(out, fieldnames=EXPORT_FIELDS, lineterminator='\n')
+    writer.writeheader()
+    n = 0
+    for n, rec in enumerate(records, 1):
+        writer.writerow(rec)
+    return n
+
+
+def write_jsonl(records, out):
+    n = 0
+    for n, rec in enumerate(records, 1):
+        out.write(json.dumps(rec, separators=(',', ':')) + '\n')
+    return n
+
+
+def write_ics(records, out):
+    labels = {'pomodoro': 'Pomodoro', 'short': 'Short break', 'long': 'Long break'}
+    out.write('BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Pomodoro Timer//EN\r\n')
+    n = 0
+    for n, rec in enumerate(records, 1):
+        start = rec['start'].replace('-', '').replace(':', '')
+        end = rec['end'].replace('-', '').replace(':', '')
+        out.write(f'BEGIN:VEVENT\r\nUID:{end}-{rec["type"]}-{rec["outcome"]}@pomodoro-timer\r\n'
+                  f'DTSTAMP:{end}\r\nDTSTART:{start}\r\nDTEND:{end}\r\n'
+                  f'SUMMARY:{labels.get(rec["type"], rec["type"])} ({rec["outcome"]})\r\n'
+                  f'X-POMODORO-TYPE:{rec["type"]}\r\nX-POMODORO-OUTCOME:{rec["outcome"]}\r\n'
+                  'END:VEVENT\r\n')
+    out.write('END:VCALENDAR\r\n')
+    return n
+
+
+def read_csv(f):
+    import csv
+    for row in csv.DictReader(f):
+        yield {k.strip().lower(): v for k, v in row.items() if k}
+
+
+def read_jsonl(f):
+    for line in f:
+        line = line.strip()
+        if line:
+            try:
+                yield {k.lower(): v for k, v in json.loads(line).items()}
+            except (ValueError, AttributeError):
+                yield {}  # counted as invalid
+
+
+def read_ics(f):
+    # Minimal VEVENT reader: unfolds continuation lines and drops parameters
+    # (DTSTART;TZID=...:value is read as local time)
+    event, prev = None, None
+    for raw in f:
+        line = raw.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and prev is not None and event is not None:
+            event[prev] += line[1:]
+            continue
+        name, _, value = line.partition(':')
+        name = name.split(';', 1)[0].strip().lower()
+        if name == 'begin' and value.strip().upper() == 'VEVENT':
+            event, prev = {}, None
+        elif name == 'end' and value.strip().upper() == 'VEVENT':
+            if event is not None:
+                yield event
+            event, prev = None, None
+        elif event is not None and name:
+            event[name] = value.strip()
+            prev = name
+
+
+EXPORT_FORMATS = {'csv': write_csv, 'jsonl': write_jsonl, 'ics': write_ics}
+IMPORT_FORMATS = {'csv': read_csv, 'jsonl': read_jsonl, 'ics': read_ics}
+
+
+def normalize_record(rec):
+    # (kind, outcome, duration, end_ts) from an exported or foreign record,
+    # or None if it cannot be used
+    def field(name):
+        for alias in FIELD_ALIASES[name]:
+            if rec.get(alias) not in (None, ''):
+                return rec[alias]
+        return None
+    try:
+        # No type at all means a plain focus log; a type we do not recognise
+        # (a meeting, a custom category) is unusable rather than a pomodoro
+        kind = str(field('type') or 'pomodoro').strip().lower()
+        kind = TYPE_ALIASES.get(kind) or next((TYPE_ALIASES[w] for w in TYPE_KEYWORDS if w in kind), None)
+        if kind is None:
+            return None
+        outcome = OUTCOME_ALIASES.get(str(field('outcome') or 'completed').strip().lower())
+        if outcome is None:
+            return None
+        end, start, duration = field('end'), field('start'), field('duration')
+        end_ts = parse_time(end) if end is not None else None
+        start_ts = parse_time(start) if start is not None else None
+        if duration is not None:
+            duration = int(float(duration))
+        elif start_ts is not None and end_ts is not None:
+            duration = int(round(end_ts - start_ts))
+        if end_ts is None and start_ts is not None and duration is not None:
+            end_ts = start_ts + duration
+        if end_ts is None or duration is None or duration < 0:
+            return None
+        return kind, outcome, duration, float(int(end_ts))
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def import_records(store, session_log, records, batch=IMPORT_BATCH):
+    # Batched, deduplicated import; new rows also go to the session log so
+    # the lifetime counters (history) agree with the store
+    stats = {'imported': 0, 'duplicates': 0, 'invalid': 0}
+    pending = []
+
+    def flush():
+        added = store.import_many(pending)
+        stats['imported'] += len(added)
+        stats['duplicates'] += len(pending) - len(added)
+        session_log.append_many((outcome, kind, duration, end_ts) for kind, outcome, duration, end_ts in added)
+        pending.clear()
+    for rec in records:
+        row = normalize_record(rec)
+        if row is None:
+            stats['invalid'] += 1
+            continue
+        pending.append(row)
+        if len(pending) >= batch:
+            flush()
+    if pending:
+        flush()
+    return stats
+
+
+def guess_format(path, fmt=None):
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt == 'ical':
+        fmt = 'ics'
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'unknown format {fmt!r} (use csv, jsonl or ics)')
+    return fmt
+
+
+def export_history(fmt, path=None, since=None, until=None):
+    if not sqlite3 or not os.path.exists(DB_FILE):
+        print('No session store to export from', file=sys.stderr)
+        return 1
+    store = SessionStore(DB_FILE)
+    since_ts = parse_time(since) if since else None
+    until_ts = parse_time(until) if until else None
+    out = open(path, 'w', newline='', encoding='utf-8') if path else sys.stdout
+    try:
+        n = EXPORT_FORMATS[fmt](export_records(store, since_ts, until_ts), out)
+    finally:
+        if path:
+            out.close()
+        store.close()
+    print(f'Exported {n} sessions', file=sys.stderr)
+    return 0
+
+
+def import_history(path, fmt=None):
+    if not sqlite3:
+        print('Importing needs sqlite3', file=sys.stderr)
+        return 1
+    fmt = guess_format(path, fmt)
+    lock = FileLock(LOCK_FILE)
+    log = SessionLog(SESSION_LOG_FILE, SNAPSHOT_FILE, lock)
+    log.load(HISTORY_FILE)
+    with lock:
+        store = SessionStore(DB_FILE)
+        if store.created:
+            store.seed(log.counts, None)
+    try:
+        with open(path, newline='', encoding='utf-8') as f:
+            stats = import_records(store, log, IMPORT_FORMATS[fmt](f))
+    finally:
+        log.close()
+        store.close()
+    print(f"Imported {stats['imported']} sessions ({stats['duplicates']} already present, "
+          f"{stats['invalid']} unusable)", file=sys.stderr)
+    return 0
+
+
+mark_startup('imports')
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog='pomodoro', description='Pomodoro Timer')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='print a phase-by-phase startup breakdown after the first paint and exit')
+    parser.add_argument('--metrics', action='store_true', help='start with instrumentation enabled (Ctrl+M toggles)')
+    parser.add_argument('--metrics-port', type=int, default=int(os.getenv('POMODORO_METRICS_PORT', '0')),
+                        help='serve Prometheus text metrics on localhost:PORT/metrics')
+    parser.add_argument('--profile', action='append', default=[], metavar='NAME',
+                        help='capture a cProfile of a hot path (update_ui, refresh_timer, cycle_end, persist_ui)')
+    parser.add_argument('--serve', action='store_true', help='run the headless multi-timer server (no window)')
+    parser.add_argument('--host', default='127.0.0.1', help='--serve: address to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='--serve: TCP port')
+    parser.add_argument('--socket', help='--serve: listen on this Unix socket instead of TCP')
+    commands = parser.add_subparsers(dest='command')
+    export = commands.add_parser('export', help='write the session history as CSV, JSONL or iCalendar')
+    export.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+    export.add_argument('-o', '--output', help='file to write (default: stdout)')
+    export.add_argument('--since', help='only sessions starting at or after this date/time')
+    export.add_argument('--until', help='only sessions starting before this date/time')
+    imp = commands.add_parser('import', help='merge sessions from a CSV, JSONL or iCalendar file')
+    imp.add_argument('file')
+    imp.add_argument('--format', choices=sorted(EXPORT_FORMATS), help='default: from the file extension')
+    control = commands.add_parser('ctl', help='control the running app or follow its status')
+    control.add_argument('action', choices=['status', 'start', 'pause', 'resume', 'toggle', 'skip', 'reset', 'watch'])
+    control.add_argument('--format', choices=['text', 'json'], default='text',
+                         help='text: one status-bar line (watch: one per second while running)')
+    control.add_argument('--socket', default=CONTROL_SOCKET, help='control socket of the running app')
+    args = parser.parse_args(argv)
+    if args.command == 'ctl':
+        sys.exit(ctl(args.action, args.format, args.socket))
+    if args.command == 'export':
+        sys.exit(export_history(args.format, args.output, args.since, args.until))
+    if args.command == 'import':
+        try:
+            sys.exit(import_history(args.file, args.format))
+        except (OSError, ValueError) as e:
+            sys.exit(f'Import failed: {e}')
+    if args.serve:
+        serve(args.host, args.port, args.socket)
+        return
+
     root = tk.Tk()
+    mark_startup('Tk()')
     app = PomodoroApp(root)
-    root.mainloop() 
\ No newline at end of file
+    if args.metrics or args.profile:
+        app.metrics.set_enabled(True)
+    for name in args.profile:
+        app.metrics.profile(name)
+    if args.metrics_port:
+        try:
+            app.metrics.serve_prometheus(args.metrics_port)
+        except OSError as e:
+            print(f'Metrics endpoint unavailable: {e}', file=sys.stderr)
+    if args.profile_startup:
+        def report():
+            print(startup_report(), flush=True)
+            app.exit_app()
+        # Queued after finish_startup, so the first frame has been drawn
+        root.after_idle(report)
+    root.mainloop()
+
+
+if __name__ == '__main__':
+    main()